@@ -0,0 +1,204 @@
+"""Undo/redo history of JsonModel edits.
+
+Each command keeps the delta of one edit, never a copy of the document :
+    SetValueCommand     the item, its value before and after
+    InsertRowsCommand   the parent item, the row and the inserted items
+    RemoveRowsCommand   the parent item, the row and the removed items
+
+so undo() and redo() only touch the rows of the edit, whatever the size of the
+document. Removed items are kept as they are and inserted back on undo, the model
+only has to signal the rows. Like QUndoStack, consecutive edits of the same cell
+are merged into one command. The oldest commands are dropped once the history
+holds more than max_bytes (estimated).
+"""
+
+from __future__ import annotations
+
+import sys
+
+from collections import deque
+
+_ITEM_SIZE = 200  # rough bytes of a TreeItem with its slots, key and row
+
+
+def _value_size(value) -> int:
+    return sys.getsizeof(value)
+
+
+def _items_size(items: list) -> int:
+    """Estimate the memory held by items and the items below them"""
+    count = 0
+    size = 0
+    stack = list(items)
+    while stack:
+        item = stack.pop()
+        count += 1
+        size += _value_size(item._value)
+        if item._pending is not None:
+            size += _value_size(item._pending.source)
+        stack.extend(item._children or ())
+    return count * _ITEM_SIZE + size
+
+
+class SetValueCommand:
+    """Value of one item, from old to new"""
+
+    __slots__ = ("model", "item", "old", "new")
+
+    def __init__(self, model, item, old, new):
+        self.model = model
+        self.item = item
+        self.old = old
+        self.new = new
+
+    def undo(self):
+        self.model._set_item_value(self.item, self.old)
+
+    def redo(self):
+        self.model._set_item_value(self.item, self.new)
+
+    def merge(self, command) -> bool:
+        """Take the new value of a following edit of the same item"""
+        if type(command) is not SetValueCommand or command.item is not self.item:
+            return False
+        self.new = command.new
+        return True
+
+    def is_obsolete(self) -> bool:
+        return type(self.old) is type(self.new) and self.old == self.new
+
+    def size(self) -> int:
+        return _ITEM_SIZE + _value_size(self.old) + _value_size(self.new)
+
+
+class InsertRowsCommand:
+    """Items inserted under parent from row"""
+
+    __slots__ = ("model", "parent", "row", "items", "_size")
+
+    def __init__(self, model, parent, row: int, items: list):
+        self.model = model
+        self.parent = parent
+        self.row = row
+        self.items = items
+        self._size = _items_size(items)
+
+    def undo(self):
+        self.model._remove_items(self.parent, self.row, len(self.items))
+
+    def redo(self):
+        self.model._insert_items(self.parent, self.row, self.items)
+
+    def merge(self, command) -> bool:
+        return False
+
+    def is_obsolete(self) -> bool:
+        return False
+
+    def size(self) -> int:
+        return self._size
+
+
+class RemoveRowsCommand(InsertRowsCommand):
+    """Items removed from parent, starting at row"""
+
+    __slots__ = ()
+
+    def undo(self):
+        self.model._insert_items(self.parent, self.row, self.items)
+
+    def redo(self):
+        self.model._remove_items(self.parent, self.row, len(self.items))
+
+
+class EditHistory:
+    """Undo and redo stacks of edit commands, bounded by an estimated memory size
+
+    push() expects the edit to be done already, like QUndoStack.push without the redo.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20, limit: int = 0):
+        self.max_bytes = max_bytes
+        self.limit = limit  # most commands kept, 0 for no limit
+        self._undo = deque()  # oldest first, trimmed from the left
+        self._redo = []
+        self._size = 0
+        self._applying = False  # undo/redo running, the model must not push
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    @property
+    def size(self) -> int:
+        """Estimated bytes held by the commands that can be undone or redone"""
+        return self._size
+
+    @property
+    def applying(self) -> bool:
+        return self._applying
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._size = 0
+
+    def push(self, command):
+        """Record a command that was just applied"""
+        if self._applying:
+            return
+
+        for dropped in self._redo:
+            self._size -= dropped.size()
+        self._redo.clear()
+
+        if self._undo:
+            top = self._undo[-1]
+            before = top.size()
+            if top.merge(command):
+                self._size += top.size() - before
+                if top.is_obsolete():  # edited back to where it started
+                    self._undo.pop()
+                    self._size -= top.size()
+                self._trim()  # the merged value may be bigger
+                return
+
+        self._undo.append(command)
+        self._size += command.size()
+        self._trim()
+
+    def undo(self) -> bool:
+        if not self._undo:
+            return False
+
+        command = self._undo.pop()
+        self._run(command.undo)
+        self._redo.append(command)
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+
+        command = self._redo.pop()
+        self._run(command.redo)
+        self._undo.append(command)
+        return True
+
+    def _run(self, function):
+        self._applying = True
+        try:
+            function()
+        finally:
+            self._applying = False
+
+    def _trim(self):
+        """Drop the oldest commands beyond max_bytes or limit, the newest one is always kept"""
+        undo = self._undo
+        while len(undo) > 1 and (self._size > self.max_bytes or (self.limit and len(undo) > self.limit)):
+            self._size -= undo.popleft().size()
@@ -0,0 +1,225 @@
+"""In-process stand-in for the few maya.cmds functions used by jsonJointHierarchy.
+
+It keeps a tiny DAG in memory and counts every call, so MayaInteract can be run
+and measured outside of Maya :
+    fake = FakeCmds()
+    maya = MayaInteract(cmds_backend=fake)
+Transforms are stored as given, world and object space are the same here.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+
+
+class FakeNode:
+    __slots__ = ("name", "type", "parent", "children", "t", "ro")
+
+    def __init__(self, name: str, node_type: str = "joint", parent: "FakeNode" = None):
+        self.name = name
+        self.type = node_type
+        self.parent = parent
+        self.children = []
+        self.t = [0.0, 0.0, 0.0]
+        self.ro = [0.0, 0.0, 0.0]
+
+    @property
+    def path(self) -> str:
+        names = []
+        node = self
+        while node is not None:
+            names.append(node.name)
+            node = node.parent
+        return "|" + "|".join(reversed(names))
+
+
+class FakeCmds:
+    """Subset of maya.cmds working on an in-memory scene"""
+
+    def __init__(self):
+        self.nodes = {}  # short name -> FakeNode, names are kept unique
+        self.selection = []
+        self.calls = Counter()
+        self.undo_chunks = 0  # number of chunks currently open
+
+    # region -- Helpers
+    def reset_calls(self):
+        self.calls.clear()
+
+    def call_count(self) -> int:
+        return sum(self.calls.values())
+
+    def _node(self, name: str) -> FakeNode:
+        name = name.rsplit("|", 1)[-1]
+        try:
+            return self.nodes[name]
+        except KeyError:
+            raise ValueError(f"No object matches name: {name}") from None
+
+    def _unique_name(self, name: str) -> str:
+        if name not in self.nodes:
+            return name
+        base = name.rstrip("0123456789")
+        index = 1
+        while f"{base}{index}" in self.nodes:
+            index += 1
+        return f"{base}{index}"
+
+    def _add(self, name: str, node_type: str, parent: FakeNode = None) -> FakeNode:
+        node = FakeNode(self._unique_name(name), node_type, parent)
+        self.nodes[node.name] = node
+        if parent is not None:
+            parent.children.append(node)
+        return node
+
+    def _name(self, node: FakeNode, long: bool) -> str:
+        return node.path if long else node.name
+
+    def add_hierarchy(self, datas: dict, parent: FakeNode = None) -> FakeNode:
+        """Build joints from a jsonJointHierarchy dict without counting calls"""
+        stack = [(datas, parent)]
+        root = None
+        while stack:
+            datas, parent = stack.pop()
+            node = self._add(datas["1_name"], "joint", parent)
+            node.t = list(datas["2_pos"])
+            node.ro = list(datas["2_rot"])
+            root = root or node
+            children = datas.get("3_children") or {}
+            stack.extend((child, node) for child in reversed(list(children.values())))
+        return root
+
+    # endregion
+
+    # region -- maya.cmds
+    def about(self, batch=False, **kwargs):
+        self.calls["about"] += 1
+        return True
+
+    def ls(self, *objects, selection=False, long=False, **kwargs):
+        self.calls["ls"] += 1
+        if selection:
+            nodes = [self.nodes[name] for name in self.selection]
+        else:
+            nodes = [self._node(name) for name in _flatten(objects)]
+        return [self._name(node, long) for node in nodes]
+
+    def select(self, *objects, clear=False, add=False, **kwargs):
+        self.calls["select"] += 1
+        if clear:
+            self.selection = []
+            return
+        names = [self._node(name).name for name in _flatten(objects)]
+        self.selection = self.selection + names if add else names
+
+    def listRelatives(self, *objects, children=False, allDescendents=False, parent=False,
+                      fullPath=False, shapes=False, type=None, **kwargs):
+        self.calls["listRelatives"] += 1
+        result = []
+        for name in _flatten(objects):
+            node = self._node(name)
+            if parent:
+                found = [node.parent] if node.parent else []
+            elif allDescendents:
+                # like maya, descendants come deepest last child first (reversed pre-order)
+                found = list(_preorder(node))[:0:-1]
+            else:
+                found = node.children
+            result.extend(self._name(n, fullPath) for n in found if type is None or n.type == type)
+        return result or None
+
+    def xform(self, *objects, q=False, query=False, ws=False, worldSpace=False, t=None,
+              translation=None, ro=None, rotation=None, **kwargs):
+        self.calls["xform"] += 1
+        nodes = [self._node(name) for name in _flatten(objects)] or \
+            [self.nodes[name] for name in self.selection]
+        t = t if t is not None else translation
+        ro = ro if ro is not None else rotation
+
+        if q or query:
+            attr = "t" if t else "ro"
+            values = []
+            for node in nodes:
+                values.extend(getattr(node, attr))
+            return values
+
+        for node in nodes:
+            if t is not None:
+                node.t = [float(v) for v in t]
+            if ro is not None:
+                node.ro = [float(v) for v in ro]
+
+    def joint(self, name="joint1", p=None, position=None, **kwargs):
+        """Create a joint under the selected joint and select it, like maya does"""
+        self.calls["joint"] += 1
+        parent = self.nodes[self.selection[-1]] if self.selection else None
+        node = self._add(name, "joint", parent)
+        position = p if p is not None else position
+        if position is not None:
+            node.t = [float(v) for v in position]
+        self.selection = [node.name]
+        return node.name
+
+    def createNode(self, node_type, name=None, parent=None, skipSelect=False, ss=False, **kwargs):
+        self.calls["createNode"] += 1
+        node = self._add(name or f"{node_type}1", node_type, self._node(parent) if parent else None)
+        if not (skipSelect or ss):
+            self.selection = [node.name]
+        return node.name
+
+    def parent(self, *objects, world=False, **kwargs):
+        self.calls["parent"] += 1
+        names = list(_flatten(objects))
+        if world:
+            children, parent = names, None
+        else:
+            children, parent = names[:-1], self._node(names[-1])
+
+        result = []
+        for name in children:
+            node = self._node(name)
+            if node.parent is not None:
+                node.parent.children.remove(node)
+            node.parent = parent
+            if parent is not None:
+                parent.children.append(node)
+            result.append(node.name)
+        return result
+
+    def delete(self, *objects, **kwargs):
+        self.calls["delete"] += 1
+        for name in _flatten(objects):
+            node = self._node(name)
+            if node.parent is not None:
+                node.parent.children.remove(node)
+            for child in _preorder(node):
+                self.nodes.pop(child.name, None)
+
+    def objExists(self, name: str) -> bool:
+        self.calls["objExists"] += 1
+        return name.rsplit("|", 1)[-1] in self.nodes
+
+    def undoInfo(self, openChunk=False, closeChunk=False, chunkName=None, **kwargs):
+        self.calls["undoInfo"] += 1
+        if openChunk:
+            self.undo_chunks += 1
+        if closeChunk:
+            self.undo_chunks -= 1
+
+    # endregion
+
+
+def _flatten(objects):
+    for obj in objects:
+        if isinstance(obj, (list, tuple)):
+            yield from obj
+        else:
+            yield obj
+
+
+def _preorder(node: FakeNode):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
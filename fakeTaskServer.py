@@ -0,0 +1,251 @@
+"""In-process stand-in for the task tracker used by timeLogApp.
+
+It serves task records over http on a free localhost port, with an injected
+latency, and counts the requests, connections and records it sends, so
+taskSource.HttpTaskSource, taskStore.SyncedTaskSource and the window can be run
+and measured without the tracker :
+
+    with FakeTaskServer(timeLogApp.datas, latency=0.5, bucket_latency=0.2) as server:
+        ui = MyUi(task_source=HttpTaskSource(server.url))
+        server.set_task("Task11", "001-030")  # changed on the tracker, sent by the next sync
+
+    GET /tasks?bucket=Today&bucket=Yesterday   {"bucket", "tasks", "days"} json lines, bucket_latency seconds apart
+    GET /changes?since=<cursor>                one json line per record changed since, then {"cursor": ...}
+    POST /edits {"key": ..., "edits": [...]}   {"records": [...]}, a key already applied isn't applied again
+
+fail_edits and lose_edits make the next POST /edits fail, before applying them
+(503) or after (the connection is closed without an answer), to exercise retries.
+"""
+
+from __future__ import annotations
+
+import datetime
+import http.server
+import json
+import socket
+import threading
+import time
+import urllib.parse
+
+from collections import Counter
+
+from taskSource import BUCKETS, add_minutes, bucket_days, records_from_buckets
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, the client reuses its connection
+    disable_nagle_algorithm = True  # headers and body are separate writes, don't wait for the client's delayed ack
+
+    def setup(self):
+        super().setup()
+        self.server.fake.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.server.fake
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query)
+        fake.record(self.command, parts.path)
+        time.sleep(fake.latency)
+
+        if parts.path == "/tasks":
+            self.start_lines()
+            for bucket in query.get("bucket", list(BUCKETS)):
+                time.sleep(fake.bucket_latency)
+                tasks, days = fake.bucket(bucket)
+                self.send_line({"bucket": bucket, "tasks": tasks, "days": days})
+            self.send_chunk(b"")
+
+        elif parts.path == "/changes":
+            cursor, records = fake.changes(float(query.get("since", ["0"])[0]))
+            self.start_lines()
+            lines = [json.dumps(record).encode("utf-8") + b"\n" for record in records]
+            for start in range(0, len(lines), 1000):  # one chunk per thousand records
+                self.send_chunk(b"".join(lines[start:start + 1000]))
+            self.send_line({"cursor": cursor})
+            self.send_chunk(b"")
+
+        else:
+            self.send_json(404, {"error": f"no {parts.path}"})
+
+    def do_POST(self):
+        fake = self.server.fake
+        parts = urllib.parse.urlsplit(self.path)
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        fake.record(self.command, parts.path)
+        time.sleep(fake.latency)
+
+        if parts.path != "/edits":
+            self.send_json(404, {"error": f"no {parts.path}"})
+        elif fake.take_failure("fail_edits"):
+            self.send_json(503, {"error": "tracker busy"})
+        else:
+            records = fake.push(body.get("edits", []), body.get("key"))
+            if fake.take_failure("lose_edits"):
+                self.close_connection = True  # applied, but the client never hears about it
+                self.connection.shutdown(socket.SHUT_RDWR)
+                return
+            self.send_json(200, {"records": records})
+
+    def start_lines(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def send_line(self, data):
+        self.send_chunk(json.dumps(data).encode("utf-8") + b"\n")
+
+    def send_chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def send_json(self, status: int, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients hanging up mid-response (cancelled fetches) are expected
+
+
+class FakeTaskServer:
+    """Task tracker stand-in running on a background thread
+
+    tasks is a {bucket: {task: time code}} dict, each task is put on the newest day
+    of its bucket. Records (see taskSource) can also be given as they are.
+    """
+
+    def __init__(self, tasks: dict = None, latency: float = 0.0, bucket_latency: float = 0.0, port: int = 0,
+                 records: list = None):
+        self.port = port  # 0 for a free port, kept by a restart
+        self.latency = latency  # seconds before answering a request
+        self.bucket_latency = bucket_latency  # seconds before each bucket of a GET /tasks
+        self.requests = Counter()  # "GET /tasks" -> count
+        self.connections = 0
+        self.records_sent = 0  # records answered by GET /changes
+        self.edits_applied = 0  # edits of POST /edits, a batch sent again isn't counted twice
+        self.fail_edits = 0  # next POST /edits answered 503 without applying them
+        self.lose_edits = 0  # next POST /edits applied, then the connection is dropped
+        self.pushed = {}  # batch key -> records answered
+        self.lock = threading.Lock()
+        self.records = {}  # id -> record, the deleted ones are kept for the next syncs
+        for record in (records or []) + records_from_buckets(tasks or {}, updated=time.time()):
+            self.records[record["id"]] = dict(record)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "FakeTaskServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTaskServer":
+        self._server = _Server(("127.0.0.1", self.port), _Handler)
+        self.port = self._server.server_address[1]
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="FakeTaskServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def record(self, method: str, path: str):
+        with self.lock:
+            self.requests[f"{method} {path}"] += 1
+
+    def request_count(self) -> int:
+        return sum(self.requests.values())
+
+    # region -- Tracker data
+    def tasks(self, bucket: str) -> dict:
+        """Return the {task: time code} of a bucket, the newest day wins"""
+        return self.bucket(bucket)[0]
+
+    def bucket(self, bucket: str) -> tuple:
+        """Return the ({task: time code}, {task: iso day}) of a bucket, the newest day wins"""
+        oldest, newest = bucket_days(bucket)
+        with self.lock:
+            records = sorted(
+                (record for record in self.records.values()
+                 if not record["deleted"] and oldest <= record["day"] <= newest),
+                key=lambda record: record["day"])
+        tasks = {record["task"]: record["code"] for record in records}
+        return tasks, {record["task"]: record["day"] for record in records}
+
+    def changes(self, since: float) -> tuple:
+        """Return (cursor, records updated from since on)"""
+        with self.lock:
+            cursor = time.time()
+            records = [dict(record) for record in self.records.values() if record["updated"] >= since]
+            self.records_sent += len(records)
+        return cursor, records
+
+    def set_task(self, task: str, code: str, day: str = None):
+        """Add or change the time code of a task on a day, today by default"""
+        day = day or datetime.date.today().isoformat()
+        with self.lock:
+            self.records[f"{task}@{day}"] = {
+                "id": f"{task}@{day}", "task": task, "day": day, "code": code,
+                "updated": time.time(), "deleted": False,
+            }
+
+    def push(self, edits: list, key: str = None) -> list:
+        """Apply time edits, return the records changed, once per key"""
+        with self.lock:
+            if key is not None and key in self.pushed:
+                return self.pushed[key]
+
+            records = []
+            for edit in edits:
+                id = f"{edit['task']}@{edit['day']}"
+                record = self.records.get(id)
+                code = record["code"] if record is not None and not record["deleted"] else "000-000"
+                record = self.records[id] = {
+                    "id": id, "task": edit["task"], "day": edit["day"],
+                    "code": add_minutes(code, edit["minutes"]), "updated": time.time(), "deleted": False,
+                }
+                records.append(dict(record))
+            self.edits_applied += len(edits)
+
+            if key is not None:
+                self.pushed[key] = records
+        return records
+
+    def take_failure(self, name: str) -> bool:
+        """Use up one of the failures counted in the attribute name"""
+        with self.lock:
+            if getattr(self, name) > 0:
+                setattr(self, name, getattr(self, name) - 1)
+                return True
+        return False
+
+    def delete_task(self, task: str, day: str = None):
+        day = day or datetime.date.today().isoformat()
+        with self.lock:
+            record = self.records.get(f"{task}@{day}")
+            if record is not None:
+                record["deleted"] = True
+                record["updated"] = time.time()
+
+    # endregion
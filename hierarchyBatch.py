@@ -0,0 +1,383 @@
+"""Headless batch mode of jsonJointHierarchy, runs its operations over many hierarchy files.
+
+Nothing here imports Qt, so it runs with a plain python on the farm, or with mayapy
+for the operations that need a maya scene :
+
+    python hierarchyBatch.py validate rigs/                                 # every .json/.jhb of rigs
+    python hierarchyBatch.py convert rigs/*.json --to .jhb -o converted/
+    python hierarchyBatch.py mirror rigs/*_L.json --suffix _R -o mirrored/
+    python hierarchyBatch.py resuffix rigs/*.json --suffix _bind --in-place
+    python hierarchyBatch.py rebuild rigs/*.json --suffix _pasted --dry-run  # against fakeCmds.FakeCmds
+    mayapy hierarchyBatch.py rebuild rigs/*.json -o scenes/                 # one .ma scene per file
+    mayapy hierarchyBatch.py export scenes/*.ma --root root_jnt -o rigs/
+
+The files are shared between --workers processes (one per core by default, 1 runs
+everything in this process). Maya is initialized once per worker, not once per file.
+Each result is printed as soon as its file is done, as a status line or, with
+--json, as one json object per line. The exit code is 1 if any file was invalid or failed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import glob
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+
+from hierarchyInteract import JsonInteract, MayaInteract
+from treeWalk import preorder
+
+OPERATIONS = ("validate", "convert", "mirror", "resuffix", "rebuild", "export")
+HIERARCHY_EXTENSIONS = (".json",) + JsonInteract.BINARY_EXTENSIONS
+SCENE_EXTENSIONS = (".ma", ".mb")
+MAX_PROBLEMS = 20  # problems listed per invalid file
+
+_cmds = None  # maya.cmds of this worker, once initialize_worker ran with maya
+
+
+# region -- Validation
+def _is_vector(value) -> bool:
+    return (
+        isinstance(value, (list, tuple)) and len(value) == 3
+        and all(type(number) in (int, float) and math.isfinite(number) for number in value)
+    )
+
+
+def validate_hierarchy(datas) -> list:
+    """Return the problems of a hierarchy dict, an empty list when maya can build it as is
+
+    Every joint needs a "1_name" string, "2_pos" and "2_rot" as 3 finite numbers and,
+    if it has children, a "3_children" dict. Joint names must be unique, maya would
+    rename the duplicates.
+    """
+    if not isinstance(datas, dict):
+        return [f"/ : the root is a {type(datas).__name__}, not a joint dict"]
+
+    problems = []
+    names = set()
+
+    def children(node):
+        path, datas = node
+        joints = datas.get("3_children")
+        if not isinstance(joints, dict):
+            return ()
+        return [(f"{path}/{key}", child) for key, child in joints.items()]
+
+    for (path, datas), _ in preorder(("", datas), children):
+        path = path or "/"
+        if not isinstance(datas, dict):
+            problems.append(f"{path} : a {type(datas).__name__}, not a joint dict")
+            continue
+
+        name = datas.get("1_name")
+        if not isinstance(name, str) or not name:
+            problems.append(f"{path} : 1_name must be a non empty string, not {name!r}")
+        elif name in names:
+            problems.append(f"{path} : duplicate joint name {name}")
+        else:
+            names.add(name)
+
+        for key in ("2_pos", "2_rot"):
+            if not _is_vector(datas.get(key)):
+                problems.append(f"{path} : {key} must be 3 finite numbers, not {datas.get(key)!r}")
+
+        if "3_children" in datas and not isinstance(datas["3_children"], dict):
+            problems.append(f"{path} : 3_children must be a dict, not a {type(datas['3_children']).__name__}")
+
+    return problems
+
+# endregion
+
+
+# region -- Operations, each one takes (input, output, options) and returns the result fields
+def _joint_count(datas: dict) -> int:
+    return sum(1 for _ in preorder(datas, lambda datas: (datas.get("3_children") or {}).values()))
+
+
+def _read_valid(file_name: str) -> dict:
+    datas = JsonInteract.json_read(file_name, cache=False)
+    problems = validate_hierarchy(datas)
+    if problems:
+        raise ValueError(f"invalid hierarchy, {problems[0]}" + (f" (+{len(problems) - 1} more)" if len(problems) > 1 else ""))
+    return datas
+
+
+def _validate(file_name: str, output, options: dict) -> dict:
+    datas = JsonInteract.json_read(file_name, cache=False)
+    problems = validate_hierarchy(datas)
+    result = {"joints": _joint_count(datas) if isinstance(datas, dict) else 0}
+    if problems:
+        result["status"] = "invalid"
+        result["problems"] = problems[:MAX_PROBLEMS]
+        result["message"] = problems[0] + (f" (+{len(problems) - 1} more)" if len(problems) > 1 else "")
+    return result
+
+
+def _convert(file_name: str, output: str, options: dict) -> dict:
+    datas = _read_valid(file_name)
+    JsonInteract.json_write(datas, output, fsync=options["fsync"])
+    return {"joints": _joint_count(datas)}
+
+
+def _edit(file_name: str, output: str, options: dict) -> dict:
+    """mirror and resuffix, on the whole JointTable at once"""
+    from jointTable import JointTable  # needs numpy, like the .jhb files
+
+    table = JointTable.from_hierarchy(_read_valid(file_name))
+    if options["operation"] == "mirror":
+        table = table.symmetrize()
+    if options["suffix"]:
+        table = table.resuffix(options["suffix"])
+
+    JsonInteract.json_write(table.to_hierarchy(), output, fsync=options["fsync"])
+    return {"joints": len(table)}
+
+
+def _rebuild(file_name: str, output, options: dict) -> dict:
+    """Create the joints in a new scene and save it, or count the commands against FakeCmds"""
+    datas = _read_valid(file_name)
+
+    if options["dry_run"]:
+        from fakeCmds import FakeCmds
+
+        backend = FakeCmds()
+    else:
+        backend = _cmds
+        backend.file(new=True, force=True)
+
+    maya = MayaInteract(cmds_backend=backend)
+    created = maya.build_joints(datas, options["suffix"] or "", symmetrize=options["mirror"])
+
+    if options["dry_run"]:
+        return {"joints": len(created), "commands": backend.call_count()}
+
+    backend.file(rename=output)
+    backend.file(save=True, force=True, type="mayaBinary" if output.lower().endswith(".mb") else "mayaAscii")
+    return {"joints": len(created)}
+
+
+def _export(file_name: str, output: str, options: dict) -> dict:
+    """Open a scene and write the hierarchy of the --root joint"""
+    _cmds.file(file_name, open=True, force=True)
+    if not _cmds.objExists(options["root"]):
+        raise ValueError(f"no {options['root']} in the scene")
+
+    datas = MayaInteract(cmds_backend=_cmds).capture_hierarchy(options["root"])
+    JsonInteract.json_write(datas, output, fsync=options["fsync"])
+    return {"joints": _joint_count(datas)}
+
+
+_OPERATIONS = {
+    "validate": _validate,
+    "convert": _convert,
+    "mirror": _edit,
+    "resuffix": _edit,
+    "rebuild": _rebuild,
+    "export": _export,
+}
+
+
+def needs_maya(options: dict) -> bool:
+    return options["operation"] == "export" or (options["operation"] == "rebuild" and not options["dry_run"])
+
+# endregion
+
+
+# region -- Jobs
+def initialize_worker(maya: bool):
+    """Start maya standalone once in this process, when the operation needs a scene"""
+    global _cmds
+    if maya and _cmds is None:
+        import maya.standalone
+
+        maya.standalone.initialize(name="python")
+        import maya.cmds
+
+        _cmds = maya.cmds
+
+
+def process_file(job: tuple) -> dict:
+    """Run one (input, output, options) job, never raises, the errors are in the result"""
+    file_name, output, options = job
+    result = {"file": file_name, "operation": options["operation"], "output": output, "status": "ok"}
+    start = time.perf_counter()
+    try:
+        result.update(_OPERATIONS[options["operation"]](file_name, output, options))
+    except Exception as error:
+        result["status"] = "failed"
+        result["message"] = f"{type(error).__name__}: {error}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def output_path(file_name: str, options: dict):
+    """Return where the result of file_name is written, None when nothing is"""
+    operation = options["operation"]
+    if operation == "validate" or (operation == "rebuild" and options["dry_run"]):
+        return None
+    if options["in_place"]:
+        return file_name
+
+    stem, extension = os.path.splitext(os.path.basename(file_name))
+    if operation == "rebuild":
+        extension = options["to"] or ".ma"
+    elif operation == "export":
+        extension = options["to"] or ".json"
+    elif options["to"]:
+        extension = options["to"]
+
+    directory = options["output_dir"]
+    if directory is None:
+        directory = os.path.dirname(file_name)
+        if operation in ("mirror", "resuffix"):
+            stem = f"{stem}_{operation}"  # never overwrite the input by accident
+    return os.path.join(directory, stem + extension)
+
+
+def find_files(inputs: list, extensions: tuple, recursive=False) -> list:
+    """Expand directories and glob patterns (for shells that don't) into sorted unique files"""
+    files = []
+    for name in inputs:
+        if os.path.isdir(name):
+            pattern = os.path.join(glob.escape(name), "**" if recursive else "", "*")
+            files.extend(
+                path for path in glob.glob(pattern, recursive=recursive)
+                if path.lower().endswith(extensions) and os.path.isfile(path))
+        elif glob.has_magic(name) and not os.path.exists(name):
+            files.extend(sorted(glob.glob(name, recursive=recursive)))
+        else:
+            files.append(name)
+    return list(dict.fromkeys(os.path.normpath(path) for path in files))
+
+
+def run_batch(jobs: list, workers: int = None, maya=False):
+    """Yield the result of every job as soon as it's done, in completion order
+
+    A pool of workers processes runs the jobs (os.cpu_count() by default), at most
+    a few per worker are submitted ahead so a huge batch doesn't queue everything.
+    workers=1 runs them one after the other in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        initialize_worker(maya)
+        for job in jobs:
+            yield process_file(job)
+        return
+
+    pending = iter(jobs)
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=initialize_worker, initargs=(maya,))
+    try:
+        running = {pool.submit(process_file, job) for job in _take(pending, workers * 4)}
+        while running:
+            done, running = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            running |= {pool.submit(process_file, job) for job in _take(pending, len(done))}
+            for future in done:
+                yield future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _take(iterator, count: int) -> list:
+    return [job for _, job in zip(range(count), iterator)]
+
+# endregion
+
+
+# region -- Command line
+def format_result(result: dict) -> str:
+    joints = f"{result['joints']:7d} joints" if "joints" in result else " " * 14
+    line = f"{result['status']:<8} {result['seconds']:8.2f}s {joints}  {result['file']}"
+    if result["status"] == "ok" and result.get("output"):
+        line += f" -> {result['output']}"
+    if "commands" in result:
+        line += f" ({result['commands']} maya commands)"
+    if "message" in result:
+        line += f" : {result['message']}"
+    return line
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("operation", choices=OPERATIONS)
+    parser.add_argument("inputs", nargs="+", help="files, directories or glob patterns")
+    parser.add_argument("-o", "--output-dir", help="write the results there, next to the inputs by default")
+    parser.add_argument("--in-place", action="store_true", help="overwrite the input files (mirror, resuffix)")
+    parser.add_argument("--to", help="extension of the written files : .json or .jhb, .ma or .mb for rebuild")
+    parser.add_argument("--suffix", default="", help="new suffix of the joint names (resuffix, mirror, rebuild)")
+    parser.add_argument("--mirror", action="store_true", help="rebuild the joints mirrored on -X / +X")
+    parser.add_argument("--root", help="root joint written by export")
+    parser.add_argument("--dry-run", action="store_true", help="rebuild against fakeCmds.FakeCmds, no maya needed")
+    parser.add_argument("-r", "--recursive", action="store_true", help="look for files in sub directories too")
+    parser.add_argument("-j", "--workers", type=int, default=0, help="worker processes, one per core by default")
+    parser.add_argument("--no-fsync", action="store_true", help="don't flush every written file to disk")
+    parser.add_argument("--json", action="store_true", help="print one json object per file instead of a line")
+    args = parser.parse_args(argv)
+
+    if args.operation == "resuffix" and not args.suffix:
+        parser.error("resuffix needs --suffix")
+    if args.operation == "export" and not args.root:
+        parser.error("export needs --root")
+    if args.in_place and args.operation not in ("mirror", "resuffix"):
+        parser.error("--in-place only applies to mirror and resuffix")
+    if args.to and not args.to.startswith("."):
+        args.to = "." + args.to
+    if args.to and args.to.lower() not in (SCENE_EXTENSIONS if args.operation == "rebuild" else HIERARCHY_EXTENSIONS):
+        parser.error(f"{args.operation} can't write {args.to} files")
+    if args.workers < 0:
+        parser.error("--workers must be 0 (one per core) or more")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    options = {
+        "operation": args.operation,
+        "output_dir": args.output_dir,
+        "in_place": args.in_place,
+        "to": args.to.lower() if args.to else None,
+        "suffix": args.suffix,
+        "mirror": args.mirror,
+        "root": args.root,
+        "dry_run": args.dry_run,
+        "fsync": not args.no_fsync,
+    }
+
+    maya = needs_maya(options)
+    if maya and importlib.util.find_spec("maya") is None:
+        print(f"{args.operation} needs maya, run it with mayapy (or rebuild --dry-run)", file=sys.stderr)
+        return 2
+
+    extensions = SCENE_EXTENSIONS if args.operation == "export" else HIERARCHY_EXTENSIONS
+    files = find_files(args.inputs, extensions, args.recursive)
+    if not files:
+        print("No input file", file=sys.stderr)
+        return 2
+
+    jobs = [(file_name, output_path(file_name, options), options) for file_name in files]
+    outputs = [output for _, output, _ in jobs if output is not None]
+    if len(set(map(os.path.abspath, outputs))) != len(outputs):
+        print("Several inputs would be written to the same file, use separate --output-dir", file=sys.stderr)
+        return 2
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    statuses = dict.fromkeys(("ok", "invalid", "failed"), 0)
+    start = time.perf_counter()
+    for result in run_batch(jobs, args.workers, maya):
+        statuses[result["status"]] += 1
+        print(json.dumps(result) if args.json else format_result(result), flush=True)
+
+    summary = ", ".join(f"{count} {status}" for status, count in statuses.items())
+    print(f"{len(jobs)} files : {summary} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0 if statuses["ok"] == len(jobs) else 1
+
+# endregion
+
+
+if __name__ == '__main__':
+    sys.exit(main())
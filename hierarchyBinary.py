@@ -0,0 +1,114 @@
+"""Compact binary container for joint hierarchies (.jhb files).
+
+JsonInteract.json_read / json_write use it for the files ending with JsonInteract.BINARY_EXTENSIONS.
+Every number is little-endian and every section starts on an 8 bytes boundary :
+
+    header      magic b"JHB\\0", version, flags, joint count, string count,
+                then the byte offset of each of the sections below
+    parents     int32[count], -1 for the root
+    names       uint32[count], index of each joint name in the string table
+    keys        uint32[count], index of each children key in the string table
+    transforms  float32 or float64[count, 6], position xyz then rotation xyz
+    offsets     uint64[strings + 1], start of each string in the blob
+    blob        utf-8 strings, names and keys stored once
+
+The numeric sections are read with numpy.frombuffer, straight from a memory-mapped file.
+Transforms are stored as floats : integer positions or rotations come back as floats
+(1 as 1.0), equal in python but written 1.0 in a json made from the decoded data.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+
+import numpy as np
+
+from jointTable import JointTable
+
+MAGIC = b"JHB\0"
+VERSION = 1
+FLAG_FLOAT32 = 1
+
+# magic, version, flags, count, strings, offsets of parents, names, keys, transforms, string offsets, blob
+_HEADER = struct.Struct("<4sHHII6Q")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def encode(table: JointTable, float32=False) -> bytes:
+    """Return the binary form of a JointTable"""
+    count = len(table)
+
+    strings = {}  # string -> index, names and keys share the table
+    names = np.array([strings.setdefault(name, len(strings)) for name in table.names.tolist()], dtype="<u4")
+    keys = np.array([strings.setdefault(key, len(strings)) for key in table.keys.tolist()], dtype="<u4")
+
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+
+    transforms = np.hstack((table.positions, table.rotations)).astype("<f4" if float32 else "<f8")
+
+    sections = [
+        table.parents.astype("<i4").tobytes(),
+        names.tobytes(),
+        keys.tobytes(),
+        transforms.tobytes(),
+        offsets.tobytes(),
+        b"".join(encoded),
+    ]
+
+    starts = []
+    position = _align(_HEADER.size)
+    for section in sections:
+        starts.append(position)
+        position = _align(position + len(section))
+
+    header = _HEADER.pack(MAGIC, VERSION, FLAG_FLOAT32 if float32 else 0, count, len(encoded), *starts)
+
+    buffer = bytearray(position)
+    buffer[:len(header)] = header
+    for start, section in zip(starts, sections):
+        buffer[start:start + len(section)] = section
+
+    return bytes(buffer)
+
+
+def decode(buffer) -> JointTable:
+    """Return the JointTable stored in a bytes-like object (bytes, mmap, ...)"""
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Not a joint hierarchy binary file : too short")
+
+    magic, version, flags, count, string_count, *starts = _HEADER.unpack_from(buffer, 0)
+
+    if magic != MAGIC:
+        raise ValueError("Not a joint hierarchy binary file : bad magic")
+    if version > VERSION:
+        raise ValueError(f"Joint hierarchy binary version {version} is newer than {VERSION}")
+
+    parents_at, names_at, keys_at, transforms_at, offsets_at, blob_at = starts
+    float_type = "<f4" if flags & FLAG_FLOAT32 else "<f8"
+
+    parents = np.frombuffer(buffer, dtype="<i4", count=count, offset=parents_at)
+    names = np.frombuffer(buffer, dtype="<u4", count=count, offset=names_at)
+    keys = np.frombuffer(buffer, dtype="<u4", count=count, offset=keys_at)
+    transforms = np.frombuffer(buffer, dtype=float_type, count=count * 6, offset=transforms_at).reshape(count, 6)
+    offsets = np.frombuffer(buffer, dtype="<u8", count=string_count + 1, offset=offsets_at).tolist()
+
+    blob = bytes(buffer[blob_at:blob_at + offsets[-1]])
+    strings = np.array([blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(string_count)], dtype=str)
+
+    return JointTable(strings[names] if count else [], strings[keys] if count else [], parents,
+                      transforms[:, :3], transforms[:, 3:])
+
+
+def read(file_name: str) -> JointTable:
+    """Read a binary hierarchy file through a memory map"""
+    with open(file_name, mode="rb") as read_file:
+        buffer = mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # float64 transforms stay views on the map, numpy keeps it open as long as they live
+    return decode(buffer)
@@ -0,0 +1,182 @@
+"""Round trip checks of the .jhb codec of hierarchyBinary and JsonInteract.
+
+Hierarchies are written and read back through encode/decode, hierarchyBinary.read
+and JsonInteract.json_read with and without its cache, and compared with what was
+written. No Qt or maya is needed :
+    python hierarchyBinaryChecks.py --joints 20000
+
+An assert fails if a round trip loses something.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import random
+import tempfile
+
+import numpy as np
+
+import hierarchyBinary
+from hierarchyInteract import JsonInteract
+from jointTable import JointTable
+
+
+# region -- Hierarchies
+def joint(name: str, pos, rot, children: dict = None) -> dict:
+    datas = {"1_name": name, "2_pos": list(pos), "2_rot": list(rot)}
+    if children:
+        datas["3_children"] = children
+    return datas
+
+
+def odd_hierarchy() -> dict:
+    """A small hierarchy with what a codec could get wrong"""
+    return joint("root", (0.0, -0.0, 1e-300), (1.7976931348623157e308, -2.5e-8, 0.1), {
+        "épaule_gauche": joint("épaule_gauche", (1.5, 2.25, -3.125), (90.0, -45.0, 180.0), {
+            "肘": joint("肘", (0.1 + 0.2, 1 / 3, -7.0), (0.0, 0.0, 0.0)),
+        }),
+        "key_not_name": joint("other_name", (10.0, 20.0, 30.0), (1.0, 2.0, 3.0)),
+        "same": joint("same", (-1.0, -2.0, -3.0), (4.0, 5.0, 6.0)),  # key and name share a string
+        "": joint("empty key", (0.5, 0.5, 0.5), (0.0, 0.0, 0.0)),
+    })
+
+
+def chain(depth: int) -> dict:
+    """A single branch depth joints deep"""
+    datas = joint(f"joint{depth - 1:05d}", (0.0, 1.0, 0.0), (0.0, 0.0, 0.0))
+    for index in reversed(range(depth - 1)):
+        datas = joint(f"joint{index:05d}", (0.0, 1.0, 0.0), (0.0, 0.0, 0.0), {datas["1_name"]: datas})
+    return datas
+
+
+def random_hierarchy(joints: int, seed: int = 0) -> dict:
+    """A random tree of joints with random float transforms"""
+    rng = random.Random(seed)
+    root = joint("root_jnt", (0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+    nodes = [root]
+    for index in range(1, joints):
+        parent = nodes[rng.randrange(len(nodes))]
+        child = joint(f"joint{index:06d}_jnt", (rng.uniform(-100, 100) for _ in range(3)),
+                      (rng.uniform(-180, 180) for _ in range(3)))
+        parent.setdefault("3_children", {})[child["1_name"]] = child
+        nodes.append(child)
+    return root
+
+
+def same_hierarchy(result: dict, expected: dict, floats=False) -> bool:
+    """Compare two hierarchies, with floats=True every transform of result has to be a float"""
+    stack = [(result, expected)]
+    while stack:
+        result, expected = stack.pop()
+        if result.keys() != expected.keys() or result["1_name"] != expected["1_name"]:
+            return False
+        for key in ("2_pos", "2_rot"):
+            if result[key] != expected[key]:
+                return False
+            if floats and not all(type(value) is float for value in result[key]):
+                return False
+        children = result.get("3_children", {})
+        if list(children) != list(expected.get("3_children", {})):
+            return False
+        stack.extend((children[key], expected["3_children"][key]) for key in children)
+    return True
+
+# endregion
+
+
+# region -- Checks
+def check_codec():
+    """encode / decode, float64 and float32"""
+    for datas, float32 in ((odd_hierarchy(), False), (chain(2000), True), (random_hierarchy(500), True)):
+        table = JointTable.from_hierarchy(datas)
+        decoded = hierarchyBinary.decode(hierarchyBinary.encode(table))
+        assert same_hierarchy(decoded.to_hierarchy(), datas), "float64 round trip isn't lossless"
+
+        if float32:  # odd_hierarchy holds values a float32 can't
+            decoded = hierarchyBinary.decode(hierarchyBinary.encode(table, float32=True))
+            assert decoded.names.tolist() == table.names.tolist() and decoded.keys.tolist() == table.keys.tolist()
+            assert np.array_equal(decoded.parents, table.parents)
+            assert np.allclose(decoded.positions, table.positions, atol=1e-4)
+            assert np.allclose(decoded.rotations, table.rotations, atol=1e-4)
+    print(f"{'encode / decode':<40} ok")
+
+
+def check_integers():
+    """Integer transforms come back as equal floats"""
+    datas = joint("root", (1, 2, 3), (0, 90, -180), {"child": joint("child", (4, 5.5, 6), (7, 8, 9))})
+    decoded = hierarchyBinary.decode(hierarchyBinary.encode(JointTable.from_hierarchy(datas))).to_hierarchy()
+    assert same_hierarchy(decoded, datas, floats=True)
+    print(f"{'integer transforms':<40} ok, read back as floats")
+
+
+def check_invalid():
+    raw = hierarchyBinary.encode(JointTable.from_hierarchy(odd_hierarchy()))
+    newer = raw[:4] + (hierarchyBinary.VERSION + 1).to_bytes(2, "little") + raw[6:]
+    for name, buffer in (("empty", b""), ("truncated", raw[:20]), ("bad magic", b"JSON" + raw[4:]), ("newer", newer)):
+        try:
+            hierarchyBinary.decode(buffer)
+        except ValueError:
+            continue
+        raise AssertionError(f"a {name} file was decoded")
+    print(f"{'invalid files':<40} ok")
+
+
+def check_files(directory: str, joints: int):
+    """json_write then read back .jhb files, mapped, with and without the cache"""
+    datas = random_hierarchy(joints, seed=1)
+    binary = os.path.join(directory, "rig.jhb")
+    text = os.path.join(directory, "rig.json")
+    JsonInteract.json_write(datas, binary, fsync=False)
+    JsonInteract.json_write(datas, text, fsync=False)
+
+    table = hierarchyBinary.read(binary)
+    assert same_hierarchy(table.to_hierarchy(), datas, floats=True)
+    del table  # releases the memory map
+
+    # the cached read goes through a memory map too
+    buffers = []
+    decode = hierarchyBinary.decode
+    hierarchyBinary.decode = lambda buffer: buffers.append(type(buffer)) or decode(buffer)
+    try:
+        JsonInteract.cache.clear()
+        cached = JsonInteract.json_read(binary)
+        assert JsonInteract.json_read(binary) is cached, "the second read should be a cache hit"
+        uncached = JsonInteract.json_read(binary, cache=False)
+    finally:
+        hierarchyBinary.decode = decode
+    assert buffers == [mmap.mmap, mmap.mmap], buffers
+
+    assert same_hierarchy(cached, datas, floats=True)
+    assert same_hierarchy(uncached, datas, floats=True)
+    assert same_hierarchy(cached, JsonInteract.json_read(text)), ".jhb and .json files differ"
+
+    # touched without a change : the content hash keeps the entry, edited : read again
+    stats = JsonInteract.cache.stats()
+    os.utime(binary, ns=(os.stat(binary).st_atime_ns, os.stat(binary).st_mtime_ns + 10 ** 9))
+    assert JsonInteract.json_read(binary) is cached
+    assert JsonInteract.cache.stats()["misses"] == stats["misses"]
+
+    datas["2_pos"] = [1.0, 2.0, 3.0]
+    JsonInteract.json_write(datas, binary, fsync=False)
+    assert JsonInteract.json_read(binary)["2_pos"] == [1.0, 2.0, 3.0]
+    print(f"{'json_write / json_read .jhb':<40} ok, {joints} joints")
+
+# endregion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--joints", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    check_codec()
+    check_integers()
+    check_invalid()
+    with tempfile.TemporaryDirectory() as directory:
+        check_files(directory, args.joints)
+
+
+if __name__ == '__main__':
+    main()
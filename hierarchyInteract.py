@@ -0,0 +1,942 @@
+"""File and maya side of jsonJointHierarchy, without any Qt import.
+
+    JsonInteract    read/write hierarchy files (json, or .jhb through hierarchyBinary)
+    MayaInteract    capture and create joint hierarchies with maya.cmds or a stand-in
+    ParseCache      the parsed files shared by JsonInteract.json_read
+
+jsonJointHierarchy re-exports them for the Ui, hierarchyBatch runs them on the
+farm where Qt isn't available.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import re
+import threading
+import uuid
+
+from profiling import profiled, profiler
+from treeWalk import walk
+
+try:
+    import fcntl
+except ImportError:  # windows, JsonInteract.json_write can't lock
+    fcntl = None
+
+try:
+    import maya.cmds as cmds
+except ImportError:  # outside of maya, give MayaInteract a cmds_backend (see fakeCmds.py)
+    cmds = None
+
+
+class ParseCache:
+    """Process-wide LRU cache of parsed hierarchy files
+
+    Entries are keyed by absolute path and checked against the file's inode, mtime
+    and size, so a file replaced or edited by another process is read again. When
+    only the stat changed, the content hash decides if the file needs parsing again.
+    The cost of an entry is the size of its file, least recently used entries are
+    evicted once the total goes over max_bytes.
+
+    The cached data is shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()  # path -> (stat key, digest, data, cost)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_key(stat: os.stat_result) -> tuple:
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def lookup(self, file_name):
+        """Return the cached data of file_name if the file didn't change, else None"""
+        path = os.path.abspath(file_name)
+        try:
+            stat_key = self._stat_key(os.stat(path))
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != stat_key:
+                return None
+
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[2]
+
+    def get(self, file_name, parse, mapped=False):
+        """Return the data of file_name, calling parse(raw bytes) only on a cache miss
+
+        With mapped=True parse gets a read-only memory map of the file instead of a copy
+        of its bytes, the map is closed once nothing refers to it anymore.
+        """
+        data = self.lookup(file_name)
+        if data is not None:
+            return data
+
+        path = os.path.abspath(file_name)
+        with open(path, mode="rb") as read_file:
+            stat = os.fstat(read_file.fileno())
+            stat_key = self._stat_key(stat)
+            if mapped and stat.st_size:
+                raw = mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                raw = read_file.read()
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[1] == digest:  # touched or rewritten with the same content
+                self._entries[path] = (stat_key,) + entry[1:]
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+
+        data = parse(raw)
+
+        with self._lock:
+            self.misses += 1
+            self._remove(path)
+            if len(raw) <= self.max_bytes:
+                self._entries[path] = (stat_key, digest, data, len(raw))
+                self._size += len(raw)
+                while self._size > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+
+        return data
+
+    def discard(self, file_name):
+        with self._lock:
+            self._remove(os.path.abspath(file_name))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._size -= entry[3]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class JsonInteract:
+    """Read and write hierarchy files
+
+    The codec is picked from the file extension : json for any file, except the
+    BINARY_EXTENSIONS ones (.jhb) which use the hierarchyBinary container.
+    """
+
+    BINARY_EXTENSIONS = (".jhb",)
+    FSYNC = True
+    LOCK = False
+
+    cache = ParseCache()  # shared by every json_read of the process
+
+    def is_binary(file_name):
+        return str(file_name).lower().endswith(JsonInteract.BINARY_EXTENSIONS)
+
+    def json_write(data, file_name, fsync=None, lock=None):
+        """Write data to file_name atomically
+
+        The whole file is serialized in memory, written to a temporary file next to
+        file_name, optionally fsync'ed, then renamed over file_name. Readers see the old
+        or the new file, never a half written one, even if the process dies.
+        data may also be a JsonModel, its json is then streamed to the temporary file
+        from the items (JsonModel.write_json).
+
+        Arguments:
+            fsync (bool): flush the file and its directory to disk, defaults to JsonInteract.FSYNC
+            lock (bool): hold an advisory lock on file_name + ".lock" while writing, so
+                concurrent writers of the same file take turns, defaults to JsonInteract.LOCK
+        """
+        fsync = JsonInteract.FSYNC if fsync is None else fsync
+        lock = JsonInteract.LOCK if lock is None else lock
+
+        data, payload = _payload(data, file_name)
+
+        with _write_lock(file_name, lock):
+            _atomic_write(file_name, payload, fsync)
+        JsonInteract.cache.discard(file_name)
+
+        return data
+
+    def json_merge(branches, paths, file_name, fsync=None, lock=None):
+        """Replace the joints at paths in file_name by the ones of branches, return the merged data
+
+        branches is a partial hierarchy (MayaInteract.capture_branches) holding at least
+        the joints of paths, keys from the root. The file is read (from the cache when it
+        didn't change) and only the joints leading to the branches are copied, see
+        merge_branches. In a json file, only the text of the branches is serialized
+        again and spliced between the untouched bytes of the file (_splice_branches),
+        the whole file is written again when a joint on the way to a branch is new.
+        Everything happens under a single lock so concurrent merges of the same file
+        don't lose each other's branches. A missing file is written with branches as they are.
+        """
+        fsync = JsonInteract.FSYNC if fsync is None else fsync
+        lock = JsonInteract.LOCK if lock is None else lock
+
+        with _write_lock(file_name, lock):
+            exists = os.path.exists(file_name)
+            datas = merge_branches(JsonInteract.json_read(file_name) if exists else None, branches, paths)
+
+            payload = None
+            if exists and not JsonInteract.is_binary(file_name):
+                payload = _splice_branches(file_name, datas, paths)
+            if payload is None:
+                datas, payload = _payload(datas, file_name)
+
+            _atomic_write(file_name, payload, fsync)
+        JsonInteract.cache.discard(file_name)
+
+        return datas
+
+    def json_read(file_name, cache=True):
+        """Return the data of a hierarchy file
+
+        With cache=True, the result comes from JsonInteract.cache when the file didn't
+        change since it was last parsed, it is shared and must not be modified.
+        A binary file is always read through a memory map, like hierarchyBinary.read,
+        its positions and rotations come back as floats (see hierarchyBinary).
+        """
+        if JsonInteract.is_binary(file_name):
+            import hierarchyBinary
+
+            if not cache:
+                return hierarchyBinary.read(file_name).to_hierarchy()
+
+            def parse(buffer):
+                return hierarchyBinary.decode(buffer).to_hierarchy()
+
+            return JsonInteract.cache.get(file_name, parse, mapped=True)
+
+        if not cache:
+            with open(file_name, mode="r", encoding="utf-8") as read_file:
+                return json.load(read_file)
+
+        return JsonInteract.cache.get(file_name, json.loads)
+
+    def json_root(file_name):
+        """Return the name of the root joint of a hierarchy file, None if it has none or can't be read
+
+        Only what's needed is read : the cached data, the names of a binary file, or the
+        json tokens up to the root's "1_name", whether the file was loaded or streamed.
+        """
+        datas = JsonInteract.cache.lookup(file_name)
+        if datas is not None:
+            return datas.get("1_name") if isinstance(datas, dict) else None
+
+        try:
+            if JsonInteract.is_binary(file_name):
+                import hierarchyBinary
+
+                table = hierarchyBinary.read(file_name)
+                return str(table.names[0]) if len(table) else None
+
+            with contextlib.closing(JsonInteract.json_events(file_name)) as events:
+                depth = 0
+                key = None
+                for event, value in events:
+                    if event == "key":
+                        key = value
+                    elif event == "value":
+                        if depth == 1 and key == "1_name":
+                            return value if isinstance(value, str) else None
+                    elif event.startswith("start"):
+                        if not depth and event != "start_map":
+                            return None
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if not depth:
+                            return None
+
+        except (OSError, ValueError):  # json_merge reports a missing or broken file
+            return None
+
+    def json_events(file_name, progress=None):
+        """Parse a json file incrementally, yielding (event, value) tuples
+
+        The file is memory-mapped and tokenized as the generator is consumed, so
+        nothing but the current token is held in memory. Events are :
+            ("start_map", None), ("end_map", None), ("start_array", None),
+            ("end_array", None), ("key", str), ("value", scalar)
+
+        progress, if given, is called with (bytes parsed, file size) every few thousand tokens.
+        """
+        with open(file_name, mode="rb") as read_file:
+            if not os.fstat(read_file.fileno()).st_size:
+                raise ValueError(f"{file_name} : empty json file")
+
+            with mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from _json_tokens(buffer, progress)
+
+
+def _payload(data, file_name) -> tuple:
+    """Return (data, payload of _atomic_write) of data written as file_name"""
+    if JsonInteract.is_binary(file_name):
+        import hierarchyBinary  # needs numpy, only imported for binary files
+        from jointTable import JointTable
+
+        if hasattr(data, "write_json"):
+            data = data.to_json()
+        return data, hierarchyBinary.encode(JointTable.from_hierarchy(data))
+
+    if hasattr(data, "write_json"):
+        return data, lambda write_file: data.write_json(write_file, indent=2)
+
+    return data, json.dumps(data, indent=2).encode("utf-8")
+
+
+_scan_value = json.scanner.make_scanner(json.JSONDecoder())  # (text, start) -> (value, end), in C
+_scan_string = json.decoder.scanstring
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _member_start(text: str, pos: int, name: str):
+    """Return where the value of key name starts in the json object at pos, None if it has no such key"""
+    skip = _WHITESPACE.match
+    if text[pos] != "{":
+        return None
+    pos = skip(text, pos + 1).end()
+
+    while text[pos] == '"':
+        key, pos = _scan_string(text, pos + 1)
+        pos = skip(text, pos).end()
+        if text[pos] != ":":
+            return None
+        pos = skip(text, pos + 1).end()
+        if key == name:
+            return pos
+
+        pos = skip(text, _scan_value(text, pos)[1]).end()  # the other members are parsed by the C scanner
+        if text[pos] != ",":
+            return None
+        pos = skip(text, pos + 1).end()
+
+    return None
+
+
+def _branch_span(text: str, path: tuple):
+    """Return the (start, end) characters of the joint at path in a hierarchy json text, None if it isn't there"""
+    pos = _WHITESPACE.match(text).end()
+    for key in path:
+        pos = _member_start(text, pos, "3_children")
+        if pos is None:
+            return None
+        pos = _member_start(text, pos, key)
+        if pos is None:
+            return None
+    return pos, _scan_value(text, pos)[1]
+
+
+def _splice_branches(file_name, datas: dict, paths) -> bytes:
+    """Return the json of file_name with the joints at paths taken from datas, None if one of them isn't in the file
+
+    The branches are dumped with the indentation json_write gives them at their depth,
+    the rest of the file is kept as it is.
+    """
+    with open(file_name, mode="rb") as read_file:
+        text = read_file.read().decode("utf-8")
+
+    spans = []
+    try:
+        for path in outermost_paths(paths):
+            if not path:
+                return None
+            span = _branch_span(text, path)
+            if span is None:
+                return None
+            spans.append((span, path))
+    except (IndexError, StopIteration, ValueError):  # not the json of a hierarchy, write it whole
+        return None
+
+    pieces = []
+    end = 0
+    for (start, stop), path in sorted(spans):
+        # a joint at depth n is inside 2n containers (the joints and their "3_children")
+        branch_text = json.dumps(branch(datas, path), indent=2).replace("\n", "\n" + "  " * (2 * len(path)))
+        pieces.append(text[end:start])
+        pieces.append(branch_text)
+        end = stop
+    pieces.append(text[end:])
+
+    return "".join(pieces).encode("utf-8")
+
+
+def _atomic_write(file_name, payload, fsync: bool):
+    """Write payload to a temporary file in the same directory and rename it over file_name
+
+    payload is bytes, or a callable writing into the binary file object it gets.
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    temp_name = os.path.join(
+        directory, f".{os.path.basename(file_name)}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+
+    # os.open applies the umask like a plain open() would, unlike tempfile.mkstemp
+    fd = os.open(temp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, mode="wb") as write_file:
+            if callable(payload):
+                payload(write_file)
+            else:
+                write_file.write(payload)
+            if fsync:
+                write_file.flush()
+                os.fsync(write_file.fileno())
+
+        os.replace(temp_name, file_name)
+
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_name)
+        raise
+
+    if fsync and hasattr(os, "O_DIRECTORY"):  # make the rename itself durable (posix only)
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+@contextlib.contextmanager
+def _write_lock(file_name, lock: bool):
+    """Hold an exclusive advisory lock on file_name + ".lock" (no-op without fcntl)"""
+    if not lock or fcntl is None:
+        yield
+        return
+
+    with open(f"{file_name}.lock", mode="a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+_JSON_TOKEN = re.compile(
+    rb'[ \t\n\r]*([,:]?)[ \t\n\r]*(?:'  # 1 : separator before the token, checked by _json_tokens
+    rb'([{}\[\]])'  # 2 : structural character
+    rb'|("[^"\\]*(?:\\.[^"\\]*)*")'  # 3 : string
+    rb'|(-?\d+(?:(\.\d+)?([eE][+-]?\d+)?))'  # 4 : number, 5/6 : float parts
+    rb'|(true|false|null))'  # 7 : constant
+)
+_JSON_TRAILING = re.compile(rb'[ \t\n\r]*')
+_JSON_CONSTANTS = {b"true": True, b"false": False, b"null": None}
+_JSON_STRUCTURE = {
+    ord("{"): "start_map", ord("}"): "end_map", ord("["): "start_array", ord("]"): "end_array"
+}
+
+
+def _json_tokens(buffer, progress=None):
+    """Yield the events of the json document held in buffer (see JsonInteract.json_events)
+
+    Raise ValueError on the first byte that isn't valid json, events before it are yielded.
+    """
+    match_token = _JSON_TOKEN.match
+    size = len(buffer)
+    pos = 0
+    in_map = []  # one flag per open container, True for a dict
+    expect_key = False
+    separator = b""  # needed before the next value : b"" first in a container, b"," after a value, b":" after a key
+    done = False  # the document's value is complete, only whitespace may follow
+    count = 0
+
+    while True:
+        count += 1
+        if progress is not None and not count % 4096:
+            progress(pos, size)
+
+        match = match_token(buffer, pos)
+        if match is None:
+            end = _JSON_TRAILING.match(buffer, pos).end()
+            if end == size and done:
+                if progress is not None:
+                    progress(size, size)
+                return
+            raise ValueError(f"Invalid json at byte {end}")
+
+        if done:
+            raise ValueError(f"Invalid json at byte {_JSON_TRAILING.match(buffer, pos).end()}, data after the document")
+
+        pos = match.end()
+        found, structure, string, number, fraction, exponent, constant = match.groups()
+        closing = structure is not None and structure in b"}]"
+
+        if closing:
+            # no separator before a closing bracket : [1,] or {"a"} are invalid
+            if found or separator == b":":
+                raise ValueError(f"Invalid json at byte {match.start(2)}")
+        elif found != separator or (expect_key and string is None):
+            start = match.start(1) if found else _JSON_TRAILING.match(buffer, match.end(1)).end()
+            raise ValueError(f"Invalid json at byte {start}")
+
+        if structure is not None:
+            event = _JSON_STRUCTURE[structure[0]]
+            if event == "start_map":
+                in_map.append(True)
+                expect_key = True
+                separator = b""
+            elif event == "start_array":
+                in_map.append(False)
+                expect_key = False
+                separator = b""
+            else:
+                if not in_map or in_map.pop() != (event == "end_map"):
+                    raise ValueError(f"Invalid json at byte {pos - 1}")
+                expect_key = bool(in_map) and in_map[-1]
+                separator = b","
+                done = not in_map
+            yield event, None
+            continue
+
+        if string is not None:
+            value = json.loads(string) if b"\\" in string else string[1:-1].decode("utf-8")
+            if expect_key:
+                expect_key = False
+                separator = b":"
+                yield "key", value
+                continue
+
+        elif number is not None:
+            value = float(number) if fraction or exponent else int(number)
+
+        else:
+            value = _JSON_CONSTANTS[constant]
+
+        expect_key = bool(in_map) and in_map[-1]
+        separator = b","
+        done = not in_map
+        yield "value", value
+
+
+class MayaInteract(object):
+    def __init__(self, *args, cmds_backend=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # maya.cmds, or a stand-in with the same functions (fakeCmds.FakeCmds)
+        self.cmds = cmds_backend if cmds_backend is not None else cmds
+
+    @property
+    def cmds(self):
+        """The cmds backend, every command timed while the profiler is enabled"""
+        if profiler.enabled:
+            return profiler.wrap_cmds(self._cmds)
+        return self._cmds
+
+    @cmds.setter
+    def cmds(self, backend):
+        self._cmds = backend
+
+    @profiled("MayaInteract.get_hierarchy")
+    def get_hierarchy(self, batched=True):
+        hierarchy = {"1_name": 0, "2_pos": 0, "2_rot": 0}
+
+        # get the hierarchy of your scene
+        sel = self.cmds.ls(selection=True)
+
+        if not sel:
+          print("Must select a hierarchy")
+          return
+
+        else:
+          root = sel[0]
+
+        if batched:
+            self.datas = self.capture_hierarchy(root)
+        else:
+            self.datas = MayaInteract.get_children(self, root, hierarchy)
+
+        return self.datas
+
+    def capture_hierarchy(self, root):
+        """Return the hierarchy dict of root with a fixed number of maya commands
+
+        All the descendants are listed in one listRelatives call and their world
+        transforms queried in one xform call per attribute, then the nested dict is
+        assembled in a single loop instead of one recursion (and three commands) per joint.
+        """
+        root_path = self.cmds.ls(root, long=True)[0]
+        # maya lists the descendants in reversed pre-order, parents end up before their children
+        paths = [root_path] + (self.cmds.listRelatives(root, allDescendents=True, fullPath=True) or [])[::-1]
+
+        positions = self.cmds.xform(paths, ws=True, q=True, t=True)
+        rotations = self.cmds.xform(paths, ws=True, q=True, ro=True)
+        profiler.count("joints.captured", len(paths))
+
+        nodes = {}
+        for index, path in enumerate(paths):
+            parent_path, _, name = path.rpartition("|")
+            start = index * 3
+
+            hierarchy = {
+                "1_name": root if index == 0 else name,
+                "2_pos": positions[start:start + 3],
+                "2_rot": rotations[start:start + 3],
+            }
+            nodes[path] = hierarchy
+
+            if index:
+                parent = nodes[parent_path]
+                parent.setdefault("3_children", {})[name] = hierarchy
+
+        return nodes[root_path]
+
+    @profiled("MayaInteract.get_branches")
+    def get_branches(self, root=None):
+        """Capture the selected joints and everything below them, see capture_branches"""
+        sel = self.cmds.ls(selection=True, long=True)
+
+        if not sel:
+          print("Must select a hierarchy")
+          return
+
+        self.datas, self.paths = self.capture_branches(sel, root)
+        return self.datas, self.paths
+
+    def capture_branches(self, joints, root=None):
+        """Return (partial hierarchy, paths) of several joints and their descendants
+
+        The partial hierarchy starts at root, the top of the first joint's path by
+        default, and only holds the joints leading to each branch, so JsonInteract.json_merge
+        or merge_branches can put them in place in a whole hierarchy. paths are the keys
+        from root to each captured joint, joints below another captured one are in its branch.
+        Like capture_hierarchy, it runs four maya commands whatever the number of branches.
+        """
+        long_names = list(dict.fromkeys(self.cmds.ls(joints, long=True)))
+        selected = set(long_names)
+        tops = [path for path in long_names if not any(
+            path.startswith(other + "|") for other in selected)]
+
+        root = root or tops[0].split("|")[1]
+        spine = {}  # long path -> None, the joints from root to each branch, parents first
+        paths = []
+        for path in tops:
+            names = path.split("|")[1:]
+            if root not in names:
+                raise ValueError(f"{path} isn't under {root}")
+
+            start = names.index(root)
+            paths.append(tuple(names[start + 1:]))
+            for end in range(start + 1, len(names) + 1):
+                spine["|" + "|".join(names[:end])] = None
+
+        # maya lists the descendants in reversed pre-order, parents end up before their children
+        descendants = (self.cmds.listRelatives(tops, allDescendents=True, fullPath=True) or [])[::-1]
+        all_paths = list(spine) + descendants
+
+        positions = self.cmds.xform(all_paths, ws=True, q=True, t=True)
+        rotations = self.cmds.xform(all_paths, ws=True, q=True, ro=True)
+        profiler.count("joints.captured", len(all_paths))
+
+        nodes = {}
+        root_path = next(iter(spine))
+        for index, path in enumerate(all_paths):
+            parent_path, _, name = path.rpartition("|")
+            start = index * 3
+
+            hierarchy = {
+                "1_name": name,
+                "2_pos": positions[start:start + 3],
+                "2_rot": rotations[start:start + 3],
+            }
+            nodes[path] = hierarchy
+
+            if path != root_path:
+                nodes[parent_path].setdefault("3_children", {})[name] = hierarchy
+
+        return nodes[root_path], paths
+
+    def get_children(self, obj, hierarchy):
+        # pre-order walk, one (object, hierarchy dict) node per joint
+
+        def enter(node, context):
+            obj, hierarchy = node
+
+            pos = self.cmds.xform(obj, ws=True, q=True, t=True)
+            rot = self.cmds.xform(obj, ws=True, q=True, ro=True)
+
+            hierarchy["1_name"] = obj
+            hierarchy["2_pos"] = pos
+            hierarchy["2_rot"] = rot
+
+        def children(node):
+            obj, hierarchy = node
+            children = self.cmds.listRelatives(obj, children=True, shapes=False) or []
+
+            if children:
+                hierarchy["3_children"] = {}  # initialise l'item children de cet etage de la hierarchie
+                for child in children:
+                    hierarchy["3_children"][child] = {}
+
+            return [(child, hierarchy["3_children"][child]) for child in children]
+
+        walk((obj, hierarchy), children, enter)
+
+        return hierarchy
+
+    @profiled("MayaInteract.create_hierarchy")
+    def create_hierarchy(self, datas, suffix="", symmetrize = None, bulk=True):
+        print("i create this : ")
+
+        if not isinstance(suffix, str):
+            raise TypeError(f"Provided suffix is not of stype string: {type(suffix)}> {suffix}")
+
+        if bulk:
+            with self.undo_chunk("create_hierarchy"):
+                return self.build_joints(datas, suffix, symmetrize)
+
+        self.create_children("", datas, suffix, symmetrize)
+
+    @contextlib.contextmanager
+    def undo_chunk(self, name="jsonJointHierarchy"):
+        """Group every maya command run inside the block into a single undo step"""
+        self.cmds.undoInfo(openChunk=True, chunkName=name)
+        try:
+            yield
+        finally:
+            self.cmds.undoInfo(closeChunk=True)
+
+    @staticmethod
+    def joint_name(name, suffix):
+        """Replace the suffix of a joint name (the part after the first '_') by suffix"""
+        base, separator, old_suffix = name.partition("_")
+        return (base if old_suffix else name) + suffix
+
+    def build_joints(self, datas, suffix="", symmetrize=False, parent=None):
+        """Create the joints of a hierarchy dict, parents first, without touching the selection
+
+        Joints are created with createNode directly under their parent, then their world
+        transforms are set in a second pass, in the same parent-first order so every
+        parent is already in place. That is two commands per joint instead of five.
+        The root joint is created under parent, if given.
+
+        Returns:
+            list: the created joint names, in creation order
+        """
+        created = []
+        ordered = []  # (joint, datas) in creation order
+
+        def enter(datas, parent):
+            name = self.joint_name(datas["1_name"], suffix)
+            if parent:
+                jnt = self.cmds.createNode("joint", name=name, parent=parent, skipSelect=True)
+            else:
+                jnt = self.cmds.createNode("joint", name=name, skipSelect=True)
+
+            created.append(jnt)
+            ordered.append((jnt, datas))
+            return jnt
+
+        walk(datas, _joint_children, enter, context=parent)
+
+        mirror = symmetrize != 0  # like create_children, only 0/False doesn't mirror, the None of create_hierarchy does
+        for jnt, datas in ordered:
+            pos = datas["2_pos"]
+            if mirror:
+                pos = [-pos[0], pos[1], pos[2]]
+            self.cmds.xform(jnt, ws=1, t=pos, ro=datas["2_rot"])
+
+        profiler.count("joints.created", len(created))
+        return created
+
+    @profiled("MayaInteract.create_branches")
+    def create_branches(self, datas, paths, suffix="", symmetrize=False):
+        """Rebuild only the joints at paths (keys from the root of datas) and below them
+
+        The joints of each branch are deleted and created again under their parent,
+        the rest of the hierarchy isn't touched. Missing parents are created on the
+        way, without their other children. A path under another one is rebuilt with it.
+
+        Returns:
+            list: the created joint names, in creation order
+        """
+        if not isinstance(suffix, str):
+            raise TypeError(f"Provided suffix is not of stype string: {type(suffix)}> {suffix}")
+
+        created = []
+        with self.undo_chunk("create_branches"):
+            for path in outermost_paths(paths):
+                parent = None
+                for datas_above, key in zip(_path_joints(datas, path), path):
+                    name = self.joint_name(datas_above["1_name"], suffix)
+                    if not self.cmds.objExists(name):
+                        name = self.build_joints(
+                            {key: value for key, value in datas_above.items() if key != "3_children"},
+                            suffix, symmetrize, parent)[0]
+                        created.append(name)
+                    parent = name
+
+                datas_branch = branch(datas, path)
+                name = self.joint_name(datas_branch["1_name"], suffix)
+                if self.cmds.objExists(name):
+                    self.cmds.delete(name)
+                created.extend(self.build_joints(datas_branch, suffix, symmetrize, parent))
+
+        return created
+
+    def build_table(self, table):
+        """Create the joints of a jointTable.JointTable, already renamed and mirrored
+
+        Rows are stored parents first, so a single ordered pass creates every joint
+        under its parent, then a second one sets the world transforms.
+
+        Returns:
+            list: the created joint names, one per row
+        """
+        created = []
+        with self.undo_chunk("build_table"):
+            for name, parent in zip(table.names.tolist(), table.parents.tolist()):
+                if parent >= 0:
+                    jnt = self.cmds.createNode("joint", name=name, parent=created[parent], skipSelect=True)
+                else:
+                    jnt = self.cmds.createNode("joint", name=name, skipSelect=True)
+                created.append(jnt)
+
+            for jnt, pos, rot in zip(created, table.positions.tolist(), table.rotations.tolist()):
+                self.cmds.xform(jnt, ws=1, t=pos, ro=rot)
+
+        profiler.count("joints.created", len(created))
+        return created
+
+    def create_children(self, parent, datas, suffix, symmetrize):
+        # pre-order walk, each joint is parented under the name returned for its parent
+
+        def enter(datas, parent):
+            #create joint with the datas provided in the json file
+            self.cmds.select(clear=1)
+
+            try :
+                if datas["1_name"].split('_')[1]: # if the joint already has a suffix
+                    name = datas["1_name"].split('_')[0] + suffix
+
+            except IndexError : # if it has no suffix at the beginning
+                name = datas["1_name"] + suffix
+
+            jnt = self.cmds.joint(name=name)
+
+            if symmetrize == 0: # if not symetrize
+                self.cmds.xform(jnt, ws=1, t = datas["2_pos"], ro=datas["2_rot"])
+
+            else: # if symmetrize
+                pos = datas["2_pos"]
+                sym_pos = [-pos[0], pos[1], pos[2]]
+                self.cmds.xform(jnt, ws=1, t = sym_pos, ro=datas["2_rot"])
+
+            if parent :
+                self.cmds.parent(jnt, parent)
+
+            self.cmds.select(clear=1)
+            profiler.count("joints.created")
+
+            return name
+
+        walk(datas, _joint_children, enter, context=parent)
+
+
+def _joint_children(datas):
+    """Return the children hierarchy dicts of a joint hierarchy dict"""
+    return list((datas.get("3_children") or {}).values())
+
+
+# region -- Branches, joints addressed by their keys from the root ("3_children" keys)
+def branch(datas, path) -> dict:
+    """Return the joint at path in a hierarchy dict, KeyError if it isn't there"""
+    for key in path:
+        datas = datas["3_children"][key]
+    return datas
+
+
+def _path_joints(datas, path):
+    """Yield the joints from the root down to the parent of the joint at path"""
+    for key in path:
+        yield datas
+        datas = datas["3_children"][key]
+
+
+def branch_path(keys) -> tuple:
+    """Return the path of the joint holding a value, from the keys leading to it
+
+    ["3_children", "spine", "3_children", "arm", "2_pos", 0] is in the joint ("spine", "arm").
+    """
+    keys = list(keys)
+    return tuple(key for previous, key in zip(keys, keys[1:]) if previous == "3_children")
+
+
+def outermost_paths(paths) -> list:
+    """Return paths without the ones under another path, in their first order"""
+    paths = list(dict.fromkeys(tuple(path) for path in paths))
+    kept = set(paths)
+    return [path for path in paths if not any(path[:end] in kept for end in range(len(path)))]
+
+
+def merge_branches(datas, branches, paths) -> dict:
+    """Return datas with its joints at paths replaced by the ones of the partial hierarchy branches
+
+    datas isn't modified, it may come from JsonInteract.cache : the joints from the root
+    down to each branch are copied and everything else is shared with the result, so
+    the work grows with the depth and the number of branches, not the size of datas.
+    Joints of branches missing in datas on the way are added without their other children.
+    """
+    paths = outermost_paths(paths)
+    if datas is None or () in paths:
+        return branches
+    if datas.get("1_name") != branches.get("1_name"):
+        raise ValueError(f"The branches are under {branches.get('1_name')}, not {datas.get('1_name')}")
+
+    merged = dict(datas)
+    copies = {(): merged}  # path -> copied joint of merged
+    own_children = set()  # ids of the copied joints whose "3_children" dict was copied too
+
+    for path in paths:
+        joint = merged
+        source = branches
+        for depth, key in enumerate(path, 1):
+            source = source["3_children"][key]
+
+            if depth == len(path):
+                child = source
+            else:
+                child = copies.get(path[:depth])
+                if child is None:
+                    old = (joint.get("3_children") or {}).get(key)
+                    if old is None:
+                        child = {name: value for name, value in source.items() if name != "3_children"}
+                    else:
+                        child = dict(old)
+                    copies[path[:depth]] = child
+
+            if id(joint) not in own_children:
+                joint["3_children"] = dict(joint.get("3_children") or {})
+                own_children.add(id(joint))
+            joint["3_children"][key] = child
+            joint = child
+
+    return merged
+
+# endregion
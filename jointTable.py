@@ -0,0 +1,157 @@
+"""Columnar representation of the joint hierarchies written by jsonJointHierarchy.
+
+A JointTable holds one row per joint, parents always before their children :
+    names      (N,)   joint names
+    keys       (N,)   key of the joint in its parent "3_children" dict
+    parents    (N,)   row of the parent joint, -1 for the root
+    positions  (N, 3) world positions ("2_pos")
+    rotations  (N, 3) world rotations ("2_rot")
+
+so symmetrize, re-suffixing and transform edits run on whole arrays at once :
+    table = JointTable.from_hierarchy(JsonInteract.json_read(path))
+    datas = table.symmetrize().resuffix("_R").to_hierarchy()
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from treeWalk import preorder
+
+
+class JointTable:
+    """Joint hierarchy stored as numpy arrays, one row per joint"""
+
+    def __init__(self, names, keys, parents, positions, rotations):
+        self.names = np.asarray(names, dtype=str)
+        self.keys = np.asarray(keys, dtype=str)
+        self.parents = np.asarray(parents, dtype=np.int64)
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.rotations = np.asarray(rotations, dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def __repr__(self) -> str:
+        root = self.names[0] if len(self) else None
+        return f"<JointTable {len(self)} joints, root={root}>"
+
+    def copy(self) -> "JointTable":
+        return JointTable(self.names.copy(), self.keys.copy(), self.parents.copy(),
+                          self.positions.copy(), self.rotations.copy())
+
+    # region -- Conversions
+    @classmethod
+    def from_hierarchy(cls, datas: dict) -> "JointTable":
+        """Build a table from a hierarchy dict ({"1_name", "2_pos", "2_rot", "3_children"})"""
+        names = []
+        keys = []
+        parents = []
+        positions = []
+        rotations = []
+        rows = {}  # id(hierarchy dict) -> row
+
+        def children(node):
+            datas = node[1]
+            return [(key, child, id(datas)) for key, child in (datas.get("3_children") or {}).items()]
+
+        for (key, datas, parent_id), _ in preorder(("", datas, None), children):
+            rows[id(datas)] = len(names)
+            names.append(datas["1_name"])
+            keys.append(key)
+            parents.append(rows[parent_id] if parent_id is not None else -1)
+            positions.append(datas["2_pos"])
+            rotations.append(datas["2_rot"])
+
+        return cls(names, keys, parents, positions, rotations)
+
+    def to_hierarchy(self) -> dict:
+        """Return the nested hierarchy dict of the table, in a single pass over the rows"""
+        names = self.names.tolist()
+        keys = self.keys.tolist()
+        parents = self.parents.tolist()
+        positions = self.positions.tolist()
+        rotations = self.rotations.tolist()
+
+        joints = []
+        for row, parent in enumerate(parents):
+            joint = {"1_name": names[row], "2_pos": positions[row], "2_rot": rotations[row]}
+            joints.append(joint)
+            if parent >= 0:
+                joints[parent].setdefault("3_children", {})[keys[row]] = joint
+
+        return joints[0] if joints else {}
+
+    # endregion
+
+    # region -- Queries
+    def children(self, row: int) -> np.ndarray:
+        """Return the rows of the direct children of a row"""
+        return np.flatnonzero(self.parents == row)
+
+    def descendants_mask(self, row: int) -> np.ndarray:
+        """Return a boolean mask of row and every joint below it"""
+        parents = self.parents
+        mask = np.arange(len(self)) == row
+
+        # climb one level per iteration for every joint at once, as many times as the depth
+        ancestors = parents.copy()
+        while True:
+            climbing = ancestors >= 0
+            if not climbing.any():
+                return mask
+            mask |= ancestors == row
+            ancestors = np.where(climbing, parents[ancestors], -1)
+
+    def find(self, name: str) -> int:
+        """Return the row of a joint name, -1 if it isn't in the table"""
+        rows = np.flatnonzero(self.names == name)
+        return int(rows[0]) if len(rows) else -1
+
+    # endregion
+
+    # region -- Vectorized edits, each returns a new table
+    def symmetrize(self, axis: int = 0) -> "JointTable":
+        """Mirror the positions on the given axis, like MayaInteract's symmetrize (-X / +X)"""
+        table = self.copy()
+        table.positions[:, axis] *= -1
+        return table
+
+    def resuffix(self, suffix: str) -> "JointTable":
+        """Replace the suffix of every name (the part after the first '_') by suffix
+
+        Names without suffix get suffix appended, like MayaInteract.joint_name.
+        """
+        table = self.copy()
+        parts = np.char.partition(self.names, "_")
+        bases = np.where(parts[:, 2] != "", parts[:, 0], self.names)
+        table.names = np.char.add(bases, suffix)
+        # children keys follow their joint name when they were the same
+        table.keys = np.where(self.keys == self.names, table.names, self.keys)
+        return table
+
+    def translate(self, offset, mask=None) -> "JointTable":
+        """Move the joints (all of them, or the ones selected by a boolean mask) by offset"""
+        table = self.copy()
+        if mask is None:
+            table.positions += np.asarray(offset, dtype=np.float64)
+        else:
+            table.positions[mask] += np.asarray(offset, dtype=np.float64)
+        return table
+
+    def scale(self, factor, pivot=(0.0, 0.0, 0.0), mask=None) -> "JointTable":
+        """Scale the positions around pivot"""
+        table = self.copy()
+        pivot = np.asarray(pivot, dtype=np.float64)
+        selected = slice(None) if mask is None else mask
+        table.positions[selected] = (table.positions[selected] - pivot) * factor + pivot
+        return table
+
+    def rotate(self, offset, mask=None) -> "JointTable":
+        """Add offset (in degrees) to the rotations"""
+        table = self.copy()
+        selected = slice(None) if mask is None else mask
+        table.rotations[selected] += np.asarray(offset, dtype=np.float64)
+        return table
+
+    # endregion
@@ -4,28 +4,116 @@ from PySide2.QtWidgets import QTreeView, QApplication, QHeaderView
 from PySide2 import QtWidgets, QtCore, QtGui
 
 import traceback
+import bisect
+import contextlib
+import io
+import itertools
 import json
+import math
 import os
 import sys
 
+from array import array
 from typing import Any
 
+from editHistory import EditHistory, InsertRowsCommand, RemoveRowsCommand, SetValueCommand
+from hierarchyInteract import JsonInteract, MayaInteract, ParseCache, branch_path
+from profiling import profiled, profiler
+from treeWalk import walk
+
+class _PendingChildren:
+    """Raw children of a lazy TreeItem that haven't been turned into TreeItems yet"""
+
+    __slots__ = ("source", "keys", "fetched")
+
+    def __init__(self, source: list | dict, keys: list = None, fetched: int = 0):
+        self.source = source
+        self.keys = keys  # ordered dict keys to fetch, built on the first fetch if not given
+        self.fetched = fetched
+
+    def total(self) -> int:
+        return len(self.keys) if self.keys is not None else len(self.source)
+
+    def remaining(self) -> int:
+        return self.total() - self.fetched
+
+
 # region pyside example to interpret a json in a qtree view, taken from internet :
 # https://doc.qt.io/qtforpython-6/examples/example_widgets_widgetsgallery.html#example-widgets-widgetsgallery
 class TreeItem:
-    """A Json item corresponding to a line in QTreeView"""
+    """A Json item corresponding to a line in QTreeView
+
+    Items use __slots__ and remember their own row inside the parent, so row()
+    and JsonModel.parent() are constant-time even on very wide levels.
+    Leaves don't allocate a children list until they get their first child.
+
+    A lazy item keeps its raw dict/list in _pending and only builds its children
+    when fetchChildren() is called (see JsonModel.fetchMore).
+    """
+
+    __slots__ = ("_parent", "_row", "_key", "_value", "_value_type", "_children", "_pending")
 
     def __init__(self, parent: "TreeItem" = None):
         self._parent = parent
+        self._row = 0
         self._key = ""
         self._value = ""
         self._value_type = None
-        self._children = []
+        self._children = None
+        self._pending = None
 
     def appendChild(self, item: "TreeItem"):
         """Add item as a child"""
+        if self._children is None:
+            self._children = []
+
+        item._parent = self
+        item._row = len(self._children)
         self._children.append(item)
 
+    def insertChild(self, row: int, item: "TreeItem"):
+        """Insert item as a child at the given row, shifting the following rows"""
+        if self._children is None:
+            self._children = []
+
+        item._parent = self
+        self._children.insert(row, item)
+        self._renumber(row)
+
+    def removeChild(self, row: int) -> "TreeItem":
+        """Remove and return the child at the given row, shifting the following rows"""
+        item = self._children.pop(row)
+        item._parent = None
+        item._row = 0
+        self._renumber(row)
+        return item
+
+    def insertChildren(self, row: int, items: list):
+        """Insert several items as children from the given row"""
+        if self._children is None:
+            self._children = []
+
+        for item in items:
+            item._parent = self
+        self._children[row:row] = items
+        self._renumber(row)
+
+    def removeChildren(self, row: int, count: int) -> list:
+        """Remove and return `count` children from the given row"""
+        items = self._children[row:row + count]
+        del self._children[row:row + count]
+        for item in items:
+            item._parent = None
+            item._row = 0
+        self._renumber(row)
+        return items
+
+    def _renumber(self, start: int):
+        """Refresh the stored row of every child from start to the end"""
+        children = self._children
+        for row in range(start, len(children)):
+            children[row]._row = row
+
     def child(self, row: int) -> "TreeItem":
         """Return the child of the current item from the given row"""
         return self._children[row]
@@ -36,11 +124,104 @@ class TreeItem:
 
     def childCount(self) -> int:
         """Return the number of children of the current item"""
-        return len(self._children)
+        return len(self._children) if self._children else 0
 
     def row(self) -> int:
         """Return the row where the current item occupies in the parent"""
-        return self._parent._children.index(self) if self._parent else 0
+        return self._row
+
+    def pendingCount(self) -> int:
+        """Return the number of children not fetched yet"""
+        return self._pending.remaining() if self._pending else 0
+
+    def setSource(self, value: Any):
+        """Keep a raw json value on the item, containers are only expanded by fetchChildren()"""
+        if isinstance(value, (dict, list)):
+            self._pending = _PendingChildren(value) if value else None
+        else:
+            self._value = value
+
+    def fetchChildren(self, count: int, sort=True) -> int:
+        """Build up to `count` children from the raw container, return how many were built"""
+        pending = self._pending
+        if pending is None:
+            return 0
+
+        source = pending.source
+        if isinstance(source, dict) and pending.keys is None:
+            pending.keys = sorted(source) if sort else list(source)
+        keys = pending.keys
+
+        start = pending.fetched
+        total = pending.total()
+        stop = min(start + count, total)
+        offset = self.childCount() - start  # list children are keyed by their row, rows inserted before shift them
+
+        for index in range(start, stop):
+            if keys is not None:
+                key = keys[index]
+                value = source[key]
+            else:
+                key = index + offset
+                value = source[index]
+
+            child = TreeItem(self)
+            child._key = key
+            child._value_type = type(value)
+            child.setSource(value)
+            self.appendChild(child)
+
+        pending.fetched = stop
+        if stop == total:
+            self._pending = None
+
+        return stop - start
+
+    def hasPendingKey(self, key) -> bool:
+        """Return True if the dict child under key wasn't fetched yet"""
+        pending = self._pending
+        if pending is None or not isinstance(pending.source, dict) or key not in pending.source:
+            return False
+        return pending.keys is None or key in pending.keys[pending.fetched:]
+
+    def promotePending(self, key) -> bool:
+        """Move the dict child under key ahead of the other pending ones, so fetchChildren(1) builds it
+
+        Return False if there is no such pending child.
+        """
+        pending = self._pending
+        if pending is None or not isinstance(pending.source, dict) or key not in pending.source:
+            return False
+
+        if pending.keys is None:
+            pending.keys = sorted(pending.source)
+        keys = pending.keys
+        try:
+            index = keys.index(key, pending.fetched)
+        except ValueError:  # already fetched
+            return False
+
+        if index != pending.fetched:
+            keys.insert(pending.fetched, keys.pop(index))
+        return True
+
+    def pendingItems(self):
+        """Yield (key, raw value) of the children not fetched yet"""
+        pending = self._pending
+        if pending is None:
+            return
+
+        source = pending.source
+        if isinstance(source, list):
+            offset = self.childCount() - pending.fetched
+            for index in range(pending.fetched, len(source)):
+                yield index + offset, source[index]
+
+        else:
+            if pending.keys is None:  # nothing fetched yet, use the order fetchChildren() would
+                pending.keys = sorted(source)
+            for key in pending.keys[pending.fetched:]:
+                yield key, source[key]
 
     @property
     def key(self) -> str:
@@ -53,13 +234,13 @@ class TreeItem:
         self._key = key
 
     @property
-    def value(self) -> str:
-        """Return the value name of the current item"""
+    def value(self) -> Any:
+        """Return the value of the current item, in its json type (str, int, float, bool, None)"""
         return self._value
 
     @value.setter
-    def value(self, value: str):
-        """Set value name of the current item"""
+    def value(self, value: Any):
+        """Set value of the current item"""
         self._value = value
 
     @property
@@ -74,7 +255,7 @@ class TreeItem:
 
     @classmethod
     def load(
-        cls, value: list | dict, parent: "TreeItem" = None, sort=True) -> "TreeItem":
+        cls, value: list | dict, parent: "TreeItem" = None, sort=True, lazy=False) -> "TreeItem":
         """Create a 'root' TreeItem from a nested list or a nested dictonary
 
         Examples:
@@ -82,7 +263,9 @@ class TreeItem:
                 data = json.dump(file)
                 root = TreeItem.load(data)
 
-        This method is a recursive function that calls itself.
+        The document is walked with treeWalk.walk, so its depth is only limited by memory.
+        With lazy=True, only the root item is created and its children are built
+        on demand by fetchChildren().
 
         Returns:
             TreeItem: TreeItem
@@ -90,37 +273,464 @@ class TreeItem:
         rootItem = TreeItem(parent)
         rootItem.key = "root"
 
-        if isinstance(value, dict):
-            items = sorted(value.items()) if sort else value.items()
-
-            for key, value in items:
-                child = cls.load(value, rootItem)
-                child.key = key
-                child.value_type = type(value)
-                rootItem.appendChild(child)
-
-        elif isinstance(value, list):
-            for index, value in enumerate(value):
-                child = cls.load(value, rootItem)
-                child.key = index
-                child.value_type = type(value)
-                rootItem.appendChild(child)
+        if lazy:
+            rootItem.setSource(value)
+            rootItem.value_type = type(value)
+            return rootItem
 
-        else:
+        if not isinstance(value, (dict, list)):
             rootItem.value = value
             rootItem.value_type = type(value)
+            return rootItem
+
+        def children(node):
+            value = node[1]
+            if isinstance(value, dict):
+                return sorted(value.items()) if sort else value.items()
+            if isinstance(value, list):
+                return enumerate(value)
+            return ()
+
+        def enter(node, parentItem):
+            if parentItem is None:  # the document itself
+                return rootItem
+
+            key, value = node
+            child = TreeItem(parentItem)
+            child._key = key
+            child._value_type = type(value)
+            if not isinstance(value, (dict, list)):
+                child._value = value
+            parentItem.appendChild(child)
+            return child
+
+        walk(("root", value), children, enter)
 
         return rootItem
 
+class PathIndex:
+    """Key/path index of a TreeItem tree, for JsonModel lookups and searches
+
+    Every node gets an id, children of lazy items that weren't fetched yet included,
+    and remembers its key, its parent and its row in the order the model shows (or
+    will fetch) it. Nodes are found from their parent id and key, so a JSON pointer
+    is looked up one key at a time. The keys and scalar values are kept as two lower
+    case texts, one line per id, searched with str.find.
+
+    JsonModel keeps the index up to date as it's edited : insert() and remove() index
+    the new rows and shift the rows (and list keys) of the following siblings,
+    set_value() changes a value. What changed after the build is kept aside in
+    `edited` and `edited_keys`, removed nodes are only detached from their parent.
+    """
+
+    def __init__(self, root: TreeItem):
+        self.ids = {}  # (parent id, key) -> node id
+        self.keys = ["root"]
+        self.parents = array("l", [-1])  # -1 for the root and the removed nodes
+        self.rows = array("l", [0])
+        self.edited = {}  # node id -> lower case value text, of the values set or added after the build
+        self.edited_keys = {}  # node id -> lower case key text, of the nodes added or renumbered after the build
+        self.detached = 0  # nodes removed since the build, their descendants aren't counted
+
+        values = [""]
+        self._add_nodes(0, _index_children(root), 0, values)
+
+        self._key_text, self._key_starts = _search_lines(_search_text(key) for key in self.keys)
+        self._value_text, self._value_starts = _search_lines(values)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _add_nodes(self, parent_id: int, children, row: int, values: list):
+        """Index the (key, TreeItem or raw value) children from row under parent_id, and everything below
+
+        The value text of each new node is appended to values.
+        """
+        stack = [(parent_id, children, row)]
+        while stack:
+            node_id, children, row = stack.pop()
+
+            nested = []
+            for row, (key, child) in enumerate(children, row):
+                child_id = len(self.keys)
+
+                self.ids[(node_id, key)] = child_id
+                self.keys.append(key)
+                self.parents.append(node_id)
+                self.rows.append(row)
+
+                if isinstance(child, TreeItem):
+                    is_container = child.value_type in (dict, list)
+                    value = child.value
+                else:
+                    is_container = isinstance(child, (dict, list))
+                    value = child
+
+                if is_container:
+                    values.append("")
+                    nested.append((child_id, _index_children(child), 0))
+                else:
+                    values.append(_search_text(value))
+
+            stack.extend(reversed(nested))
+
+    # region -- Lookups
+    def node_id(self, item: TreeItem):
+        """Return the node id of a TreeItem of the indexed tree, None if it isn't indexed"""
+        keys = []
+        while item._parent is not None:
+            keys.append(item.key)
+            item = item._parent
+
+        node_id = 0
+        for key in reversed(keys):
+            node_id = self.ids.get((node_id, key))
+            if node_id is None:
+                return None
+        return node_id
+
+    def node_path(self, pointer: str) -> list | None:
+        """Return the node ids leading from the root to pointer, None if it isn't indexed"""
+        ids = self.ids
+        path = []
+        node_id = 0
+        for key in pointer.split("/")[1:]:
+            key = key.replace("~1", "/").replace("~0", "~")
+            child_id = ids.get((node_id, key))
+            if child_id is None and key.isdigit():  # a list index
+                child_id = ids.get((node_id, int(key)))
+            if child_id is None:
+                return None
+            path.append(child_id)
+            node_id = child_id
+        return path
+
+    def pointer(self, node_id: int) -> str:
+        """Return the JSON pointer of a node id"""
+        keys = []
+        while node_id > 0:
+            keys.append(_escape_pointer(self.keys[node_id]))
+            node_id = self.parents[node_id]
+        return "".join(f"/{key}" for key in reversed(keys))
+
+    def row_path(self, pointer: str) -> list | None:
+        """Return the rows leading from the root to pointer, None if it isn't indexed"""
+        path = self.node_path(pointer)
+        return None if path is None else [self.rows[node_id] for node_id in path]
+
+    def _attached(self, node_id: int) -> bool:
+        """Return True if node_id wasn't removed, nor one of its ancestors"""
+        parents = self.parents
+        while node_id > 0:
+            node_id = parents[node_id]
+        return node_id == 0
+
+    # endregion
+
+    # region -- Edits
+    def insert(self, parent: TreeItem, row: int, count: int):
+        """Index the count children of parent from row, once they are inserted"""
+        parent_id = self.node_id(parent)
+        if parent_id is None or count <= 0:
+            return
+
+        self._shift(parent, parent_id, row + count, count)
+        self._index_rows(parent, parent_id, row, count)
+
+    def remove(self, parent: TreeItem, row: int, keys: list):
+        """Detach the children of parent under keys, once they are removed from row"""
+        parent_id = self.node_id(parent)
+        if parent_id is None or not keys:
+            return
+
+        self._detach(parent_id, keys)
+        self._shift(parent, parent_id, row, -len(keys))
+
+    def replace(self, parent: TreeItem, row: int, keys: list, count: int):
+        """The children of parent under keys were replaced by count children from row, the next ones didn't move"""
+        parent_id = self.node_id(parent)
+        if parent_id is None:
+            return
+
+        self._detach(parent_id, keys)
+        self._index_rows(parent, parent_id, row, count)
+
+    def set_value(self, item: TreeItem, value: Any):
+        node_id = self.node_id(item)
+        if node_id is not None:
+            self.edited[node_id] = _search_text(value)
+
+    def _index_rows(self, parent: TreeItem, parent_id: int, row: int, count: int):
+        values = []
+        first_id = len(self.keys)
+        self._add_nodes(parent_id, _index_children(parent, row, row + count), row, values)
+        for node_id, value in enumerate(values, first_id):
+            self.edited_keys[node_id] = _search_text(self.keys[node_id])
+            if value:
+                self.edited[node_id] = value
+
+    def _detach(self, parent_id: int, keys: list):
+        for key in keys:
+            node_id = self.ids.pop((parent_id, key), None)
+            if node_id is not None:
+                self.parents[node_id] = -1
+                self.detached += 1
+
+    def _shift(self, parent: TreeItem, parent_id: int, start: int, offset: int):
+        """The children of parent from row start moved by offset rows, list children also change keys"""
+        ids = self.ids
+        rows = self.rows
+
+        if parent.value_type is list:
+            # keyed by their row : move each one to a key its sibling already left
+            total = parent.childCount() + parent.pendingCount()
+            new_rows = range(total - 1, start - 1, -1) if offset > 0 else range(start, total)
+            for row in new_rows:
+                node_id = ids.pop((parent_id, row - offset), None)
+                if node_id is None:
+                    continue
+                ids[(parent_id, row)] = node_id
+                rows[node_id] = row
+                self.keys[node_id] = row
+                self.edited_keys[node_id] = str(row)
+            return
+
+        for key, _ in _index_children(parent, start):
+            node_id = ids.get((parent_id, key))
+            if node_id is not None:
+                rows[node_id] += offset
+
+    # endregion
+
+    def search(self, text: str, keys=True, values=True, prefix=False, limit: int = None) -> list:
+        """Return the pointers of the nodes whose key and/or value contain text
+
+        With prefix=True, the key or value has to start with text. Matching ignores case.
+        """
+        needle = _search_text(text)
+        found = set()
+
+        if keys:
+            # the lines of renumbered or removed nodes may match, don't stop at limit then
+            key_limit = None if self.edited_keys or self.detached else limit
+            for node_id in _find_lines(self._key_text, self._key_starts, needle, prefix, key_limit):
+                if node_id not in self.edited_keys:
+                    found.add(node_id)
+            for node_id, key in self.edited_keys.items():
+                if key.startswith(needle) if prefix else needle in key:
+                    found.add(node_id)
+
+        if values:
+            for node_id in _find_lines(self._value_text, self._value_starts, needle, prefix, None):
+                if node_id not in self.edited:
+                    found.add(node_id)
+            for node_id, value in self.edited.items():
+                if value.startswith(needle) if prefix else needle in value:
+                    found.add(node_id)
+
+        found.discard(0)  # the document itself
+        if self.detached:
+            found = {node_id for node_id in found if self._attached(node_id)}
+        node_ids = sorted(found)[:limit] if limit else sorted(found)
+        return [self.pointer(node_id) for node_id in node_ids]
+
+
+def _index_children(node, start: int = 0, stop: int = None):
+    """Yield (key, child) of a TreeItem or raw container, in the order of the model rows, from row start to stop"""
+    if isinstance(node, TreeItem):
+        built = node._children or ()
+        for child in built[start:stop]:
+            yield child.key, child
+        if stop is None or stop > len(built):
+            pending = node.pendingItems()
+            skip = max(start - len(built), 0)
+            yield from itertools.islice(pending, skip, None if stop is None else max(stop - len(built), skip))
+
+    elif isinstance(node, dict):  # fetchChildren() sorts the keys
+        for key in sorted(node)[start:stop]:
+            yield key, node[key]
+
+    else:
+        for index in range(start, len(node) if stop is None else min(stop, len(node))):
+            yield index, node[index]
+
+
+def _node_count(document) -> int:
+    """Return the number of values below a json document, containers included"""
+    count = 0
+    stack = [document]
+    while stack:
+        value = stack.pop()
+        children = value.values() if isinstance(value, dict) else value
+        count += len(children)
+        stack.extend(child for child in children if isinstance(child, (dict, list, tuple)))
+    return count
+
+
+def _escape_pointer(key) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _search_text(value) -> str:
+    return str(value).lower().replace("\n", " ")
+
+
+def _search_lines(lines) -> tuple:
+    """Join lines into one searchable text, return it with the offset where each line starts"""
+    starts = array("q")
+    chunks = []
+    offset = 1
+    for line in lines:
+        starts.append(offset)
+        chunks.append(line)
+        offset += len(line) + 1
+    return "\n" + "\n".join(chunks) + "\n", starts
+
+
+def _find_lines(text: str, starts, needle: str, prefix: bool, limit: int = None):
+    """Yield the line numbers of text containing needle (or starting with it)"""
+    if prefix:
+        needle = "\n" + needle
+    count = 0
+    position = text.find(needle)
+    while position != -1:
+        line = bisect.bisect_right(starts, position + prefix) - 1
+        yield line
+        count += 1
+        if limit and count >= limit:
+            return
+        # continue after the end of this line
+        next_line = line + 1
+        position = text.find(needle, starts[next_line] - prefix if next_line < len(starts) else len(text))
+
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+
+def _encode_scalar(value) -> str:
+    """Return the json text of a scalar, like json.dumps but without its overhead"""
+    if isinstance(value, str):
+        return _encode_string(value)
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if type(value) is int:
+        return int.__repr__(value)
+    if type(value) is float and math.isfinite(value):
+        return float.__repr__(value)
+    return json.dumps(value)
+
+
+_TRUE_TEXTS = ("true", "1", "yes", "on")
+_FALSE_TEXTS = ("false", "0", "no", "off")
+
+
+def coerce_value(value: Any, value_type: type) -> Any:
+    """Return value converted to the json type value_type, for JsonModel.setData
+
+    Text is parsed, so an editor can hand over what the user typed. Raise ValueError
+    (or TypeError) when value doesn't fit value_type. An item holding null takes
+    any json scalar, guessed from the text.
+    """
+    text = value.strip() if isinstance(value, str) else None
+
+    if value_type is bool:
+        if isinstance(value, bool):
+            return value
+        if text is not None and text.lower() in _TRUE_TEXTS + _FALSE_TEXTS:
+            return text.lower() in _TRUE_TEXTS
+        raise ValueError(f"{value!r} is not a boolean")
+
+    if value_type is int:
+        if isinstance(value, bool):
+            raise ValueError(f"{value!r} is not an integer")
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError(f"{value!r} is not an integer")
+            return int(value)
+        return int(text if text is not None else value)
+
+    if value_type is float:
+        if isinstance(value, bool):
+            raise ValueError(f"{value!r} is not a number")
+        value = float(text if text is not None else value)
+        if not math.isfinite(value):
+            raise ValueError(f"{value!r} can't be written in json")
+        return value
+
+    if value_type is type(None):
+        if text is None:
+            if value is None or isinstance(value, (bool, int, float)):
+                return value
+            raise TypeError(f"{value!r} is not a json scalar")
+        if text in ("", "null"):
+            return None
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            return value  # plain text
+        return parsed if not isinstance(parsed, (dict, list)) else value
+
+    if value_type in (dict, list):
+        raise TypeError("containers are edited through their children")
+
+    return value if isinstance(value, str) else str(value)
+
+
+def _row_runs(rows: list) -> list:
+    """Return (first, last) of every run of consecutive rows in a sorted list"""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
+
+
+_DATA_ROLES = frozenset((QtCore.Qt.ItemDataRole.DisplayRole, QtCore.Qt.ItemDataRole.EditRole))
+
+
 # override the Qmodel class of a treeView in order to show datas in a customized way
 class JsonModel(QtCore.QAbstractItemModel):
-    """ An editable model of Json data """
+    """ An editable model of Json data
+
+    With lazy=True the children of an item are only built when the view expands it,
+    `batch_size` rows at a time (see canFetchMore/fetchMore).
+
+    With indexed=True load() also builds a PathIndex, for index_from_pointer() and
+    search(). Other changes (update, streaming) drop it, it's rebuilt when needed.
+
+    Edits (setData, insert_value, removeRows) are recorded in `history`, an
+    EditHistory holding at most history_bytes of deltas. Loading a document clears it.
 
-    def __init__(self, parent: QtCore.QObject = None):
+    With display_cache > 0, the DisplayRole values of about that many recently
+    painted items are kept (see set_display_cache), for the large document view mode.
+    """
+
+    def __init__(
+            self, parent: QtCore.QObject = None, lazy=False, batch_size=1000, indexed=False,
+            history_bytes=64 * 2 ** 20, display_cache=0):
         super().__init__(parent)
 
         self._rootItem = TreeItem()
         self._headers = ("key", "value")
+        self._lazy = lazy
+        self._batch_size = batch_size
+        self._indexed = indexed
+        self._path_index = None  # PathIndex, built by load() when indexed, else on first use
+        self._stream_stack = []
+        self.history = EditHistory(max_bytes=history_bytes)
+
+        # two generations of item -> (key, value) display values, the old one is dropped when the hot one is full
+        self._display_cache_size = display_cache
+        self._display_hot = {}
+        self._display_old = {}
+        for signal in (self.dataChanged, self.rowsRemoved, self.rowsMoved, self.modelReset, self.layoutChanged):
+            signal.connect(self._drop_display_cache)
 
     def clear(self):
         """ Clear data from the model """
@@ -137,41 +747,428 @@ class JsonModel(QtCore.QAbstractItemModel):
             document, (dict, list, tuple)
         ), "`document` must be of dict, list or tuple, " f"not {type(document)}"
 
-        self.beginResetModel()
+        with profiler.span("JsonModel.load"):
+            self.beginResetModel()
+
+            self._rootItem = TreeItem.load(document, lazy=self._lazy)
+            self._rootItem.value_type = type(document)
+            self._path_index = PathIndex(self._rootItem) if self._indexed else None
+            self.history.clear()
+
+            self.endResetModel()
 
-        self._rootItem = TreeItem.load(document)
-        self._rootItem.value_type = type(document)
+        if profiler.enabled:  # counted out of the span, a lazy load doesn't walk the document
+            profiler.count("JsonModel.load.nodes", _node_count(document))
 
+        return True
+
+    def begin_stream(self):
+        """Reset the model to an empty document that feed() will fill in"""
+        self.beginResetModel()
+        self._rootItem = TreeItem()
+        self._rootItem.key = "root"
+        self._stream_stack = []
+        self._path_index = None
+        self.history.clear()
         self.endResetModel()
 
+    def feed(self, events):
+        """Add the items described by a chunk of JsonInteract.json_events() to the model
+
+        Rows are inserted with beginInsertRows/endInsertRows, one insertion per parent
+        already shown by the view, so the tree fills in progressively. Keys keep the
+        order of the file, they are not sorted like load() does.
+        """
+        stack = self._stream_stack  # [item, pending key, child count] per open container
+        fresh = set()  # items created by this chunk, not visible to the view yet
+        buffered = {}  # visible parent -> new children waiting for their insertion
+
+        for event, value in events:
+            if event == "key":
+                stack[-1][1] = value
+                continue
+
+            if event == "end_map" or event == "end_array":
+                stack.pop()
+                continue
+
+            if not stack:  # the document itself
+                if event == "value":
+                    raise ValueError(f"The document must be a dict or a list, not {type(value).__name__}")
+                item = self._rootItem
+                item.value_type = dict if event == "start_map" else list
+                stack.append([item, None, 0])
+                continue
+
+            entry = stack[-1]
+            parent = entry[0]
+
+            item = TreeItem()
+            item._key = entry[1] if parent._value_type is dict else entry[2]
+            entry[2] += 1
+
+            if event == "value":
+                item._value = value
+                item._value_type = type(value)
+            else:
+                item._value_type = dict if event == "start_map" else list
+                stack.append([item, None, 0])
+
+            fresh.add(id(item))
+            if id(parent) in fresh:
+                parent.appendChild(item)
+            else:
+                buffered.setdefault(parent, []).append(item)
+
+        for parent, children in buffered.items():
+            if parent is self._rootItem:
+                index = QtCore.QModelIndex()
+            else:
+                index = self.createIndex(parent.row(), 0, parent)
+
+            start = parent.childCount()
+            self.beginInsertRows(index, start, start + len(children) - 1)
+            for child in children:
+                parent.appendChild(child)
+            self.endInsertRows()
+
+            if self._path_index is not None:
+                self._path_index.insert(parent, start, len(children))
+
+    def update(self, document: dict):
+        """Change the model to document, only signaling the rows and values that changed
+
+        The items are diffed against document: dict children are matched by key and
+        list children by index. Removed and added children are reported with
+        rowsRemoved/rowsInserted, edited values with dataChanged. Unchanged rows keep
+        their indexes, so the view keeps its expansion, selection and scroll position.
+        Children a lazy model never fetched are just swapped, so the cost follows the
+        rows that were built and the changes, not the size of the document.
+        """
+        root = self._rootItem
+        if not isinstance(document, (dict, list)) or type(document) is not root.value_type:
+            return self.load(document)
+
+        self.history.clear()  # the items the commands point to may be replaced
+        stack = [(root, document)]
+        while stack:
+            item, value = stack.pop()
+            stack.extend(self._update_children(item, value))
+
+        return True
+
+    # region -- Path index
+    def path_index(self) -> PathIndex:
+        """Return the PathIndex of the document, building it if needed"""
+        if self._path_index is None:
+            self._path_index = PathIndex(self._rootItem)
+        return self._path_index
+
+    def keys(self, index: QtCore.QModelIndex) -> list:
+        """Return the keys leading from the root to an index"""
+        keys = []
+        item = index.internalPointer() if index.isValid() else self._rootItem
+        while item is not self._rootItem:
+            keys.append(item.key)
+            item = item.parent()
+        return keys[::-1]
+
+    def pointer(self, index: QtCore.QModelIndex) -> str:
+        """Return the JSON pointer of an index"""
+        return "".join(f"/{_escape_pointer(key)}" for key in self.keys(index))
+
+    def index_from_pointer(self, pointer: str, column: int = 0) -> QtCore.QModelIndex:
+        """Return the index of a JSON pointer ("/3_children/spine_03"), an invalid one if not found
+
+        Items a lazy model didn't build yet on the way are fetched : only the one on
+        the way in a dict, the rows up to it in a list, whose keys are the rows.
+        """
+        path_index = self.path_index()
+        node_ids = path_index.node_path(pointer)
+        if not node_ids:
+            return QtCore.QModelIndex()
+
+        item = self._rootItem
+        for node_id in node_ids:
+            key = path_index.keys[node_id]
+            row = path_index.rows[node_id]
+            if row >= item.childCount() or item.child(row).key != key:
+                row = self._fetch_child(item, key, row)
+                if row is None:
+                    return QtCore.QModelIndex()
+                path_index.rows[node_id] = row
+            item = item.child(row)
+
+        return self.createIndex(item.row(), column, item)
+
+    def search(self, text: str, keys=True, values=True, prefix=False, limit: int = None) -> list:
+        """Return the JSON pointers of the keys and/or values matching text (see PathIndex.search)"""
+        return self.path_index().search(text, keys=keys, values=values, prefix=prefix, limit=limit)
+
+    def _fetch_child(self, item: TreeItem, key, row: int):
+        """Return the row of the child of item under key, building it if needed, None if there is none"""
+        if item.value_type is list:
+            self._fetch_rows(item, row + 1 - item.childCount())
+            return row if row < item.childCount() else None
+
+        if item.promotePending(key):
+            self._fetch_rows(item, 1)
+            return item.childCount() - 1
+
+        # fetched out of order by an earlier lookup, the indexed row is off
+        for child in item._children or ():
+            if child.key == key:
+                return child.row()
+        return None
+
+    def _fetch_rows(self, item: TreeItem, count: int):
+        count = min(count, item.pendingCount())
+        if count <= 0:
+            return
+
+        start = item.childCount()
+        self.beginInsertRows(self._index_of(item), start, start + count - 1)
+        item.fetchChildren(count)
+        self.endInsertRows()
+
+    # endregion
+
+    # region -- Edits
+    def insert_value(self, row: int, key, value: Any, parent=QtCore.QModelIndex()) -> bool:
+        """Insert value before row under parent, as key for a dict (ignored for a list)"""
+        item = parent.internalPointer() if parent.isValid() else self._rootItem
+        if item.value_type not in (dict, list):
+            return False
+
+        if item.value_type is dict and (
+                item.hasPendingKey(key) or any(child.key == key for child in item._children or ())):
+            return False
+        if not 0 <= row <= item.childCount() + item.pendingCount():
+            return False
+
+        self._fetch_rows(item, row - item.childCount())  # only the rows before it, a lazy level stays lazy
+
+        items = [self._build_item(key if item.value_type is dict else row, value)]
+        self._insert_items(item, row, items)
+        self.history.push(InsertRowsCommand(self, item, row, items))
+        return True
+
+    def removeRows(self, row: int, count: int, parent=QtCore.QModelIndex()) -> bool:
+        """Override from QAbstractItemModel, the removal can be undone"""
+        item = parent.internalPointer() if parent.isValid() else self._rootItem
+
+        self._fetch_rows(item, row + count - item.childCount())  # up to the last row removed
+        if count <= 0 or row < 0 or row + count > item.childCount():
+            return False
+
+        items = self._remove_items(item, row, count)
+        self.history.push(RemoveRowsCommand(self, item, row, items))
         return True
 
+    def undo(self) -> bool:
+        return self.history.undo()
+
+    def redo(self) -> bool:
+        return self.history.redo()
+
+    def _set_item_value(self, item: TreeItem, value: Any):
+        item.value = value
+        item.value_type = type(value)
+
+        index = self._index_of(item, 1)
+        if self._path_index is not None:
+            self._path_index.set_value(item, value)
+
+        self.dataChanged.emit(index, index, [QtCore.Qt.ItemDataRole.EditRole])
+
+    def _insert_items(self, item: TreeItem, row: int, items: list):
+        self.beginInsertRows(self._index_of(item), row, row + len(items) - 1)
+        item.insertChildren(row, items)
+        self.endInsertRows()
+        self._renumber_keys(item, row)
+
+        if self._path_index is not None:
+            self._path_index.insert(item, row, len(items))
+
+    def _remove_items(self, item: TreeItem, row: int, count: int) -> list:
+        self.beginRemoveRows(self._index_of(item), row, row + count - 1)
+        items = item.removeChildren(row, count)
+        self.endRemoveRows()
+        self._renumber_keys(item, row)
+
+        if self._path_index is not None:
+            self._path_index.remove(item, row, [child.key for child in items])
+        return items
+
+    def _renumber_keys(self, item: TreeItem, start: int):
+        """List children are keyed by their position, refresh the ones that moved"""
+        if item.value_type is not list or start >= item.childCount():
+            return
+
+        for child in item._children[start:]:
+            child.key = child.row()
+        self.dataChanged.emit(
+            self.createIndex(start, 0, item.child(start)),
+            self.createIndex(item.childCount() - 1, 0, item.child(item.childCount() - 1)))
+
+    # endregion
+
+    def _index_of(self, item: TreeItem, column: int = 0) -> QtCore.QModelIndex:
+        if item is self._rootItem:
+            return QtCore.QModelIndex()
+        return self.createIndex(item.row(), column, item)
+
+    def _build_item(self, key, value) -> TreeItem:
+        item = TreeItem.load(value, lazy=self._lazy)
+        item.key = key
+        item.value_type = type(value)
+        return item
+
+    def _update_children(self, item: TreeItem, value: list | dict) -> list:
+        """Diff the direct children of item with value, return the (child, value) pairs to diff next"""
+        index = self._index_of(item)
+        path_index = self._path_index
+        is_dict = isinstance(value, dict)
+        children = item._children or []
+
+        # removed children, one removal per run of contiguous rows
+        if is_dict:
+            removed = [child.row() for child in children if child.key not in value]
+        else:
+            removed = list(range(len(value), len(children)))
+
+        for start, stop in reversed(_row_runs(removed)):
+            self.beginRemoveRows(index, start, stop)
+            gone = item.removeChildren(start, stop - start + 1)
+            self.endRemoveRows()
+            if path_index is not None:
+                path_index.remove(item, start, [child.key for child in gone])
+
+        # kept children
+        nested = []
+        for child in list(item._children or ()):
+            new = value[child.key]
+
+            if type(new) is not child.value_type and (
+                    isinstance(new, (dict, list)) or child.value_type in (dict, list)):
+                row = child.row()
+                self.beginRemoveRows(index, row, row)
+                item.removeChild(row)
+                self.endRemoveRows()
+
+                self.beginInsertRows(index, row, row)
+                item.insertChild(row, self._build_item(child.key, new))
+                self.endInsertRows()
+
+                if path_index is not None:
+                    path_index.replace(item, row, [child.key], 1)
+
+            elif isinstance(new, (dict, list)):
+                nested.append((child, new))
+
+            elif type(new) is not child.value_type or child.value != new:
+                child.value = new
+                child.value_type = type(new)
+                changed = self._index_of(child, 1)
+                self.dataChanged.emit(changed, changed)
+                if path_index is not None:
+                    path_index.set_value(child, new)
+
+        # added children
+        count = item.childCount()
+        if is_dict:
+            kept = {child.key for child in item._children or ()}
+            added = sorted(key for key in value if key not in kept)
+        else:
+            added = list(range(count, len(value)))
+
+        if item._pending is not None or (self._lazy and not count):
+            # not fetched yet, the view builds them when it needs them
+            pending_keys = [key for key, _ in item.pendingItems()] if path_index is not None else None
+            if is_dict:
+                item._pending = _PendingChildren(value, added) if added else None
+            else:
+                item._pending = _PendingChildren(value, fetched=count) if added else None
+
+            if added and not count and item is not self._rootItem:
+                self.dataChanged.emit(index, index)  # hasChildren() changed
+
+            if path_index is not None:
+                path_index.replace(item, count, pending_keys, item.pendingCount())
+
+        elif added:
+            self.beginInsertRows(index, count, count + len(added) - 1)
+            item.insertChildren(count, [self._build_item(key, value[key]) for key in added])
+            self.endInsertRows()
+            if path_index is not None:
+                path_index.insert(item, count, len(added))
+
+        return nested
+
     def data(self, index: QtCore.QModelIndex, role: QtCore.QItemDataRole) -> Any:
         """Override from QAbstractItemModel
 
         Return data from a json item according index and role
 
         """
-        if not index.isValid():
+        # a view asks for a dozen roles per painted cell, most of them unused here
+        if role not in _DATA_ROLES or not index.isValid():
             return None
 
         item = index.internalPointer()
 
         if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            if self._display_cache_size:
+                texts = self._display_hot.get(item)
+                if texts is None:
+                    texts = self._display_old.get(item) or self._display_texts(item)
+                    self._remember_display(item, texts)
+                return texts[index.column()] if index.column() < 2 else None
+
             if index.column() == 0:
                 return item.key
 
             if index.column() == 1:
+                if item.value_type is bool or item.value_type is type(None):
+                    return _encode_scalar(item.value)  # true, false, null
                 return item.value
 
         elif role == QtCore.Qt.ItemDataRole.EditRole:
             if index.column() == 1:
                 return item.value
 
+    # region -- Display cache
+    def set_display_cache(self, size: int):
+        """Keep the DisplayRole values of about size items, 0 to turn the cache off"""
+        self._display_cache_size = size
+        self._drop_display_cache()
+
+    def _display_texts(self, item: TreeItem) -> tuple:
+        value = item.value
+        if item.value_type is bool or item.value_type is type(None):
+            value = _encode_scalar(value)
+        return item.key, value
+
+    def _remember_display(self, item: TreeItem, texts: tuple):
+        hot = self._display_hot
+        if len(hot) >= self._display_cache_size:
+            self._display_old = hot
+            self._display_hot = hot = {}
+        hot[item] = texts
+
+    def _drop_display_cache(self, *args):
+        if self._display_hot or self._display_old:
+            self._display_hot = {}
+            self._display_old = {}
+
+    # endregion
+
     def setData(self, index: QtCore.QModelIndex, value: Any, role: QtCore.Qt.ItemDataRole):
         """Override from QAbstractItemModel
 
-        Set json item according index and role
+        Set json item according index and role. The value keeps the json type of the
+        item, text is parsed ("12" for an int, "true" for a bool), and values that
+        don't convert are refused.
 
         Args:
             index (QModelIndex)
@@ -182,9 +1179,14 @@ class JsonModel(QtCore.QAbstractItemModel):
         if role == QtCore.Qt.ItemDataRole.EditRole:
             if index.column() == 1:
                 item = index.internalPointer()
-                item.value = str(value)
+                try:
+                    value = coerce_value(value, item.value_type)
+                except (TypeError, ValueError):
+                    return False
 
-                self.dataChanged.emit(index, index, [QtCore.Qt.ItemDataRole.EditRole])
+                old = item.value
+                self._set_item_value(item, value)
+                self.history.push(SetValueCommand(self, item, old, value))
 
                 return True
 
@@ -209,20 +1211,19 @@ class JsonModel(QtCore.QAbstractItemModel):
         Return index according row, column and parent
 
         """
-        if not self.hasIndex(row, column, parent):
-            return QtCore.QModelIndex()
-
         if not parent.isValid():
             parentItem = self._rootItem
+        elif parent.column() > 0:
+            return QtCore.QModelIndex()
         else:
             parentItem = parent.internalPointer()
 
-        childItem = parentItem.child(row)
-        if childItem:
-            return self.createIndex(row, column, childItem)
-        else:
+        # the bounds of hasIndex(), without its calls back to rowCount and columnCount
+        if row < 0 or row >= parentItem.childCount() or not 0 <= column < len(self._headers):
             return QtCore.QModelIndex()
 
+        return self.createIndex(row, column, parentItem.child(row))
+
     def parent(self, index: QtCore.QModelIndex) -> QtCore.QModelIndex:
         """Override from QAbstractItemModel
 
@@ -236,7 +1237,7 @@ class JsonModel(QtCore.QAbstractItemModel):
         childItem = index.internalPointer()
         parentItem = childItem.parent()
 
-        if parentItem == self._rootItem:
+        if parentItem is self._rootItem:
             return QtCore.QModelIndex()
 
         return self.createIndex(parentItem.row(), 0, parentItem)
@@ -256,6 +1257,37 @@ class JsonModel(QtCore.QAbstractItemModel):
 
         return parentItem.childCount()
 
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        """Override from QAbstractItemModel
+
+        A lazy item has children as long as its raw container isn't empty,
+        even before they are fetched
+        """
+        if parent.column() > 0:
+            return False
+
+        item = parent.internalPointer() if parent.isValid() else self._rootItem
+
+        return item.childCount() > 0 or item.pendingCount() > 0
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+        """Override from QAbstractItemModel
+
+        Return True if the item still has raw children to build
+        """
+        item = parent.internalPointer() if parent.isValid() else self._rootItem
+
+        return item.pendingCount() > 0
+
+    def fetchMore(self, parent: QtCore.QModelIndex):
+        """Override from QAbstractItemModel
+
+        Build the next batch of children of the item
+        """
+        item = parent.internalPointer() if parent.isValid() else self._rootItem
+
+        self._fetch_rows(item, self._batch_size)
+
     def columnCount(self, parent=QtCore.QModelIndex()):
         """Override from QAbstractItemModel
 
@@ -270,34 +1302,114 @@ class JsonModel(QtCore.QAbstractItemModel):
         """
         flags = super(JsonModel, self).flags(index)
 
-        if index.column() == 1:
+        # containers are edited through their children
+        if index.column() == 1 and index.internalPointer().value_type not in (dict, list):
             return QtCore.Qt.ItemFlag.ItemIsEditable | flags
         else:
             return flags
 
-    def to_json(self, item=None): # recursive loop to fetch datas from json file
+    def to_json(self, item=None): # post-order walk to fetch datas from the items
 
         if item is None:
             item = self._rootItem
 
-        nchild = item.childCount()
+        def children(item):
+            return item._children or ()
 
-        if item.value_type is dict:
-            document = {}
-            for i in range(nchild):
-                ch = item.child(i)
-                document[ch.key] = self.to_json(ch)
-            return document
+        def leave(item, context, results):
+            if item.value_type is dict:
+                document = {ch.key: result for ch, result in zip(children(item), results)}
+                for key, value in item.pendingItems():  # children never fetched by a lazy model
+                    document[key] = value
+                return document
 
-        elif item.value_type == list:
-            document = []
-            for i in range(nchild):
-                ch = item.child(i)
-                document.append(self.to_json(ch))
-            return document
+            elif item.value_type == list:
+                results.extend(value for _, value in item.pendingItems())
+                return results
 
-        else:
-            return item.value
+            else:
+                return item.value
+
+        return walk(item, children, leave=leave)
+
+    def write_json(self, buffer, indent: int = 2, item: TreeItem = None):
+        """Serialize the model into a binary buffer (file, BytesIO), straight from the items
+
+        Same output as json.dumps(self.to_json(), indent=indent), without building
+        the intermediate dicts and lists : the text is encoded and written by chunks
+        as the items are walked. Children a lazy model never fetched are dumped raw.
+        """
+        if item is None:
+            item = self._rootItem
+
+        pieces = []
+        write = pieces.append
+        item_separator = "," if indent is not None else ", "
+        newlines = {}  # depth -> line break and indentation
+
+        def newline(depth):
+            text = newlines.get(depth)
+            if text is None:
+                text = newlines[depth] = "\n" + " " * (indent * depth) if indent is not None else ""
+            return text
+
+        def start(node, depth):
+            """Write a scalar or raw node, or open a container item and return its frame"""
+            if isinstance(node, TreeItem):
+                if node.value_type is dict or node.value_type is list:
+                    is_dict = node.value_type is dict
+                    if not node.childCount() and not node.pendingCount():
+                        write("{}" if is_dict else "[]")
+                        return None
+                    write("{" if is_dict else "[")
+                    return [_index_children(node), is_dict, depth + 1, True]
+                write(_encode_scalar(node.value))
+
+            elif isinstance(node, (dict, list)):
+                raw = json.dumps(node, indent=indent)
+                write(raw.replace("\n", newline(depth)) if indent is not None and depth else raw)
+
+            else:
+                write(_encode_scalar(node))
+
+        frame = start(item, 0)
+        stack = [frame] if frame else []
+        while stack:
+            frame = stack[-1]
+            entries, is_dict, depth, first = frame
+            line = newline(depth)
+            separator = item_separator + line
+
+            for key, child in entries:
+                write(line if first else separator)
+                first = False
+                if is_dict:
+                    write(_encode_string(str(key)) + ": ")
+
+                if type(child) is TreeItem and child._children is None and child._pending is None \
+                        and child._value_type is not dict and child._value_type is not list:
+                    write(_encode_scalar(child._value))  # leaves, most of the items
+                else:
+                    opened = start(child, depth)
+                    if opened:  # continue with the children of child, come back here after
+                        frame[3] = False
+                        stack.append(opened)
+                        break
+
+                if len(pieces) >= 8192:
+                    buffer.write("".join(pieces).encode("utf-8"))
+                    pieces.clear()
+            else:
+                stack.pop()
+                write(newline(depth - 1) + ("}" if is_dict else "]"))
+
+        buffer.write("".join(pieces).encode("utf-8"))
+
+    def dumps(self, indent: int = 2) -> bytes:
+        """Return the model serialized by write_json"""
+        buffer = io.BytesIO()
+        self.write_json(buffer, indent=indent)
+        return buffer.getvalue()
 
     def open_json(self):
         # json_path = QFileInfo(__file__).absoluteDir().filePath("example.json")
@@ -309,132 +1421,342 @@ class JsonModel(QtCore.QAbstractItemModel):
 # endregion
 
 
-class JsonInteract:
-    def create_json_file(file_name):
-        try:
-            with open(file_name, mode="r") as file:
-                print(file_name, " : This file already exists")
-                print("Writing datas ...")
-                return True
+class _MatchNode:
+    """Row of a JsonFilterProxy : a matching TreeItem or one of its ancestors"""
 
+    __slots__ = ("item", "parent", "row", "children", "matched")
 
-        except FileNotFoundError:
-            print(file_name, " : Such file doesn't exist")
-            print("Creating it and writing datas ...")
-            return False
+    def __init__(self, item: TreeItem, parent: "_MatchNode" = None, row: int = 0):
+        self.item = item
+        self.parent = parent
+        self.row = row
+        self.children = []
+        self.matched = False
 
-    def json_write(data, file_name):
 
-        file_exist = JsonInteract.create_json_file(file_name)  # verify if the fie already exist
+class JsonFilterProxy(QtCore.QAbstractProxyModel):
+    """Filtered view of a JsonModel : the search matches and their ancestors
 
-        if file_exist == True:
-            with open(file_name, mode="w", encoding="utf-8") as write_file:
-                json.dump(data, write_file, indent=2)  # writes the dict into a json file
+    The rows come from the model PathIndex, so only the matching items and the path
+    to them are visited (and fetched, for a lazy model), never the whole tree.
+    """
 
-            return data
+    def __init__(self, parent: QtCore.QObject = None, limit: int = 1000):
+        super().__init__(parent)
 
-        else:
-            write_file = open(file_name, mode="x", encoding="utf-8")
-            json.dump(data, write_file, indent=2)  # writes the dict into a json file
+        self.limit = limit  # most matches shown
+        self._text = ""
+        self._search = {}
+        self._root = _MatchNode(None)
+        self._nodes = {}  # id(TreeItem) -> _MatchNode
+        self._building = False
+        self._scheduled = False
+
+    def setSourceModel(self, model: JsonModel):
+        previous = self.sourceModel()
+        if previous is not None:
+            for signal, slot in self._source_signals(previous):
+                signal.disconnect(slot)
+
+        super().setSourceModel(model)
+
+        for signal, slot in self._source_signals(model):
+            signal.connect(slot)
+        self._refilter()
+
+    def _source_signals(self, model: JsonModel) -> list:
+        return [
+            (model.dataChanged, self._source_data_changed),
+            (model.modelReset, self._source_changed),
+            (model.rowsInserted, self._source_changed),
+            (model.rowsRemoved, self._source_changed),
+        ]
+
+    def set_filter(self, text: str, keys=True, values=True, prefix=False):
+        """Show the items whose key and/or value match text (see PathIndex.search)"""
+        self._text = text
+        self._search = {"keys": keys, "values": values, "prefix": prefix}
+        self._refilter()
+
+    def matches(self) -> list:
+        """Return the proxy indexes of the matching items, in model order"""
+        found = []
+        stack = list(reversed(self._root.children))
+        while stack:
+            node = stack.pop()
+            if node.matched:
+                found.append(self.createIndex(node.row, 0, node))
+            stack.extend(reversed(node.children))
+        return found
+
+    def _source_changed(self, *args):
+        """Drop the matches at once, search again when the model is done changing"""
+        if self._building or not self._text:  # rows fetched by index_from_pointer while filtering
+            return
+
+        if self._root.children:
+            self.beginResetModel()
+            self._root = _MatchNode(None)
+            self._nodes = {}
+            self.endResetModel()
+
+        if not self._scheduled:
+            self._scheduled = True
+            QtCore.QTimer.singleShot(0, self._refilter)
+
+    def _refilter(self):
+        self._scheduled = False
+        self.beginResetModel()
+        self._root = _MatchNode(None)
+        self._nodes = {}
+
+        source = self.sourceModel()
+        if self._text and source is not None:
+            self._building = True
+            try:
+                for pointer in source.search(self._text, limit=self.limit, **self._search):
+                    self._add_match(source.index_from_pointer(pointer).internalPointer())
+            finally:
+                self._building = False
 
-    def json_read(file_name):
-        with open(file_name, mode="r", encoding="utf-8") as read_file:
-            data = json.load(read_file)
+        self.endResetModel()
 
-        return data
+    def _add_match(self, item: TreeItem):
+        path = []
+        while item is not None and id(item) not in self._nodes and item.parent() is not None:
+            path.append(item)
+            item = item.parent()
+
+        node = self._nodes.get(id(item), self._root)
+        for item in reversed(path):
+            child = _MatchNode(item, node, len(node.children))
+            node.children.append(child)
+            self._nodes[id(item)] = child
+            node = child
+
+        node.matched = True
+
+    def _source_data_changed(self, top_left, bottom_right, roles=()):
+        first = self.mapFromSource(top_left)
+        last = self.mapFromSource(bottom_right)
+        if first.isValid() and last.isValid():
+            self.dataChanged.emit(first, last, roles)
+
+    # region -- Overrides
+    def mapToSource(self, proxy_index: QtCore.QModelIndex) -> QtCore.QModelIndex:
+        if not proxy_index.isValid():
+            return QtCore.QModelIndex()
+        return self.sourceModel()._index_of(proxy_index.internalPointer().item, proxy_index.column())
 
+    def mapFromSource(self, source_index: QtCore.QModelIndex) -> QtCore.QModelIndex:
+        if not source_index.isValid():
+            return QtCore.QModelIndex()
+        node = self._nodes.get(id(source_index.internalPointer()))
+        if node is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, source_index.column(), node)
 
-class MayaInteract(object):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def index(self, row: int, column: int, parent=QtCore.QModelIndex()) -> QtCore.QModelIndex:
+        node = parent.internalPointer() if parent.isValid() else self._root
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, node.children[row])
 
-    def get_hierarchy(self):
-        hierarchy = {"1_name": 0, "2_pos": 0, "2_rot": 0}
+    def parent(self, index: QtCore.QModelIndex) -> QtCore.QModelIndex:
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        node = index.internalPointer().parent
+        if node is self._root:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        if parent.column() > 0:
+            return 0
+        node = parent.internalPointer() if parent.isValid() else self._root
+        return len(node.children)
 
-        # get the hierarchy of your scene
-        sel = cmds.ls(selection=True)
+    def hasChildren(self, parent=QtCore.QModelIndex()) -> bool:
+        return self.rowCount(parent) > 0
 
-        if not sel:
-          print("Must select a hierarchy")
-          return
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        source = self.sourceModel()
+        return source.columnCount() if source is not None else 0
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+        return False  # the filtered rows are all built
+
+    # endregion
 
+
+class JsonValueDelegate(QtWidgets.QStyledItemDelegate):
+    """Editors of the value column, picked from the json type of the value
+
+    Booleans get a true/false combo box, numbers a line edit that only accepts
+    numbers, anything else a plain line edit. JsonModel.setData does the conversion.
+    """
+
+    INT_PATTERN = r"[-+]?\d+"
+    FLOAT_PATTERN = r"[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?"
+
+    def createEditor(self, parent: QtWidgets.QWidget, option, index: QtCore.QModelIndex) -> QtWidgets.QWidget:
+        value = index.data(QtCore.Qt.ItemDataRole.EditRole)
+
+        if isinstance(value, bool):
+            editor = QtWidgets.QComboBox(parent)
+            editor.addItems(["false", "true"])
+            return editor
+
+        editor = QtWidgets.QLineEdit(parent)
+        if isinstance(value, (int, float)):
+            pattern = self.INT_PATTERN if isinstance(value, int) else self.FLOAT_PATTERN
+            editor.setValidator(QtGui.QRegularExpressionValidator(QtCore.QRegularExpression(pattern), editor))
+        return editor
+
+    def setEditorData(self, editor: QtWidgets.QWidget, index: QtCore.QModelIndex):
+        value = index.data(QtCore.Qt.ItemDataRole.EditRole)
+
+        if isinstance(editor, QtWidgets.QComboBox):
+            editor.setCurrentIndex(int(bool(value)))
+        elif isinstance(value, str):
+            editor.setText(value)
         else:
-          root = sel[0]
+            editor.setText(_encode_scalar(value))
 
-        self.datas = MayaInteract.get_children(self, root, hierarchy)
+    def setModelData(self, editor: QtWidgets.QWidget, model: QtCore.QAbstractItemModel, index: QtCore.QModelIndex):
+        if isinstance(editor, QtWidgets.QComboBox):
+            model.setData(index, bool(editor.currentIndex()), QtCore.Qt.ItemDataRole.EditRole)
+        else:
+            model.setData(index, editor.text(), QtCore.Qt.ItemDataRole.EditRole)
 
-        return self.datas
 
-    def get_children(self, obj, hierarchy):
+class FileTaskSignals(QtCore.QObject):
+    """Signals of a FileTask, emitted from the worker thread and received in the GUI thread"""
 
-        pos = cmds.xform(obj, ws=True, q=True, t=True)
-        rot = cmds.xform(obj, ws=True, q=True, ro=True)
+    progress = QtCore.Signal(int)  # percent
+    chunk = QtCore.Signal(object)
+    result = QtCore.Signal(object)
+    failed = QtCore.Signal(str)
+    finished = QtCore.Signal()
 
-        hierarchy["1_name"] = obj
-        hierarchy["2_pos"] = pos
-        hierarchy["2_rot"] = rot
 
-        children = cmds.listRelatives(obj, children=True, shapes=False) or []
+class FileTask(QtCore.QRunnable):
+    """Run a file read or write on a QThreadPool thread
 
-        if children:
-            hierarchy["3_children"] = {}  # initialise l'item children de cet etage de la hierarchie
-            for child in children:
-                hierarchy["3_children"][child] = {}
-                self.get_children(child, hierarchy["3_children"][child])
+    The function is called with the task as first argument, so it can report progress,
+    send chunks of data and check is_cancelled() while it works.
+    """
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
 
-        return hierarchy
+        self.signals = FileTaskSignals()
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+        self._cancelled = False
+        self._percent = -1
 
-    def create_hierarchy(self, datas, suffix="", symmetrize = None):
-        print("i create this : ")
+    def cancel(self):
+        """Ask the task to stop, its remaining signals are not emitted"""
+        self._cancelled = True
 
-        if not isinstance(suffix, str):
-            raise TypeError(f"Provided suffix is not of stype string: {type(suffix)}> {suffix}")
+    def is_cancelled(self) -> bool:
+        return self._cancelled
 
-        self.create_children("", datas, suffix, symmetrize)
+    def report_progress(self, done: int, total: int):
+        percent = int(done * 100 / total) if total else 100
+        if percent != self._percent and not self._cancelled:
+            self._percent = percent
+            self.signals.progress.emit(percent)
 
-    def create_children(self, parent, datas, suffix, symmetrize):
-        #create joint with the datas provided in the json file
-        cmds.select(clear=1)
+    def run(self):
+        try:
+            result = self._function(self, *self._args, **self._kwargs)
+            if not self._cancelled:
+                self.signals.result.emit(result)
 
-        try :
-            if datas["1_name"].split('_')[1]: # if the joint already has a suffix
-                name = datas["1_name"].split('_')[0] + suffix
+        except Exception:
+            if not self._cancelled:
+                self.signals.failed.emit(traceback.format_exc())
 
-        except IndexError : # if it has no suffix at the beginning
-            name = datas["1_name"] + suffix
+        finally:
+            self.signals.finished.emit()
 
-        jnt = cmds.joint(name=name)
 
+@profiled("task.stream_json")
+def _stream_json_task(task: FileTask, file_name: str, chunk_size: int):
+    """Tokenize a json file in the worker thread and send its events in chunks"""
+    tokens = JsonInteract.json_events(file_name, progress=task.report_progress)
 
+    first = next(tokens)
+    if first[0] == "value":  # a lone scalar, reported here rather than by JsonModel.feed in the GUI thread
+        raise ValueError(f"{file_name} : the document must be a dict or a list, not {type(first[1]).__name__}")
+    events = itertools.chain([first], tokens)
 
-        if symmetrize == 0: # if not symetrize
-            cmds.xform(jnt, ws=1, t = datas["2_pos"], ro=datas["2_rot"])
+    while not task.is_cancelled():
+        chunk = list(itertools.islice(events, chunk_size))
+        task.signals.chunk.emit(chunk)
+        profiler.count("json.events", len(chunk))
 
-        else: # if symmetrize
-            pos = datas["2_pos"]
-            sym_pos = [-pos[0], pos[1], pos[2]]
-            cmds.xform(jnt, ws=1, t = sym_pos, ro=datas["2_rot"])
+        if len(chunk) < chunk_size:
+            break
 
+    tokens.close()
 
-        if parent :
-            cmds.parent(jnt, parent)
 
-        cmds.select(clear=1)
+@profiled("task.read_json")
+def _read_json_task(task: FileTask, file_name: str):
+    task.report_progress(0, 1)
+    data = JsonInteract.json_read(file_name)
+    task.report_progress(1, 1)
+    return data
 
-        children = []
 
-        try :
-            children = datas["3_children"] or [] #get dict of children
-        except KeyError :
-            pass
+@profiled("task.write_json")
+def _write_json_task(task: FileTask, data: dict, file_name: str):
+    task.report_progress(0, 1)
+    if not task.is_cancelled():
+        JsonInteract.json_write(data, file_name)
+    task.report_progress(1, 1)
+
+
+@profiled("task.merge_json")
+def _merge_json_task(task: FileTask, branches: dict, paths: list, file_name: str):
+    task.report_progress(0, 1)
+    datas = None
+    if not task.is_cancelled():
+        datas = JsonInteract.json_merge(branches, paths, file_name)
+    task.report_progress(1, 1)
+    return datas
 
-        if children:
-            for child in children:
-                MayaInteract.create_children(self, name, datas["3_children"][child], suffix, symmetrize)
+
+def configure_tree_view(view: QtWidgets.QTreeView, large: bool, column_widths: dict = None):
+    """Set a tree view up for a regular or a large document
+
+    In the large document mode every row is taken to be as high as the first one,
+    so the view never asks the rows for their size, and the columns keep the given
+    widths instead of stretching.
+    """
+    header = view.header()
+
+    view.setUniformRowHeights(large)
+    view.setAnimated(not large)
+
+    if large:
+        header.setStretchLastSection(True)
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        for column, width in (column_widths or {}).items():
+            header.resizeSection(column, width)
+    else:
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
 
 
 class Ui(QtWidgets.QWidget):
 
+    LARGE_DOCUMENT_BYTES = 32 * 2 ** 20  # files from this size open in the large document mode
+    DISPLAY_CACHE = 4096  # items whose display text is cached in the large document mode
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -470,23 +1792,90 @@ class Ui(QtWidgets.QWidget):
         self.symmetrize_box = QtWidgets.QCheckBox("symmetrize hierarchy on opposite -X / +X")
         self.layout.addWidget(self.symmetrize_box)
 
+        # GET the selected joints, WRITE them in place in the file, CREATE the joints selected in the tree view
+        self.branches_box = QtWidgets.QCheckBox("selected branches only")
+        self.branches_box.setToolTip(
+            "GET captures every selected joint with its children, WRITE merges them into the file\n"
+            "and CREATE rebuilds only the joints selected in the tree view")
+        self.layout.addWidget(self.branches_box)
+        self.datas = None  # hierarchy of the last GET
+        self.branch_paths = None  # paths of the branches of the last GET, None for a whole hierarchy
+
         self.layout.addWidget(self.separator())
 
         # endregion
 
+        # region -- -- Search
+        self.search_lay = QtWidgets.QHBoxLayout()
+        self.layout.addLayout(self.search_lay)
+
+        self.search_label = QtWidgets.QLabel("Search keys and values")
+        self.search_lay.addWidget(self.search_label)
+
+        # filters on enter only, building the index of a big file takes a moment
+        self.search_line = QtWidgets.QLineEdit()
+        self.search_line.setPlaceholderText("spine_03, /3_children/spine_01 ...")
+        self.search_line.returnPressed.connect(lambda: self.filter_tree_view(self.search_line.text()))
+        self.search_lay.addWidget(self.search_line)
+
+        self.large_box = QtWidgets.QCheckBox("large document")
+        self.large_box.setToolTip("Uniform row heights and fixed column widths, for files with many rows")
+        self.large_box.toggled.connect(lambda checked: self.set_large_document(checked))
+        self.search_lay.addWidget(self.large_box)
+
+        # endregion
+
         # region -- -- TreeView
         self.view = QtWidgets.QTreeView()
-        self.model = JsonModel()
-        self.view.setModel(self.model)
-        self.view.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.model = JsonModel(lazy=True)
+        self.large_document = False
+        self.column_widths = {0: 300}  # kept while the large document mode is on
+        self.proxy = JsonFilterProxy()
+        self.proxy.setSourceModel(self.model)
+        self.set_view_model(self.model)
+        self.view.setItemDelegateForColumn(1, JsonValueDelegate(self.view))
         self.view.setAlternatingRowColors(True)
+        self.view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.view.header().sectionResized.connect(
+            lambda column, old, new: self.remember_column_width(column, new))
 
         self.layout.addWidget(self.view)
 
-        self.populate_tree_view()
+        # edits of the tree view, see JsonModel.history
+        self.undo_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.Undo, self)
+        self.undo_shortcut.activated.connect(lambda: self.model.undo())
+        self.redo_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.Redo, self)
+        self.redo_shortcut.activated.connect(lambda: self.model.redo())
+        self.delete_shortcut = QtWidgets.QShortcut(QtGui.QKeySequence.Delete, self.view)
+        self.delete_shortcut.activated.connect(lambda: self.remove_selected_rows())
 
         #endregion
 
+        # region -- -- Progress
+        self.progress_lay = QtWidgets.QHBoxLayout()
+        self.layout.addLayout(self.progress_lay)
+
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_lay.addWidget(self.progress_bar)
+
+        self.btn_cancel = QtWidgets.QPushButton()
+        self.btn_cancel.setText("CANCEL")
+        self.btn_cancel.clicked.connect(lambda: self.cancel_tasks())
+        self.progress_lay.addWidget(self.btn_cancel)
+
+        self.set_busy(False)
+
+        # file reads and writes run on worker threads, the results come back through signals
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.stream_chunk_size = 5000  # json events added to the view per chunk
+        self._load_task = None
+        self._tasks = set()
+
+        self.populate_tree_view()
+
+        # endregion
+
         #region -- -- Box Suffix
         self.line_lay = QtWidgets.QHBoxLayout()
         self.layout.addLayout(self.line_lay)
@@ -523,6 +1912,11 @@ class Ui(QtWidgets.QWidget):
 
         # endregion
 
+    def closeEvent(self, event):
+        if profiler.enabled:
+            profiler.write_reports()
+        super().closeEvent(event)
+
     # region -- Utility functions
     def separator(self):
         separator = QtWidgets.QLabel(" ")
@@ -548,31 +1942,212 @@ class Ui(QtWidgets.QWidget):
 
         return "/users_roaming/echagnon/PycharmProjects/echagnon-internship/python/exos/json/jsonFile.json"
 
-    def populate_tree_view(self):
-        datas = JsonInteract.json_read(self.json_path)
-        self.model.load(datas)
-        print("Tree view populated ...")
+    # region -- Worker threads
+    def start_task(self, task: FileTask, on_result=None) -> FileTask:
+        """Run a FileTask on the thread pool, showing its progress in the window"""
+        self._tasks.add(task)
+
+        task.signals.progress.connect(lambda percent: self.task_progress(task, percent))
+        task.signals.failed.connect(lambda message: print(message))
+        if on_result is not None:
+            task.signals.result.connect(lambda result: on_result(result))
+        task.signals.finished.connect(lambda: self.task_finished(task))
+
+        self.set_busy(True)
+        self.thread_pool.start(task)
+
+        return task
+
+    def task_progress(self, task: FileTask, percent: int):
+        if not task.is_cancelled():
+            self.progress_bar.setValue(percent)
+
+    def task_finished(self, task: FileTask):
+        self._tasks.discard(task)
+        if task is self._load_task:
+            self._load_task = None
+
+        if not any(not t.is_cancelled() for t in self._tasks):
+            self.set_busy(False)
+
+    def cancel_tasks(self):
+        for task in self._tasks:
+            task.cancel()
+        self.set_busy(False)
+
+    def set_busy(self, busy: bool):
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(busy)
+        self.btn_cancel.setVisible(busy)
 
+    # endregion
+
+    def set_view_model(self, model: QtCore.QAbstractItemModel):
+        self.view.setModel(model)
+        self.apply_view_mode()
+
+    def set_large_document(self, large: bool):
+        """Switch the tree view to (or from) the large document mode
+
+        The view then takes every row to be as high as the first one instead of
+        asking each row for its size, keeps the column widths the user chose rather
+        than stretching them, and the model caches the text of the painted rows.
+        """
+        self.large_document = large
+        if self.large_box.isChecked() != large:
+            self.large_box.setChecked(large)
+        self.apply_view_mode()
+
+    def apply_view_mode(self):
+        configure_tree_view(self.view, self.large_document, self.column_widths)
+        self.model.set_display_cache(self.DISPLAY_CACHE if self.large_document else 0)
+
+    def remember_column_width(self, column: int, width: int):
+        if self.large_document and column < self.view.header().count() - 1:
+            self.column_widths[column] = width
+
+    def filter_tree_view(self, text: str):
+        """Show the items matching text, or jump to it when text is a JSON pointer"""
+        if not text:
+            self.proxy.set_filter("")
+            self.set_view_model(self.model)
+            return
+
+        if text.startswith("/"):
+            index = self.model.index_from_pointer(text)
+            if index.isValid():
+                self.proxy.set_filter("")
+                self.set_view_model(self.model)
+                self.view.scrollTo(index)
+                self.view.setCurrentIndex(index)
+                return
+
+        self.proxy.set_filter(text)
+        self.set_view_model(self.proxy)
+        self.view.expandAll()  # at most proxy.limit matches and their parents
+
+        matches = self.proxy.matches()
+        if matches:
+            self.view.scrollTo(matches[0])
+            self.view.setCurrentIndex(matches[0])
+
+    def remove_selected_rows(self):
+        indexes = self.view.selectionModel().selectedRows()
+        if self.view.model() is self.proxy:
+            indexes = [self.proxy.mapToSource(index) for index in indexes]
+
+        # persistent indexes follow the removals, and die with their removed parents
+        for index in [QtCore.QPersistentModelIndex(index) for index in indexes]:
+            if index.isValid():
+                self.model.removeRows(index.row(), 1, index.parent())
+
+    def populate_tree_view(self):
+        # timed until the tree view is filled, the file is read by a FileTask
+        span = profiler.start_span("Ui.populate_tree_view")
+
+        # a new load supersedes the one still running
+        if self._load_task is not None:
+            self._load_task.cancel()
+
+        # the search results belong to the previous document
+        if self.view.model() is self.proxy:
+            self.search_line.clear()
+            self.filter_tree_view("")
+
+        with contextlib.suppress(OSError):
+            if os.path.getsize(self.json_path) >= self.LARGE_DOCUMENT_BYTES:
+                self.set_large_document(True)
+
+        # the file was already parsed and didn't change since
+        datas = JsonInteract.cache.lookup(self.json_path)
+        if datas is not None:
+            self._load_task = None
+            self.model.load(datas)
+            print("Tree view populated ...")
+            profiler.end_span(span, cached=True)
+            return
+
+        self.model.begin_stream()
+
+        if JsonInteract.is_binary(self.json_path):  # nothing to stream, read it whole
+            task = FileTask(_read_json_task, self.json_path)
+            task.signals.result.connect(lambda result: self.load_tree_view(task, result))
+        else:
+            task = FileTask(_stream_json_task, self.json_path, self.stream_chunk_size)
+            task.signals.chunk.connect(lambda chunk: self.feed_tree_view(task, chunk))
+            task.signals.result.connect(lambda result: print("Tree view populated ..."))
+
+        # after the result and every chunk were handled
+        task.signals.finished.connect(lambda: profiler.end_span(span, cancelled=task.is_cancelled()))
+        self._load_task = self.start_task(task)
+
+    def load_tree_view(self, task: FileTask, datas: dict):
+        if task is self._load_task and not task.is_cancelled():
+            self.model.load(datas)
+            print("Tree view populated ...")
+
+    def update_tree_view(self, datas: dict):
+        # a load still streaming would be diffed half way, read the file again instead
+        if self._load_task is not None:
+            self.populate_tree_view()
+            return
+
+        self.model.update(datas)
+        print("Tree view updated ...")
+
+    @profiled("Ui.feed_tree_view")
+    def feed_tree_view(self, task: FileTask, chunk: list):
+        # chunks of a superseded or cancelled load may still be queued
+        if task is self._load_task and not task.is_cancelled():
+            self.model.feed(chunk)
+
+    @profiled("Ui.action_get")
     def action_get(self):
         print("get hierarchy")
 
-        self.datas = self.maya_instance.get_hierarchy()
+        if not self.branches_box.isChecked():
+            self.branch_paths = None
+            self.datas = self.maya_instance.get_hierarchy()
+            return self.datas
+
+        # the branches are placed from the root of the file, when it has one
+        root = JsonInteract.json_root(self.json_path)
+
+        branches = self.maya_instance.get_branches(root)
+        if branches is not None:
+            self.datas, self.branch_paths = branches
 
         return self.datas
 
+    @profiled("Ui.action_write")
     def action_write(self):
         print("write hierarchy in a json")
 
-        # print in the json file
-        JsonInteract.json_write(self.datas, self.json_path)
+        # print in the json file, then only update what changed in the tree view
+        datas = self.datas
+        if datas is None:
+            print("Nothing to write, GET a hierarchy first")
+            return
 
-        # populate the tree view
-        self.populate_tree_view()
+        if self.branch_paths is not None:
+            task = FileTask(_merge_json_task, datas, self.branch_paths, self.json_path)
+            self.start_task(task, on_result=lambda result: self.update_tree_view(result))
+            return
+
+        task = FileTask(_write_json_task, datas, self.json_path)
+        self.start_task(task, on_result=lambda result: self.update_tree_view(datas))
 
+    @profiled("Ui.action_create")
     def action_create(self):
 
         # récupérer le json
-        self.jnt_hierarchy = JsonInteract.json_read(self.json_path)
+        task = FileTask(_read_json_task, self.json_path)
+        self.start_task(task, on_result=self.create_joints)
+
+    @profiled("Ui.create_joints")
+    def create_joints(self, jnt_hierarchy: dict):
+        # maya commands must run in the GUI thread
+        self.jnt_hierarchy = jnt_hierarchy
 
         # symmetrize ?
         symmetrize = self.symmetrize_box.isChecked()
@@ -582,10 +2157,28 @@ class Ui(QtWidgets.QWidget):
 
         # create joints
         suffix = self.suffix_line.text()
+        if self.branches_box.isChecked():
+            paths = self.selected_branch_paths()
+            if not paths:
+                print("Select the joints to create in the tree view")
+                return
+            self.maya_instance.create_branches(self.jnt_hierarchy, paths, suffix=suffix, symmetrize=symmetrize)
+            print("create joint branches")
+            return
+
         self.maya_instance.create_hierarchy(self.jnt_hierarchy, suffix=suffix, symmetrize=symmetrize)
 
         print("create joint hierarchy")
 
+    def selected_branch_paths(self) -> list:
+        """Return the paths of the joints holding the rows selected in the tree view"""
+        paths = []
+        for index in self.view.selectionModel().selectedRows():
+            if self.view.model() is self.proxy:
+                index = self.proxy.mapToSource(index)
+            paths.append(branch_path(self.model.keys(index)))
+        return paths
+
 
 def run(*args):
     import pprint
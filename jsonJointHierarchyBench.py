@@ -0,0 +1,700 @@
+"""Benchmarks for jsonJointHierarchy.
+
+Run it outside of Maya, with the offscreen Qt platform if there is no display :
+    QT_QPA_PLATFORM=offscreen python jsonJointHierarchyBench.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from PySide2 import QtCore, QtWidgets
+
+from fakeCmds import FakeCmds
+import hierarchyBinary
+from jointTable import JointTable
+from treeWalk import preorder
+from jsonJointHierarchy import TreeItem, JsonModel, JsonFilterProxy, JsonInteract, MayaInteract, configure_tree_view
+
+
+# region -- Synthetic documents
+def wide_document(levels: int = 1000, width: int = 1000) -> dict:
+    """Return a document of `levels` dicts holding `width` leaves each (levels * width nodes)"""
+    return {f"level_{i:05d}": {f"joint_{j:05d}": j for j in range(width)} for i in range(levels)}
+
+
+def rig_document(joints: int = 5000, branching: int = 3, seed: int = 0) -> dict:
+    """Return a MayaInteract hierarchy dict of `joints` joints, each with up to `branching` children"""
+    rng = random.Random(seed)
+
+    def joint(index):
+        return {
+            "1_name": f"joint{index:06d}_jnt",
+            "2_pos": [rng.uniform(-10, 10) for _ in range(3)],
+            "2_rot": [rng.uniform(-180, 180) for _ in range(3)],
+        }
+
+    root = joint(0)
+    queue = [root]
+    index = 1
+    while index < joints:
+        parent = queue.pop(0)
+        for _ in range(rng.randint(1, branching)):
+            if index == joints:
+                break
+            child = joint(index)
+            parent.setdefault("3_children", {})[child["1_name"]] = child
+            queue.append(child)
+            index += 1
+
+    return root
+
+
+def chain_document(depth: int = 100000) -> dict:
+    """Return a MayaInteract hierarchy dict of a single chain of `depth` joints"""
+    root = None
+    for index in reversed(range(depth)):
+        joint = {"1_name": f"chain{index:06d}_jnt", "2_pos": [0.0, float(index), 0.0], "2_rot": [0.0, 0.0, 0.0]}
+        if root is not None:
+            joint["3_children"] = {root["1_name"]: root}
+        root = joint
+    return root
+
+
+def fan_document(width: int = 10000) -> dict:
+    """Return a MayaInteract hierarchy dict of a root joint with `width` direct children"""
+    root = _joint("fan_root_jnt", (0.0, 0.0, 0.0))
+    root["3_children"] = {
+        f"fan{index:06d}_jnt": _joint(f"fan{index:06d}_jnt", (float(index), 0.0, 0.0)) for index in range(width)}
+    return root
+
+
+def _joint(name: str, position, children=()) -> dict:
+    datas = {"1_name": name, "2_pos": [float(value) for value in position], "2_rot": [0.0, 0.0, 0.0]}
+    if children:
+        datas["3_children"] = {child["1_name"]: child for child in children}
+    return datas
+
+
+def _chain(names: list, start, step, children=()) -> dict:
+    """Return the first joint of a chain going from start by step, children under the last one"""
+    joint = None
+    for index in reversed(range(len(names))):
+        position = [start[axis] + step[axis] * index for axis in range(3)]
+        joint = _joint(names[index], position, [joint] if joint else children)
+    return joint
+
+
+def biped_document(prefix: str = "", offset=(0.0, 0.0, 0.0)) -> dict:
+    """Return a biped skeleton (spine, neck, arms with five fingers, legs), 58 joints"""
+    x, y, z = offset
+    sides = []
+    for side, sign in (("l", 1), ("r", -1)):
+        fingers = [
+            _chain([f"{prefix}{finger}{index}_{side}" for index in range(1, 4)],
+                   (x + sign * 7.5, y + 14.5, z + (finger_index - 2) * 0.3), (sign * 0.3, -0.1, 0.0))
+            for finger_index, finger in enumerate(("thumb", "index", "middle", "ring", "pinky"))
+        ]
+        arm = _chain([f"{prefix}{name}_{side}" for name in ("clavicle", "upperarm", "forearm", "hand")],
+                     (x + sign * 0.5, y + 15.0, z), (sign * 2.2, -0.1, 0.0), fingers)
+        leg = _chain([f"{prefix}{name}_{side}" for name in ("thigh", "calf", "foot", "ball", "toe")],
+                     (x + sign * 1.0, y + 9.0, z), (0.0, -2.2, 0.4))
+        sides.append((arm, leg))
+
+    head = _chain([f"{prefix}neck{index}_jnt" for index in range(1, 3)] + [f"{prefix}head_jnt"],
+                  (x, y + 15.5, z), (0.0, 0.5, 0.0), [_joint(f"{prefix}jaw_jnt", (x, y + 16.2, z + 0.5))])
+    spine = _chain([f"{prefix}spine{index}_jnt" for index in range(1, 5)], (x, y + 10.5, z), (0.0, 1.2, 0.0),
+                   [head] + [arm for arm, _ in sides])
+    pelvis = _joint(f"{prefix}pelvis_jnt", (x, y + 9.5, z), [spine] + [leg for _, leg in sides])
+    return _joint(f"{prefix}root_jnt", (x, y, z), [pelvis])
+
+
+def quadruped_document(prefix: str = "", offset=(0.0, 0.0, 0.0)) -> dict:
+    """Return a quadruped skeleton (spine, neck, tail, four legs with toes), 56 joints"""
+    x, y, z = offset
+    legs = {}
+    for end, depth in (("front", 6.0), ("back", -6.0)):
+        for side, sign in (("l", 1), ("r", -1)):
+            toes = [_joint(f"{prefix}{end}Toe{index}_{side}", (x + sign * (1.0 + index * 0.2), y, z + depth + 0.8))
+                    for index in range(1, 4)]
+            legs[end, side] = _chain(
+                [f"{prefix}{end}{name}_{side}" for name in ("Shoulder", "Upper", "Lower", "Ankle", "Paw")],
+                (x + sign * 1.0, y + 6.0, z + depth), (0.0, -1.4, 0.1), toes)
+
+    tail = _chain([f"{prefix}tail{index:02d}_jnt" for index in range(1, 11)], (x, y + 6.0, z - 7.0), (0.0, -0.1, -0.6))
+    head = _chain([f"{prefix}neck{index}_jnt" for index in range(1, 5)] + [f"{prefix}head_jnt"],
+                  (x, y + 6.5, z + 7.0), (0.0, 0.5, 0.4), [_joint(f"{prefix}jaw_jnt", (x, y + 8.5, z + 9.5))])
+    chest = _chain([f"{prefix}spine{index}_jnt" for index in range(4, 7)], (x, y + 6.2, z + 2.0), (0.0, 0.0, 1.5),
+                   [head, legs["front", "l"], legs["front", "r"]])
+    spine = _chain([f"{prefix}spine{index}_jnt" for index in range(1, 4)], (x, y + 6.0, z - 5.0), (0.0, 0.0, 2.0),
+                   [chest])
+    hips = _joint(f"{prefix}hips_jnt", (x, y + 6.0, z - 6.0), [spine, tail, legs["back", "l"], legs["back", "r"]])
+    return _joint(f"{prefix}root_jnt", (x, y, z), [hips])
+
+
+def crowd_document(characters: int = 100, seed: int = 0) -> dict:
+    """Return a root holding `characters` bipeds and quadrupeds (two to one), each with its own name prefix"""
+    rng = random.Random(seed)
+    members = []
+    for index in range(characters):
+        offset = (rng.uniform(-500, 500), 0.0, rng.uniform(-500, 500))
+        build = quadruped_document if index % 3 == 2 else biped_document
+        members.append(build(f"c{index:04d}_", offset))
+    return _joint("crowd_root_jnt", (0.0, 0.0, 0.0), members)
+
+# endregion
+
+
+# region -- Helpers
+def timed(func, *args, **kwargs):
+    """Return (result, elapsed seconds) of func(*args, **kwargs)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(name: str, seconds: float, count: int = 0):
+    per_item = f"  {seconds / count * 1e9:8.1f} ns/node" if count else ""
+    print(f"{name:<40} {seconds * 1000:10.2f} ms{per_item}")
+
+
+def iter_items(root: TreeItem):
+    """Yield every item below root, depth first"""
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        for row in range(item.childCount()):
+            child = item.child(row)
+            yield child
+            stack.append(child)
+
+# endregion
+
+
+# region -- Benchmarks
+def bench_tree_item_memory(levels: int = 100, width: int = 1000):
+    """Measure the memory used by one TreeItem"""
+    document = wide_document(levels, width)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    root = TreeItem.load(document)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    count = sum(1 for _ in iter_items(root)) + 1
+    print(f"{'TreeItem memory':<40} {(after - before) / count:10.1f} bytes/node")
+
+
+def bench_row_lookup(levels: int, width: int):
+    """Walk a levels * width document and resolve every item's row, like JsonModel.parent() does"""
+    document = wide_document(levels, width)
+    root, seconds = timed(TreeItem.load, document)
+    count = levels * width + levels
+    report(f"TreeItem.load ({count} nodes)", seconds, count)
+
+    def walk_rows():
+        total = 0
+        for item in iter_items(root):
+            total += item.parent().row()
+        return total
+
+    _, seconds = timed(walk_rows)
+    report("walk + parent().row()", seconds, count)
+
+    # the previous implementation looked the row up with list.index(), only time one level of it
+    level = root.child(0)
+
+    def walk_index():
+        total = 0
+        for row in range(level.childCount()):
+            child = level.child(row)
+            total += level._children.index(child)
+        return total
+
+    _, seconds = timed(walk_index)
+    report(f"one level with list.index() ({width})", seconds, width)
+
+    _, seconds = timed(lambda: sum(level.child(row).row() for row in range(level.childCount())))
+    report(f"one level with stored row ({width})", seconds, width)
+
+
+def bench_model_walk(levels: int, width: int):
+    """Walk every QModelIndex of the JsonModel through index() and parent()"""
+    model = JsonModel()
+    model.load(wide_document(levels, width))
+    count = levels * width + levels
+
+    def walk():
+        stack = [model.index(row, 0) for row in range(model.rowCount())]
+        visited = 0
+        while stack:
+            index = stack.pop()
+            model.parent(index)
+            visited += 1
+            for row in range(model.rowCount(index)):
+                stack.append(model.index(row, 0, index))
+        return visited
+
+    _, seconds = timed(walk)
+    report("JsonModel index() + parent() walk", seconds, count)
+
+
+def bench_lazy_load(levels: int, width: int):
+    """Compare eager and lazy JsonModel.load, the lazy time shouldn't depend on the document size"""
+    document = wide_document(levels, width)
+    count = levels * width + levels
+
+    for lazy in (False, True):
+        model = JsonModel(lazy=lazy)
+
+        def first_paint():
+            model.load(document)
+            # what the view asks for to draw the first screen
+            root = QtCore.QModelIndex()
+            if model.canFetchMore(root):
+                model.fetchMore(root)
+            return [model.data(model.index(row, 0), QtCore.Qt.ItemDataRole.DisplayRole) for row in range(50)]
+
+        _, seconds = timed(first_paint)
+        report(f"JsonModel.load + first rows (lazy={lazy})", seconds, count)
+
+
+def bench_stream_load(levels: int, width: int, chunk_size: int = 5000):
+    """Compare json.load + JsonModel.load with the chunked JsonInteract.json_events stream"""
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "document.json")
+        with open(file_name, "w") as write_file:
+            json.dump(wide_document(levels, width), write_file, indent=2)
+
+        model = JsonModel()
+        tracemalloc.start()
+        _, seconds = timed(lambda: model.load(JsonInteract.json_read(file_name)))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report("json_read + JsonModel.load (blocking)", seconds)
+        print(f"{'  peak memory':<40} {peak / 2 ** 20:10.1f} MB")
+
+        model = JsonModel()
+        events = JsonInteract.json_events(file_name)
+        longest = 0.0
+        tracemalloc.start()
+        start = time.perf_counter()
+        model.begin_stream()
+        while True:
+            chunk, seconds = timed(lambda: list(itertools.islice(events, chunk_size)))
+            _, feed_seconds = timed(model.feed, chunk)
+            longest = max(longest, seconds + feed_seconds)
+            if len(chunk) < chunk_size:
+                break
+        total = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report("json_events + JsonModel.feed (total)", total)
+        report(f"  longest event loop block ({chunk_size} events)", longest)
+        print(f"{'  peak memory':<40} {peak / 2 ** 20:10.1f} MB")
+
+
+def bench_capture(joints: int = 5000):
+    """Compare the per-joint and the batched MayaInteract.get_hierarchy on a fake cmds scene"""
+    fake = FakeCmds()
+    root = fake.add_hierarchy(rig_document(joints))
+    fake.select(root.name)
+    maya = MayaInteract(cmds_backend=fake)
+
+    results = []
+    for batched in (False, True):
+        fake.reset_calls()
+        datas, seconds = timed(maya.get_hierarchy, batched=batched)
+        results.append(datas)
+        report(f"get_hierarchy (batched={batched}, {joints} joints)", seconds, joints)
+        print(f"{'  cmds calls':<40} {fake.call_count():10d}")
+
+    assert results[0] == results[1], "batched capture doesn't match the per-joint capture"
+
+
+def bench_create(joints: int = 5000):
+    """Compare the per-joint and the bulk MayaInteract.create_hierarchy on a fake cmds scene"""
+    datas = rig_document(joints)
+
+    scenes = []
+    for bulk in (False, True):
+        fake = FakeCmds()
+        maya = MayaInteract(cmds_backend=fake)
+        _, seconds = timed(maya.create_hierarchy, datas, suffix="_pasted", symmetrize=True, bulk=bulk)
+        report(f"create_hierarchy (bulk={bulk}, {joints} joints)", seconds, joints)
+        print(f"{'  cmds calls':<40} {fake.call_count():10d}")
+
+        root = next(iter(fake.nodes))
+        scenes.append(maya.capture_hierarchy(root))
+
+    assert scenes[0] == scenes[1], "bulk creation doesn't match the per-joint creation"
+
+
+def bench_branches(joints: int = 20000, depth: int = 5):
+    """Compare re-exporting and rebuilding a whole rig with doing it for one of its branches"""
+    datas = rig_document(joints)
+    path = []
+    joint = datas
+    for _ in range(depth):  # follow the first children down to a branch
+        key = next(iter(joint["3_children"]))
+        path.append(key)
+        joint = joint["3_children"][key]
+    size = sum(1 for _ in preorder(joint, lambda datas: (datas.get("3_children") or {}).values()))
+
+    fake = FakeCmds()
+    fake.add_hierarchy(datas)
+    fake.select(datas["1_name"])
+    maya = MayaInteract(cmds_backend=fake)
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "rig.json")
+        JsonInteract.json_write(datas, file_name, fsync=False)
+
+        fake.reset_calls()
+        captured, seconds = timed(maya.get_hierarchy)
+        _, write_seconds = timed(JsonInteract.json_write, captured, file_name, fsync=False)
+        report(f"get_hierarchy + json_write ({joints} joints)", seconds + write_seconds)
+        print(f"{'  cmds calls':<40} {fake.call_count():10d}")
+
+        JsonInteract.json_read(file_name)  # parsed once already, like after the tree view loaded it
+        fake.reset_calls()
+        (branches, paths), seconds = timed(maya.capture_branches, [joint["1_name"]], datas["1_name"])
+        merged, merge_seconds = timed(JsonInteract.json_merge, branches, paths, file_name, fsync=False)
+        report(f"capture_branches + json_merge ({size} joints)", seconds + merge_seconds)
+        report("  json_merge", merge_seconds)
+        print(f"{'  cmds calls':<40} {fake.call_count():10d}")
+        assert merged == captured, "merged branch doesn't match the whole capture"
+
+    fake = FakeCmds()
+    maya = MayaInteract(cmds_backend=fake)
+    _, seconds = timed(maya.build_joints, datas, "_x")
+    report(f"build_joints ({joints} joints)", seconds)
+    print(f"{'  cmds calls':<40} {fake.call_count():10d}")
+
+    fake.reset_calls()
+    _, seconds = timed(maya.create_branches, datas, [tuple(path)], "_x")
+    report(f"create_branches ({size} joints)", seconds)
+    print(f"{'  cmds calls':<40} {fake.call_count():10d}")
+
+
+def bench_traversal(depth: int = 100000, width: int = 1000000):
+    """Run the treeWalk based functions on a very deep chain and a very wide level"""
+    deep = chain_document(depth)
+
+    root, seconds = timed(TreeItem.load, deep)
+    report(f"TreeItem.load ({depth} deep chain)", seconds, depth)
+
+    model = JsonModel()
+    model.load(deep)
+    _, seconds = timed(model.to_json)
+    report(f"JsonModel.to_json ({depth} deep chain)", seconds, depth)
+
+    fake = FakeCmds()
+    maya = MayaInteract(cmds_backend=fake)
+    _, seconds = timed(maya.create_hierarchy, deep, suffix="_deep", symmetrize=False, bulk=False)
+    report(f"create_children ({depth} deep chain)", seconds, depth)
+
+    root = next(iter(fake.nodes))
+    fake.select(root)
+    _, seconds = timed(maya.get_hierarchy, batched=False)
+    report(f"get_children ({depth} deep chain)", seconds, depth)
+
+    wide = wide_document(1, width)
+
+    root, seconds = timed(TreeItem.load, wide)
+    report(f"TreeItem.load ({width} wide level)", seconds, width)
+
+    model = JsonModel()
+    model.load(wide)
+    _, seconds = timed(model.to_json)
+    report(f"JsonModel.to_json ({width} wide level)", seconds, width)
+
+
+def bench_joint_table(joints: int = 100000):
+    """Compare per-joint dict edits with the vectorized JointTable ones"""
+    datas = rig_document(joints)
+
+    def dict_edits():
+        # what create_children does joint by joint
+        edited = []
+        for joint, _ in preorder(datas, lambda joint: list((joint.get("3_children") or {}).values())):
+            pos = joint["2_pos"]
+            edited.append((MayaInteract.joint_name(joint["1_name"], "_R"), [-pos[0], pos[1], pos[2]]))
+        return edited
+
+    _, seconds = timed(dict_edits)
+    report(f"dict symmetrize + resuffix ({joints} joints)", seconds, joints)
+
+    table, seconds = timed(JointTable.from_hierarchy, datas)
+    report("JointTable.from_hierarchy", seconds, joints)
+
+    edited, seconds = timed(lambda: table.symmetrize().resuffix("_R").translate((0.0, 1.0, 0.0)))
+    report("JointTable symmetrize + resuffix + translate", seconds, joints)
+
+    result, seconds = timed(table.to_hierarchy)
+    report("JointTable.to_hierarchy", seconds, joints)
+    assert result == datas, "JointTable round trip isn't lossless"
+
+
+def bench_binary(joints: int = 100000):
+    """Round trip a rig through the json and binary codecs of JsonInteract and time them"""
+    datas = rig_document(joints)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in (".json", ".jhb"):
+            file_name = os.path.join(directory, "rig" + extension)
+
+            _, seconds = timed(JsonInteract.json_write, datas, file_name)
+            size = os.path.getsize(file_name)
+            report(f"json_write {extension} ({size / 2 ** 20:.1f} MB)", seconds, joints)
+
+            result, seconds = timed(JsonInteract.json_read, file_name)
+            report(f"json_read {extension}", seconds, joints)
+            assert result == datas, f"{extension} round trip isn't lossless"
+
+        table, seconds = timed(hierarchyBinary.read, os.path.join(directory, "rig.jhb"))
+        report("hierarchyBinary.read (JointTable only)", seconds, joints)
+        del table  # releases the memory map
+
+        float32 = hierarchyBinary.decode(hierarchyBinary.encode(JointTable.from_hierarchy(datas), float32=True))
+        error = abs(float32.positions - JointTable.from_hierarchy(datas).positions).max()
+        print(f"{'  float32 max position error':<40} {error:10.2e}")
+
+
+def bench_parse_cache(joints: int = 50000, reads: int = 10):
+    """Time repeated json_read calls on an unchanged file, like repeated CREATE clicks"""
+    datas = rig_document(joints)
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, "rig.json")
+        JsonInteract.json_write(datas, file_name, fsync=False)
+
+        _, seconds = timed(lambda: [JsonInteract.json_read(file_name, cache=False) for _ in range(reads)])
+        report(f"json_read x{reads} without cache", seconds)
+
+        JsonInteract.cache.clear()
+        _, seconds = timed(lambda: [JsonInteract.json_read(file_name) for _ in range(reads)])
+        report(f"json_read x{reads} with cache", seconds)
+        print(f"{'  cache':<40} {JsonInteract.cache.stats()}")
+
+
+def bench_update(levels: int = 100, width: int = 1000):
+    """Compare a full JsonModel.load with JsonModel.update after one edit"""
+    document = wide_document(levels, width)
+    edited = dict(document)
+    edited["level_00000"] = dict(edited["level_00000"], joint_00000=-1)
+    count = levels * width + levels
+
+    for lazy in (False, True):
+        model = JsonModel(lazy=lazy)
+        model.load(document)
+        if lazy:  # what a view shows : the first level and one expanded item
+            model.fetchMore(QtCore.QModelIndex())
+            model.fetchMore(model.index(0, 0))
+
+        _, seconds = timed(model.update, edited)
+        report(f"JsonModel.update, 1 edit (lazy={lazy})", seconds, count)
+        assert model.to_json() == edited
+
+        _, seconds = timed(model.load, edited)
+        report(f"JsonModel.load (lazy={lazy})", seconds, count)
+
+
+def bench_path_index(levels: int, width: int):
+    """Index a lazy model, then look up, search and filter it"""
+    document = wide_document(levels, width)
+    count = levels * width + levels
+    last = f"/level_{levels - 1:05d}/joint_{width - 1:05d}"
+
+    model = JsonModel(lazy=True)
+    model.load(document)
+
+    _, seconds = timed(model.path_index)
+    report("PathIndex build (lazy model)", seconds, count)
+
+    index, seconds = timed(model.index_from_pointer, last)
+    report("JsonModel.index_from_pointer, last item", seconds, 1)
+    assert model.pointer(index) == last
+
+    found, seconds = timed(model.search, f"joint_{width - 1:05d}", values=False)
+    report("JsonModel.search, key substring", seconds, len(found))
+    assert len(found) == levels
+
+    found, seconds = timed(model.search, "level_0", values=False, prefix=True, limit=100)
+    report("JsonModel.search, key prefix, limit 100", seconds, len(found))
+
+    proxy = JsonFilterProxy(limit=levels)
+    proxy.setSourceModel(model)
+    _, seconds = timed(proxy.set_filter, f"joint_{width - 1:05d}")
+    report("JsonFilterProxy.set_filter", seconds, levels)
+    assert len(proxy.matches()) == levels
+
+    # the index follows the edits, the next lookup doesn't build it again
+    first = model.index_from_pointer("/level_00000")
+    _, seconds = timed(model.insert_value, 0, "joint_added", {"1_name": "joint_added"}, first)
+    report("JsonModel.insert_value, index kept", seconds, 1)
+    found, seconds = timed(model.search, "joint_added", values=False)
+    report("JsonModel.search after the edit", seconds, len(found))
+    assert found == ["/level_00000/joint_added"]
+    _, seconds = timed(model.undo)
+    report("EditHistory.undo, index kept", seconds, 1)
+    assert not model.search("joint_added", values=False)
+
+
+def bench_export(levels: int = 500, width: int = 1000):
+    """Compare JsonModel.to_json + json.dump with JsonModel.write_json, time and peak memory"""
+    document = wide_document(levels, width)
+    count = levels * width + levels
+
+    model = JsonModel()
+    model.load(document)
+
+    def dump_tree(buffer):
+        buffer.write(json.dumps(model.to_json(), indent=2).encode("utf-8"))
+
+    def write_items(buffer):
+        model.write_json(buffer, indent=2)
+
+    results = []
+    for name, export in (("to_json + json.dumps", dump_tree), ("write_json", write_items)):
+        with tempfile.TemporaryFile() as buffer:
+            _, seconds = timed(export, buffer)
+
+            buffer.seek(0)
+            tracemalloc.start()
+            export(buffer)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            buffer.seek(0)
+            results.append(buffer.read())
+
+        report(f"JsonModel export, {name}", seconds, count)
+        print(f"{'':<40} {peak / 2 ** 20:10.1f} MB peak")
+
+    assert results[0] == results[1]
+
+
+def bench_history(levels: int, width: int, edits: int = 10000):
+    """Time edits, undo and redo on a big model, they should not depend on its size"""
+    model = JsonModel()
+    model.load(wide_document(levels, width))
+    values = [model.index(row, 1, model.index(row % levels, 0)) for row in range(min(width, edits))]
+
+    def edit():
+        for i in range(edits):
+            model.setData(values[i % len(values)], str(i), QtCore.Qt.ItemDataRole.EditRole)
+
+    _, seconds = timed(edit)
+    report(f"JsonModel.setData ({len(model.history)} commands)", seconds, edits)
+
+    count = len(model.history)
+    _, seconds = timed(lambda: [model.undo() for _ in range(count)])
+    report("EditHistory.undo, every command", seconds, count)
+
+    _, seconds = timed(lambda: model.removeRows(0, levels // 2))
+    report(f"JsonModel.removeRows, {levels // 2} levels", seconds, 1)
+    _, seconds = timed(model.undo)
+    report("EditHistory.undo, removeRows", seconds, 1)
+    _, seconds = timed(model.redo)
+    report("EditHistory.redo, removeRows", seconds, 1)
+    print(f"{'EditHistory size':<40} {model.history.size / 2 ** 20:10.1f} MB")
+
+
+def frame_times(view: QtWidgets.QTreeView, steps) -> list:
+    """Run each step then paint the view at once, return the seconds of each frame"""
+    app = QtWidgets.QApplication.instance()
+    times = []
+    for step in steps:
+        start = time.perf_counter()
+        step()
+        view.viewport().repaint()  # lays the items out first if the step changed them
+        times.append(time.perf_counter() - start)
+        app.processEvents()  # the update() the step queued, outside of the frame
+    return times
+
+
+def report_frames(name: str, times: list):
+    times = sorted(times)
+    print(f"{name:<40} {sum(times) / len(times) * 1e3:10.2f} ms mean"
+          f" {times[len(times) // 2] * 1e3:8.2f} ms median {times[-1] * 1e3:8.2f} ms max")
+
+
+def bench_view(levels: int, width: int, frames: int = 200):
+    """Frame times of a QTreeView expanding and scrolling a levels * width rows model
+
+    Run with QT_QPA_PLATFORM=offscreen to measure without a display.
+    """
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    document = wide_document(levels, width)
+
+    for large in (False, True):
+        mode = "large document" if large else "regular"
+        model = JsonModel(display_cache=4096 if large else 0)
+        model.load(document)
+
+        view = QtWidgets.QTreeView()
+        view.setModel(model)
+        configure_tree_view(view, large, {0: 300})
+        view.resize(800, 600)
+        view.show()
+        app.processEvents()
+
+        rng = random.Random(0)
+        expanded = rng.sample(range(levels), min(frames, levels))
+        times = frame_times(view, [lambda row=row: view.expand(model.index(row, 0)) for row in expanded])
+        report_frames(f"QTreeView expand, {mode}", times)
+
+        _, seconds = timed(lambda: (view.expandAll(), app.processEvents(), view.viewport().repaint()))
+        report(f"QTreeView expandAll, {mode}", seconds, levels * width + levels)
+
+        scroll_bar = view.verticalScrollBar()
+        positions = [rng.randrange(scroll_bar.maximum() + 1) for _ in range(frames)]
+        times = frame_times(view, [lambda position=position: scroll_bar.setValue(position) for position in positions])
+        report_frames(f"QTreeView scroll (jump), {mode}", times)
+
+        times = frame_times(view, [lambda: scroll_bar.triggerAction(QtWidgets.QAbstractSlider.SliderPageStepAdd)] * frames)
+        report_frames(f"QTreeView scroll (page), {mode}", times)
+
+        view.close()
+        view.deleteLater()
+        app.processEvents()
+
+# endregion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    bench_tree_item_memory()
+    bench_row_lookup(args.levels, args.width)
+    bench_model_walk(args.levels, args.width)
+    bench_lazy_load(args.levels, args.width)
+    bench_stream_load(args.levels, args.width)
+    bench_capture()
+    bench_create()
+    bench_branches()
+    bench_traversal()
+    bench_joint_table()
+    bench_binary()
+    bench_parse_cache()
+    bench_update()
+    bench_path_index(args.levels, args.width)
+    bench_export()
+    bench_history(args.levels, args.width)
+    bench_view(args.levels, args.width)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Regression benchmark suite for jsonJointHierarchy.
+
+Runs every synthetic rig shape (chain, fan, biped, quadruped, crowd) through the
+item, model, file and maya paths, the maya ones against fakeCmds.FakeCmds, and
+compares the timings with a stored baseline :
+
+    QT_QPA_PLATFORM=offscreen python jsonJointHierarchySuite.py --save    # store a baseline
+    QT_QPA_PLATFORM=offscreen python jsonJointHierarchySuite.py           # compare with it
+
+Each case keeps the median of --repeats runs and their spread (interquartile range
+over median). Timings are scaled by a pure python calibration loop run at the same
+time, which only roughly covers another machine : store the baseline on the
+machine that runs the gate.
+
+A case regresses when its calibrated time grows by more than --threshold, or by
+more than three times the spread seen on that case when it's noisier, and by more
+than --noise seconds. It also regresses when it runs more maya commands than in
+the baseline. Slower cases are measured again --confirm times and only reported
+if they're slower every time. The exit code is 1 if anything regressed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from fakeCmds import FakeCmds
+from jsonJointHierarchy import TreeItem, JsonModel, JsonInteract, MayaInteract
+from jsonJointHierarchyBench import (
+    biped_document, chain_document, crowd_document, fan_document, quadruped_document)
+from treeWalk import preorder
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jsonJointHierarchySuite.baseline.json")
+
+SHAPES = {
+    # json.dumps/loads recurse twice per joint, deeper chains hit the recursion limit
+    "chain": lambda scale: chain_document(300),
+    "fan": lambda scale: fan_document(5000 * scale),
+    "biped": lambda scale: biped_document(),
+    "quadruped": lambda scale: quadruped_document(),
+    "crowd": lambda scale: crowd_document(50 * scale),
+}
+
+
+# region -- Cases
+def joint_count(datas: dict) -> int:
+    return sum(1 for _ in preorder(datas, lambda datas: (datas.get("3_children") or {}).values()))
+
+
+def scene_with(datas: dict) -> FakeCmds:
+    """Return a fake scene holding datas, its root selected"""
+    fake = FakeCmds()
+    fake.add_hierarchy(datas)
+    fake.select(datas["1_name"])
+    fake.reset_calls()
+    return fake
+
+
+def cases(datas: dict, directory: str) -> dict:
+    """Return {case name: (setup, run)}, run(setup()) is timed, setup isn't
+
+    run returns the FakeCmds it used, if any, to count the maya commands.
+    """
+    file_name = os.path.join(directory, "hierarchy.json")
+    JsonInteract.json_write(datas, file_name, fsync=False)
+
+    def loaded_model():
+        model = JsonModel()
+        model.load(datas)
+        return model
+
+    def write_json(_):
+        JsonInteract.json_write(datas, file_name, fsync=False)
+
+    def get_hierarchy(fake):
+        MayaInteract(cmds_backend=fake).get_hierarchy()
+        return fake
+
+    def create_hierarchy(fake):
+        MayaInteract(cmds_backend=fake).create_hierarchy(datas, suffix="_bench")
+        return fake
+
+    return {
+        "TreeItem.load": (lambda: None, lambda _: TreeItem.load(datas)),
+        "JsonModel.load": (JsonModel, lambda model: model.load(datas)),
+        "JsonModel.to_json": (loaded_model, lambda model: model.to_json()),
+        "JsonModel.write_json": (loaded_model, lambda model: model.dumps()),
+        "JsonInteract.json_write": (lambda: None, write_json),
+        "JsonInteract.json_read": (lambda: None, lambda _: JsonInteract.json_read(file_name, cache=False)),
+        "MayaInteract.get_hierarchy": (lambda: scene_with(datas), get_hierarchy),
+        "MayaInteract.create_hierarchy": (FakeCmds, create_hierarchy),
+    }
+
+
+def measure(setup, run, repeats: int) -> tuple:
+    """Return the median time of repeats runs, their spread, and the maya commands of the last one
+
+    The spread is the interquartile range over the median, 0 with less than 4 runs.
+    """
+    times = []
+    calls = None
+    for _ in range(repeats):
+        state = setup()
+        gc.collect()
+        gc.disable()  # a collection landing in one run but not the other is most of the noise
+        try:
+            start = time.perf_counter()
+            result = run(state)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        if isinstance(result, FakeCmds):
+            calls = result.call_count()
+
+    median = statistics.median(times)
+    spread = 0.0
+    if len(times) >= 4 and median:
+        quartiles = statistics.quantiles(times, n=4)
+        spread = (quartiles[2] - quartiles[0]) / median
+    return median, spread, calls
+
+
+def calibrate(repeats: int = 9) -> float:
+    """Median time of a fixed pure python workload, the unit the timings are compared in"""
+    def workload():
+        items = {}
+        for index in range(200000):
+            items[f"joint_{index}"] = [index, index * 0.5, str(index)]
+        return sorted(items, reverse=True)
+
+    return measure(lambda: None, lambda _: workload(), repeats)[0]
+
+# endregion
+
+
+def run_suite(shapes=None, scale: int = 1, repeats: int = 9, verbose=True, only=None) -> dict:
+    """Run every case on every shape, return the results in the baseline format
+
+    only is a set of "shape/case" names to run, all of them by default.
+    """
+    results = {}
+    calibration = calibrate()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in shapes or SHAPES:
+            if only is not None and not any(name.startswith(shape + "/") for name in only):
+                continue
+            datas = SHAPES[shape](scale)
+            joints = joint_count(datas)
+
+            for case, (setup, run) in cases(datas, directory).items():
+                if only is not None and f"{shape}/{case}" not in only:
+                    continue
+                seconds, spread, calls = measure(setup, run, repeats)
+                results[f"{shape}/{case}"] = {"seconds": seconds, "spread": spread, "calls": calls, "joints": joints}
+                if verbose:
+                    commands = f"{calls:8d} cmds" if calls is not None else ""
+                    print(f"{shape + '/' + case:<45} {seconds * 1000:10.2f} ms {joints:8d} joints {commands}")
+
+    calibration = min(calibration, calibrate())  # before and after, in case the machine was busy at first
+
+    return {
+        "calibration": calibration,
+        "scale": scale,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25, noise: float = 0.002) -> list:
+    """Return the (case, message) of every case slower than baseline, print the comparison"""
+    if current.get("scale") != baseline.get("scale"):
+        raise ValueError(f"The baseline was stored with --scale {baseline.get('scale')}, not {current.get('scale')}")
+
+    scale = current["calibration"] / baseline["calibration"]
+    regressions = []
+
+    print(f"{'case':<45} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for case, result in current["results"].items():
+        base = baseline["results"].get(case)
+        if base is None:
+            print(f"{case:<45} {'-':>10} {result['seconds'] * 1000:8.2f}ms    new")
+            continue
+
+        expected = base["seconds"] * scale  # the baseline time on this machine
+        ratio = result["seconds"] / expected if expected else 1.0
+        # a case that was noisy when measured gets a wider margin
+        allowed = max(threshold, 3 * max(base.get("spread", 0.0), result.get("spread", 0.0)))
+        status = ""
+
+        if ratio > 1 + allowed and result["seconds"] - expected > noise:
+            status = "SLOWER"
+            regressions.append((case, f"{ratio:.2f}x the baseline time"))
+        if base["calls"] is not None and result["calls"] is not None and result["calls"] > base["calls"]:
+            status = "MORE CMDS"
+            regressions.append((case, f"{result['calls']} maya commands instead of {base['calls']}"))
+
+        print(f"{case:<45} {expected * 1000:8.2f}ms {result['seconds'] * 1000:8.2f}ms {ratio:7.2f} {status}")
+
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), help="rig shapes to run, all by default")
+    parser.add_argument("--scale", type=int, default=1, help="multiply the size of fan and crowd")
+    parser.add_argument("--repeats", type=int, default=9, help="runs per case, the median is kept")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file to compare with or save to")
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown ratio reported as a regression")
+    parser.add_argument("--noise", type=float, default=0.002, help="slowdowns under this many seconds are ignored")
+    parser.add_argument("--confirm", type=int, default=2, help="times a slower case is measured again")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.shapes, args.scale, args.repeats)
+
+    if args.save:
+        with open(args.baseline, mode="w", encoding="utf-8") as write_file:
+            json.dump(current, write_file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, store one with --save")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as read_file:
+        baseline = json.load(read_file)
+
+    print()
+    regressions = compare(current, baseline, args.threshold, args.noise)
+
+    for _ in range(args.confirm):
+        slower = {case for case, _ in regressions}
+        if not slower:
+            break
+        # a slowdown caused by the machine rarely lasts, a real one does
+        print(f"\nMeasuring {len(slower)} slower cases again")
+        again = run_suite(args.shapes, args.scale, args.repeats, verbose=False, only=slower)
+        regressions = [regression for regression in compare(again, baseline, args.threshold, args.noise)
+                       if regression[0] in slower]
+
+    for case, message in regressions:
+        print(f"REGRESSION {case} : {message}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
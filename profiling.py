@@ -0,0 +1,266 @@
+"""Timings and counters of the jsonJointHierarchy tool.
+
+The Ui actions, JsonModel.load, the file tasks and every maya command run by
+MayaInteract are recorded by the process-wide `profiler` once it is enabled,
+from the code or with the JSON_JOINT_HIERARCHY_PROFILE environment variable :
+
+    profiler.enable()
+    ...  # GET, WRITE, CREATE
+    profiler.write_json("summary.json")         # count, total/min/max ms and nodes per name
+    profiler.write_chrome_trace("trace.json")   # chrome://tracing or https://ui.perfetto.dev
+
+When JSON_JOINT_HIERARCHY_PROFILE is a path prefix rather than 1, the window
+writes <prefix>.summary.json and <prefix>.trace.json when it closes (write_reports).
+
+Disabled, a profiled function costs one attribute check and MayaInteract uses
+its cmds backend directly.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+from collections import Counter, deque
+
+
+class Span:
+    """One timed block, add arguments to it with set() while it runs"""
+
+    __slots__ = ("name", "start", "duration", "thread", "args")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.start = time.perf_counter_ns()
+        self.duration = 0
+        self.thread = threading.get_ident()
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Profiler:
+    """Record spans (name, start, duration, arguments) and counters
+
+    At most max_spans spans are kept, the oldest ones are dropped first. The
+    summary keeps counting them.
+    """
+
+    def __init__(self, enabled=False, max_spans: int = 1000000):
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        self.counters = Counter()
+        self._totals = {}  # name -> [count, total ns, min ns, max ns, nodes]
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._wrapped = {}  # id(cmds backend) -> (backend, CmdsProfiler)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+            self._totals.clear()
+            self._origin = time.perf_counter_ns()
+
+    # region -- Recording
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        """Time the block, yield the Span so the block can add arguments (nodes=...)"""
+        if not self.enabled:
+            yield _NULL_SPAN
+            return
+
+        span = Span(name, args)
+        try:
+            yield span
+        finally:
+            self.end_span(span)
+
+    def start_span(self, name: str, **args):
+        """Start a span ended by end_span(), for work that ends in a later call (a FileTask signal)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(name, args)
+
+    def end_span(self, span, **args):
+        """Record a span of start_span() with more arguments, once"""
+        if span is _NULL_SPAN or span.duration:
+            return
+        span.args.update(args)
+        span.duration = time.perf_counter_ns() - span.start
+        self._record(span)
+
+    def count(self, name: str, value: int = 1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += value
+
+    def _record(self, span: Span):
+        nodes = span.args.get("nodes", 0)
+        with self._lock:
+            self.spans.append(span)
+            totals = self._totals.get(span.name)
+            if totals is None:
+                self._totals[span.name] = [1, span.duration, span.duration, span.duration, nodes]
+            else:
+                totals[0] += 1
+                totals[1] += span.duration
+                totals[2] = min(totals[2], span.duration)
+                totals[3] = max(totals[3], span.duration)
+                totals[4] += nodes
+
+    def profiled(self, name: str = None):
+        """Decorator timing every call of a function while the profiler is enabled"""
+        def decorator(function):
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.span(span_name):
+                    return function(*args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    def wrap_cmds(self, backend):
+        """Return backend with every command timed, the same wrapper for the same backend"""
+        entry = self._wrapped.get(id(backend))
+        if entry is None or entry[0] is not backend:
+            entry = self._wrapped[id(backend)] = (backend, CmdsProfiler(backend, self))
+        return entry[1]
+
+    # endregion
+
+    # region -- Export
+    def summary(self) -> dict:
+        """Return {name: {count, total_ms, mean_ms, min_ms, max_ms, nodes}} and the counters"""
+        with self._lock:
+            totals = {name: list(values) for name, values in self._totals.items()}
+            counters = dict(self.counters)
+
+        spans = {}
+        for name, (count, total, low, high, nodes) in sorted(totals.items()):
+            spans[name] = {
+                "count": count,
+                "total_ms": total / 1e6,
+                "mean_ms": total / count / 1e6,
+                "min_ms": low / 1e6,
+                "max_ms": high / 1e6,
+                "nodes": nodes,
+            }
+        return {"spans": spans, "counters": counters}
+
+    def chrome_trace(self) -> dict:
+        """Return the spans in the Chrome trace event format (complete "X" events)"""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+            origin = self._origin
+
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.name.partition(".")[0],
+                "ph": "X",
+                "ts": (span.start - origin) / 1e3,
+                "dur": span.duration / 1e3,
+                "pid": pid,
+                "tid": span.thread,
+                "args": span.args,
+            }
+            for span in spans
+        ]
+        if counters:
+            events.append({"name": "counters", "ph": "C", "ts": 0, "pid": pid, "args": counters})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_json(self, file_name: str):
+        with open(file_name, mode="w", encoding="utf-8") as write_file:
+            json.dump(self.summary(), write_file, indent=2, default=str)
+
+    def write_chrome_trace(self, file_name: str):
+        with open(file_name, mode="w", encoding="utf-8") as write_file:
+            json.dump(self.chrome_trace(), write_file, default=str)
+
+    def write_reports(self, prefix: str = None) -> bool:
+        """Write the summary and the trace next to prefix, REPORT_PREFIX by default"""
+        prefix = prefix or REPORT_PREFIX
+        if not prefix:
+            return False
+        self.write_json(f"{prefix}.summary.json")
+        self.write_chrome_trace(f"{prefix}.trace.json")
+        return True
+
+    # endregion
+
+
+class CmdsProfiler:
+    """maya.cmds (or a stand-in) whose functions are timed as "cmds.<name>" spans
+
+    The nodes argument of a span is the number of node names the command returned
+    (ls, listRelatives, createNode), or else the number of objects it was given (xform).
+    """
+
+    def __init__(self, backend, profiler: Profiler):
+        self._backend = backend
+        self._profiler = profiler
+        self._functions = {}
+
+    def __getattr__(self, name: str):
+        function = self._functions.get(name)
+        if function is None:
+            function = self._functions[name] = self._timed(name, getattr(self._backend, name))
+        return function
+
+    def _timed(self, name: str, command):
+        span_name = f"cmds.{name}"
+        profiler = self._profiler
+
+        @functools.wraps(command)
+        def timed(*args, **kwargs):
+            with profiler.span(span_name) as span:
+                result = command(*args, **kwargs)
+                span.set(nodes=_node_count(args, result))
+                return result
+
+        return timed
+
+
+def _node_count(args: tuple, result) -> int:
+    if isinstance(result, str):
+        return 1
+    if isinstance(result, (list, tuple)) and result and isinstance(result[0], str):
+        return len(result)
+    return sum(len(arg) if isinstance(arg, (list, tuple)) else 1 for arg in args)
+
+
+_PROFILE = os.environ.get("JSON_JOINT_HIERARCHY_PROFILE", "")
+REPORT_PREFIX = _PROFILE if _PROFILE not in ("", "0", "1") else None
+
+profiler = Profiler(enabled=_PROFILE not in ("", "0"))
+profiled = profiler.profiled
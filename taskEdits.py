@@ -0,0 +1,131 @@
+"""Time edits of timeLogApp waiting to be sent to the task tracker, without any Qt import.
+
+Clicking + or - on a task doesn't send anything right away, the edit is added to
+an EditQueue holding one net delta per task and day :
+
+    queue = EditQueue(max_pending=50)
+    queue.add("Task11", "2024-05-02", 5)
+    queue.add("Task11", "2024-05-02", 5)   # still one edit, +10 minutes
+    queue.flush(source)                    # one source.push() for every task edited
+
+The window flushes the queue once the clicks stop for a moment (a debounce timer)
+or as soon as add() says max_pending tasks are waiting. A batch that failed keeps
+its key and its edits and is sent again as it was, before any newer edit, so a
+batch the tracker applied but couldn't answer isn't applied twice.
+"""
+
+from __future__ import annotations
+
+import threading
+import uuid
+
+
+class EditBatch:
+    """Edits sent together under one idempotency key"""
+
+    def __init__(self, edits: dict):
+        self.key = uuid.uuid4().hex
+        self.edits = edits  # (task, day) -> minutes
+        self.attempts = 0
+
+    def __len__(self) -> int:
+        return len(self.edits)
+
+    def __repr__(self) -> str:
+        return f"<EditBatch {self.key[:8]} {len(self)} edits, {self.attempts} attempts>"
+
+    def payload(self) -> list:
+        """Return the edits in the format of TaskSource.push"""
+        return [{"task": task, "day": day, "minutes": minutes} for (task, day), minutes in self.edits.items()]
+
+
+class EditQueue:
+    """Net time deltas per task and day, sent in batches of at most one in flight"""
+
+    def __init__(self, max_pending: int = 50):
+        self.max_pending = max_pending  # tasks waiting before add() asks for a flush
+        self._lock = threading.Lock()
+        self._pending = {}  # (task, day) -> minutes, not sent yet
+        self._retry = None  # EditBatch that failed, sent again before the pending edits
+        self._sending = None  # EditBatch in flight
+        self.batches_sent = 0
+
+    def __len__(self) -> int:
+        """Number of task edits not confirmed by the tracker yet"""
+        with self._lock:
+            return len(self._pending) + len(self._retry or ()) + len(self._sending or ())
+
+    def add(self, task: str, day: str, minutes: int) -> bool:
+        """Add minutes to the pending delta of a task, return True when the queue should be flushed now"""
+        with self._lock:
+            total = self._pending.get((task, day), 0) + minutes
+            if total:
+                self._pending[(task, day)] = total
+            else:
+                self._pending.pop((task, day), None)  # a + undone by a - sends nothing
+            return len(self._pending) >= self.max_pending
+
+    def unconfirmed(self) -> dict:
+        """Return the {(task, day): minutes} not confirmed by the tracker yet : pending, in flight or to retry"""
+        with self._lock:
+            edits = dict(self._pending)
+            for batch in (self._sending, self._retry):
+                for key, minutes in (batch.edits.items() if batch is not None else ()):
+                    edits[key] = edits.get(key, 0) + minutes
+        return edits
+
+    # region -- Sending
+    def next_batch(self):
+        """Return the batch to send now and mark it in flight, None if there is none or one is in flight
+
+        The failed batch comes first, unchanged.
+        """
+        with self._lock:
+            if self._sending is not None:
+                return None
+            if self._retry is not None:
+                batch, self._retry = self._retry, None
+            elif self._pending:
+                batch, self._pending = EditBatch(self._pending), {}
+            else:
+                return None
+
+            batch.attempts += 1
+            self._sending = batch
+            return batch
+
+    def sent(self, batch: EditBatch):
+        """The tracker applied batch"""
+        with self._lock:
+            if self._sending is batch:
+                self._sending = None
+                self.batches_sent += 1
+
+    def failed(self, batch: EditBatch):
+        """batch may or may not have been applied, keep it to send again with the same key"""
+        with self._lock:
+            if self._sending is batch:
+                self._sending = None
+                self._retry = batch
+
+    def flush(self, source, retries: int = 0) -> list:
+        """Push every batch waiting to source, from this thread, return the records changed
+
+        A failing batch is pushed again until it was tried retries + 1 times, then the
+        error is raised and the batch stays queued.
+        """
+        records = []
+        while True:
+            batch = self.next_batch()
+            if batch is None:
+                return records
+            try:
+                records.extend(source.push(batch.payload(), batch.key))
+            except Exception:
+                self.failed(batch)
+                if batch.attempts > retries:
+                    raise
+            else:
+                self.sent(batch)
+
+    # endregion
@@ -0,0 +1,179 @@
+"""Checks and benchmarks of the timeLogApp edit queue against fakeTaskServer.FakeTaskServer.
+
+Runs taskEdits.EditQueue against the stand-in tracker and checks, from the
+requests the server counted, that clicks are coalesced, that failed batches are
+retried with their key and that no edit is ever applied twice. No Qt is needed :
+    python taskEditsBench.py --clicks 2000 --latency 0.02
+
+An assert fails if the queue misbehaves.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+
+from fakeTaskServer import FakeTaskServer
+from taskEdits import EditQueue
+from taskSource import HttpTaskSource, format_code, parse_code
+from taskStore import SyncedTaskSource, TaskStore
+from timeLogBench import report, timed
+
+TODAY = datetime.date.today().isoformat()
+
+
+def tracker(tasks: int = 3, latency: float = 0.0) -> FakeTaskServer:
+    """Return a server holding Task0..TaskN logged today, 1 hour each, started by a with block"""
+    server = FakeTaskServer(latency=latency)
+    for index in range(tasks):
+        server.set_task(f"Task{index}", "001-000", TODAY)
+    return server
+
+
+def code(server: FakeTaskServer, task: str) -> str:
+    return server.records[f"{task}@{TODAY}"]["code"]
+
+
+# region -- Checks
+def check_coalescing(clicks: int = 300):
+    """Many clicks on a few tasks are one request, a + undone by a - isn't sent"""
+    with tracker() as server:
+        queue = EditQueue()
+        for click in range(clicks):
+            queue.add("Task0", TODAY, 5)
+            queue.add("Task1", TODAY, 5 if click % 2 else -5)  # nets to zero
+            queue.add("Task2", TODAY, 1)
+        assert len(queue) == 2, "Task1 should have been dropped"
+
+        queue.flush(HttpTaskSource(server.url))
+        assert server.requests["POST /edits"] == 1, server.requests
+        assert server.edits_applied == 2
+        assert code(server, "Task0") == format_code(60 + 5 * clicks)
+        assert code(server, "Task1") == "001-000"
+        assert code(server, "Task2") == format_code(60 + clicks)
+        assert len(queue) == 0
+    print(f"{'coalescing':<40} ok, {clicks * 3} clicks in 1 request")
+
+
+def check_threshold():
+    queue = EditQueue(max_pending=3)
+    assert not queue.add("Task0", TODAY, 5)
+    assert not queue.add("Task0", TODAY, 5), "the same task twice is still one edit"
+    assert not queue.add("Task1", TODAY, 5)
+    assert queue.add("Task2", TODAY, 5), "add() should ask for a flush at max_pending tasks"
+    print(f"{'threshold':<40} ok")
+
+
+def check_failed_before_applying():
+    """A 503 leaves the batch queued, it's sent again with its key before newer edits"""
+    with tracker() as server:
+        source = HttpTaskSource(server.url)
+        queue = EditQueue()
+        server.fail_edits = 1
+        queue.add("Task0", TODAY, 10)
+        try:
+            queue.flush(source)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("the 503 wasn't raised")
+        assert len(queue) == 1 and server.edits_applied == 0
+
+        queue.add("Task0", TODAY, 5)  # waits behind the failed batch, in a batch of its own
+        queue.flush(source)
+        assert server.requests["POST /edits"] == 3, server.requests
+        assert server.edits_applied == 2
+        assert code(server, "Task0") == "001-015"
+    print(f"{'503 then retry':<40} ok, {server.requests['POST /edits']} requests")
+
+
+def check_lost_answers():
+    """Batches applied but never answered are sent again and applied once"""
+    with tracker() as server:
+        source = HttpTaskSource(server.url)
+        queue = EditQueue()
+
+        # once : HttpTaskSource sends it again on a new connection, the server knows the key
+        server.lose_edits = 1
+        queue.add("Task0", TODAY, 60)
+        records = queue.flush(source)
+        assert server.requests["POST /edits"] == 2, server.requests
+        assert [record["code"] for record in records] == ["002-000"]
+
+        # twice : the flush fails, the queue sends the same batch on the next one
+        server.lose_edits = 2
+        queue.add("Task0", TODAY, 60)
+        try:
+            queue.flush(source)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("the lost answers weren't raised")
+        queue.flush(source)
+        assert server.requests["POST /edits"] == 5, server.requests
+        assert server.edits_applied == 2, "a batch was applied twice"
+        assert code(server, "Task0") == "003-000"
+    print(f"{'lost answers':<40} ok, {server.requests['POST /edits']} requests, 2 edits applied")
+
+
+def check_synced_store():
+    """Records answered by the tracker land in the local store"""
+    with tracker() as server:
+        store = TaskStore()
+        source = SyncedTaskSource(store, HttpTaskSource(server.url))
+        queue = EditQueue()
+        queue.add("Task1", TODAY, -30)
+        queue.flush(source)
+        assert store.task("Task1")[0]["code"] == "000-030"
+        assert code(server, "Task1") == "000-030"
+    print(f"{'synced store':<40} ok")
+
+# endregion
+
+
+def bench_clicks(clicks: int, tasks: int, latency: float):
+    """Time one request per click against the coalesced queue"""
+    with tracker(tasks, latency) as server:
+        source = HttpTaskSource(server.url)
+
+        def per_click():
+            for click in range(clicks):
+                source.push([{"task": f"Task{click % tasks}", "day": TODAY, "minutes": 5}], key=f"click{click}")
+
+        _, seconds = timed(per_click)
+        report(f"one request per click ({clicks} clicks)", seconds, clicks)
+        requests = server.request_count()
+
+        queue = EditQueue(max_pending=tasks)
+
+        def coalesced():
+            for click in range(clicks):
+                if queue.add(f"Task{click % tasks}", TODAY, 5):
+                    queue.flush(source)
+            queue.flush(source)
+
+        _, seconds = timed(coalesced)
+        report("EditQueue", seconds, clicks)
+        print(f"{'  requests':<40} {requests:10d} -> {server.request_count() - requests}")
+
+        logged = sum(parse_code(code(server, f"Task{index}")) - 60 for index in range(tasks))
+        assert logged == 2 * 5 * clicks, "both runs should have added 5 minutes per click"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clicks", type=int, default=300)
+    parser.add_argument("--tasks", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds the tracker takes per request")
+    args = parser.parse_args(argv)
+
+    check_coalescing()
+    check_threshold()
+    check_failed_before_applying()
+    check_lost_answers()
+    check_synced_store()
+    bench_clicks(args.clicks, args.tasks, args.latency)
+
+
+if __name__ == '__main__':
+    main()
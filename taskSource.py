@@ -0,0 +1,291 @@
+"""Where timeLogApp gets its tasks from, without any Qt import.
+
+A task source yields (bucket, {task: time code}, {task: day}) triples, one per time
+bucket, as soon as each one is known. The day is the iso day the time code was
+logged on, the one an edit of the task goes to :
+
+    StaticTaskSource    a dict held in memory, the exercise mode of timeLogApp
+    HttpTaskSource      the task tracker over http, see fakeTaskServer.py for a local stand-in
+
+HttpTaskSource asks for every bucket in a single request and the tracker answers
+with one json line per bucket (application/x-ndjson), so the first bucket can be
+shown while the others are still coming. The http connections are kept
+open and reused between requests.
+
+Sources that can be synced (HttpTaskSource) also give the task records changed
+since a cursor, see changes() and taskStore.SyncedTaskSource. A record is :
+    {"id": "Task11@2024-05-02", "task": "Task11", "day": "2024-05-02", "code": "001-025",
+     "updated": 1714650000.0, "deleted": false}
+
+Time edits are pushed in batches (see taskEdits.EditQueue), each edit moves the
+time code of a task on a day by some minutes :
+    source.push([{"task": "Task11", "day": "2024-05-02", "minutes": 15}], key="<batch key>")
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime
+import http.client
+import json
+import socket
+import threading
+import urllib.parse
+
+BUCKETS = ("Today", "Yesterday", "Past Week")
+BUCKET_DAYS = {"Today": (0, 0), "Yesterday": (1, 1), "Past Week": (2, 7)}  # days ago, first and last
+
+
+# region -- Records
+def bucket_days(bucket: str, today: datetime.date = None) -> tuple:
+    """Return the (oldest, newest) iso days of a bucket"""
+    today = today or datetime.date.today()
+    newest, oldest = BUCKET_DAYS[bucket]
+    return (
+        (today - datetime.timedelta(days=oldest)).isoformat(),
+        (today - datetime.timedelta(days=newest)).isoformat(),
+    )
+
+
+def bucket_of(day: str, today: datetime.date = None):
+    """Return the bucket of an iso day, None when it's in none of them"""
+    today = today or datetime.date.today()
+    ago = (today - datetime.date.fromisoformat(day)).days
+    for bucket, (newest, oldest) in BUCKET_DAYS.items():
+        if newest <= ago <= oldest:
+            return bucket
+    return None
+
+
+def parse_code(code: str) -> int:
+    """Return the minutes of a time code "<hours>-<minutes>", "001-025" -> 85"""
+    hours, dash, minutes = code.partition("-")
+    if not dash or not hours.isdigit() or not minutes.isdigit():
+        raise ValueError(f"Invalid time code : {code!r}, expected <hours>-<minutes>")
+    return int(hours) * 60 + int(minutes)
+
+
+def format_code(minutes: int) -> str:
+    """Return the time code of minutes, 85 -> "001-025" """
+    return f"{minutes // 60:03d}-{minutes % 60:03d}"
+
+
+def add_minutes(code: str, minutes: int) -> str:
+    """Return a time code moved by minutes, never under zero"""
+    return format_code(max(0, parse_code(code) + minutes))
+
+
+def records_from_buckets(tasks: dict, today: datetime.date = None, updated: float = 0.0) -> list:
+    """Return the records of a {bucket: {task: time code}} dict, each on the newest day of its bucket"""
+    records = []
+    for bucket, codes in tasks.items():
+        day = bucket_days(bucket, today)[1]
+        for task, code in codes.items():
+            records.append(
+                {"id": f"{task}@{day}", "task": task, "day": day, "code": code, "updated": updated, "deleted": False})
+    return records
+
+# endregion
+
+
+class TaskSource:
+    """Base of the task sources"""
+
+    def fetch(self, buckets=BUCKETS):
+        """Yield (bucket, {task: time code}, {task: iso day}) for each of buckets, in the order they arrive"""
+        raise NotImplementedError
+
+    def fetch_all(self, buckets=BUCKETS) -> dict:
+        """Return the {bucket: {task: time code}} of buckets"""
+        return {bucket: tasks for bucket, tasks, _ in self.fetch(buckets)}
+
+    def changes(self, since: float = 0.0) -> tuple:
+        """Return (records changed since the cursor since, cursor of the next call)"""
+        raise NotImplementedError(f"{type(self).__name__} can't be synced")
+
+    def push(self, edits: list, key: str) -> list:
+        """Apply a batch of time edits, return the records they changed
+
+        key identifies the batch, a batch pushed again with the same key after a
+        failure is applied only once.
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't be edited")
+
+    def close(self):
+        pass
+
+
+class StaticTaskSource(TaskSource):
+    """Tasks of a {bucket: {task: time code}} dict, edits are applied to the dict
+
+    Each task is logged on the newest day of its bucket, like records_from_buckets.
+    """
+
+    def __init__(self, tasks: dict):
+        self.tasks = tasks
+        self._pushed = {}  # batch key -> records
+
+    def fetch(self, buckets=BUCKETS):
+        for bucket in buckets:
+            tasks = dict(self.tasks.get(bucket, {}))
+            day = bucket_days(bucket)[1]
+            yield bucket, tasks, dict.fromkeys(tasks, day)
+
+    def push(self, edits: list, key: str) -> list:
+        if key in self._pushed:
+            return self._pushed[key]
+
+        records = []
+        for edit in edits:
+            bucket = bucket_of(edit["day"])
+            if bucket is None:
+                continue
+            codes = self.tasks.setdefault(bucket, {})
+            codes[edit["task"]] = add_minutes(codes.get(edit["task"], "000-000"), edit["minutes"])
+            records.append({
+                "id": f"{edit['task']}@{edit['day']}", "task": edit["task"], "day": edit["day"],
+                "code": codes[edit["task"]], "updated": 0.0, "deleted": False,
+            })
+        self._pushed[key] = records
+        return records
+
+
+class HttpTaskSource(TaskSource):
+    """Tasks of the tracker at url, GET <url>/tasks?bucket=Today&bucket=Yesterday...
+
+    Connections are kept alive in a pool shared by every thread, a request takes an
+    idle one and gives it back once its response is read. A request failing on a
+    connection the server already closed is sent again once on a new connection.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0, headers: dict = None):
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported task tracker url : {url}")
+
+        self.url = url
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self._scheme = parts.scheme
+        self._netloc = parts.netloc
+        self._path = parts.path.rstrip("/")
+        self._lock = threading.Lock()
+        self._idle = []  # connections ready for the next request
+        self._busy = {}  # connection -> generation it was opened in
+        self._generation = 0  # bumped by close(), older connections aren't reused
+        self.requests = 0
+        self.connects = 0
+
+    # region -- Connections
+    def _acquire(self, fresh=False) -> http.client.HTTPConnection:
+        with self._lock:
+            if self._idle and not fresh:
+                connection = self._idle.pop()
+            else:
+                connection_type = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+                connection = connection_type(self._netloc, timeout=self.timeout)
+                self.connects += 1
+            self._busy[connection] = self._generation
+        return connection
+
+    def _release(self, connection: http.client.HTTPConnection, reuse=True):
+        with self._lock:
+            generation = self._busy.pop(connection, None)
+            if reuse and generation == self._generation:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        """Close every connection, a request waiting on one of them fails right away"""
+        with self._lock:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+            busy = list(self._busy)
+
+        for connection in idle:
+            connection.close()
+        for connection in busy:  # closed by their request once it fails
+            if connection.sock is not None:
+                with contextlib.suppress(OSError):
+                    connection.sock.shutdown(socket.SHUT_RDWR)
+
+    @contextlib.contextmanager
+    def request(self, method: str, path: str, query=None, body=None):
+        """Send a request on a pooled connection, yield its response to read inside the block"""
+        target = self._path + path
+        if query:
+            target += "?" + urllib.parse.urlencode(query, doseq=True)
+
+        headers = {"Accept": "application/x-ndjson, application/json", **self.headers}
+        if body is not None:
+            body = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        generation = self._generation
+        for attempt in range(2):
+            connection = self._acquire(fresh=attempt > 0)
+            try:
+                connection.request(method, target, body=body, headers=headers)
+                response = connection.getresponse()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self._release(connection, reuse=False)
+                if attempt or generation != self._generation:
+                    raise
+                # the server closed the idle connection, try once on a new one
+            except BaseException:
+                self._release(connection, reuse=False)
+                raise
+
+        with self._lock:
+            self.requests += 1
+
+        try:
+            if response.status >= 400:
+                message = response.read().decode("utf-8", "replace")
+                raise ConnectionError(f"{method} {target} : {response.status} {response.reason} {message}".strip())
+            yield response
+        except BaseException:
+            self._release(connection, reuse=False)
+            raise
+
+        # a response left half read can't carry the next request
+        self._release(connection, reuse=response.isclosed() and not response.will_close)
+
+    # endregion
+
+    def fetch(self, buckets=BUCKETS):
+        with self.request("GET", "/tasks", {"bucket": list(buckets)}) as response:
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                if line.strip():
+                    record = json.loads(line)
+                    # a tracker not sending the days logs each task on the newest day of its bucket
+                    days = record.get("days") or dict.fromkeys(record["tasks"], bucket_days(record["bucket"])[1])
+                    yield record["bucket"], record["tasks"], days
+
+    def changes(self, since: float = 0.0) -> tuple:
+        """GET <url>/changes?since=..., one json line per record then {"cursor": ...}
+
+        The cursor is the tracker's clock when it started answering, records changed at
+        that very time come again in the next call, which is harmless as they are
+        applied by id.
+        """
+        with self.request("GET", "/changes", {"since": repr(since)}) as response:
+            body = response.read()  # applied all at once anyway, much faster than line by line
+
+        records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        cursor = records.pop()["cursor"] if records and "cursor" in records[-1] else since
+        return records, cursor
+
+    def push(self, edits: list, key: str) -> list:
+        """POST <url>/edits {"key": ..., "edits": [...]}, answered with {"records": [...]}
+
+        The tracker remembers the keys it applied, so the request is safely sent
+        again, here when the connection drops and by the caller after any failure.
+        """
+        with self.request("POST", "/edits", body={"key": key, "edits": edits}) as response:
+            return json.loads(response.read()).get("records", [])
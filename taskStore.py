@@ -0,0 +1,182 @@
+"""Tasks and time codes of timeLogApp kept on disk between sessions, in SQLite.
+
+    store = TaskStore("~/.timeLogApp/tasks.sqlite")
+    source = SyncedTaskSource(store, HttpTaskSource(url))
+    source.fetch()  # the buckets from disk at once, then the ones changed on the tracker
+
+Each task record (see taskSource) is a row indexed by day, for the buckets, and by
+task name. A sync only asks the tracker for the records changed since the cursor
+of the previous one, so the traffic grows with the changes, not with the history.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import sqlite3
+import threading
+
+from taskSource import BUCKETS, TaskSource, bucket_days, bucket_of
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    task TEXT NOT NULL,
+    day TEXT NOT NULL,
+    code TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_day ON tasks (day, task);
+CREATE INDEX IF NOT EXISTS tasks_task ON tasks (task, day);
+CREATE TABLE IF NOT EXISTS cursors (
+    source TEXT PRIMARY KEY,
+    cursor REAL NOT NULL
+);
+"""
+
+
+class TaskStore:
+    """SQLite file of task records, shared by the threads of the process
+
+    Deleted records are removed, the rows only hold the current tasks.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            path = os.path.expanduser(path)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    # region -- Reads
+    def bucket(self, bucket: str, today: datetime.date = None) -> dict:
+        """Return the {task: time code} of a bucket, the newest day wins"""
+        return self.bucket_days(bucket, today)[0]
+
+    def bucket_days(self, bucket: str, today: datetime.date = None) -> tuple:
+        """Return the ({task: time code}, {task: iso day}) of a bucket, the newest day wins"""
+        oldest, newest = bucket_days(bucket, today)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT task, code, day FROM tasks WHERE day BETWEEN ? AND ? ORDER BY day", (oldest, newest)).fetchall()
+        return {task: code for task, code, _ in rows}, {task: day for task, _, day in rows}
+
+    def buckets(self, buckets=BUCKETS, today: datetime.date = None) -> dict:
+        return {bucket: self.bucket(bucket, today) for bucket in buckets}
+
+    def task(self, name: str) -> list:
+        """Return the records of a task, oldest day first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, task, day, code, updated FROM tasks WHERE task = ? ORDER BY day", (name,)).fetchall()
+        return [
+            {"id": id, "task": task, "day": day, "code": code, "updated": updated, "deleted": False}
+            for id, task, day, code, updated in rows
+        ]
+
+    def cursor(self, source: str) -> float:
+        """Return the cursor of the last sync with source, 0 if it never synced"""
+        with self._lock:
+            row = self._db.execute("SELECT cursor FROM cursors WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else 0.0
+
+    # endregion
+
+    # region -- Writes
+    def apply(self, records, source: str = None, cursor: float = None) -> set:
+        """Add, change or remove records, and store the cursor of source, in one transaction
+
+        Records are applied by id, an older copy of a record never replaces a newer one.
+        A record keeps its day, a task logged on another day is another record.
+
+        Returns:
+            set: the days whose tasks may have changed
+        """
+        rows = []
+        deleted = []
+        for record in records:
+            if record.get("deleted"):
+                deleted.append((record["id"], record["updated"]))
+            else:
+                rows.append((record["id"], record["task"], record["day"], record["code"], record["updated"]))
+        days = {row[2] for row in rows}
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "INSERT INTO tasks (id, task, day, code, updated) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET task = excluded.task, code = excluded.code, "
+                    "updated = excluded.updated WHERE excluded.updated >= tasks.updated", rows)
+
+                for id, updated in deleted:
+                    row = self._db.execute(
+                        "DELETE FROM tasks WHERE id = ? AND updated <= ? RETURNING day", (id, updated)).fetchone()
+                    if row is not None:
+                        days.add(row[0])
+
+                if source is not None and cursor is not None:
+                    self._db.execute("INSERT OR REPLACE INTO cursors (source, cursor) VALUES (?, ?)", (source, cursor))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return days
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM tasks")
+            self._db.execute("DELETE FROM cursors")
+
+    # endregion
+
+
+class SyncedTaskSource(TaskSource):
+    """Tasks read from a TaskStore, then brought up to date with the changes of a remote source
+
+    fetch() yields every bucket from the store right away, syncs, then yields again
+    the buckets holding a day that changed.
+    """
+
+    def __init__(self, store: TaskStore, remote: TaskSource, key: str = None):
+        self.store = store
+        self.remote = remote
+        self.key = key or getattr(remote, "url", type(remote).__name__)  # cursor of this remote in the store
+
+    def sync(self) -> set:
+        """Apply the changes of the remote since the last sync, return the days that changed"""
+        records, cursor = self.remote.changes(self.store.cursor(self.key))
+        return self.store.apply(records, self.key, cursor)
+
+    def fetch(self, buckets=BUCKETS):
+        today = datetime.date.today()
+        for bucket in buckets:
+            yield (bucket, *self.store.bucket_days(bucket, today))
+
+        changed = {bucket_of(day, today) for day in self.sync()}
+        for bucket in buckets:
+            if bucket in changed:
+                yield (bucket, *self.store.bucket_days(bucket, today))
+
+    def push(self, edits: list, key: str) -> list:
+        """Push edits to the remote, the records it changed are stored at once"""
+        records = self.remote.push(edits, key)
+        self.store.apply(records)
+        return records
+
+    def close(self):
+        self.remote.close()
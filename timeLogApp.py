@@ -3,8 +3,13 @@ import traceback
 from PySide6 import QtWidgets, QtCore, QtGui
 # from PySide2 import QtWidgets, QtCore, QtGui
 import traceback
+import os
 import sys
 
+from taskEdits import EditBatch, EditQueue
+from taskSource import BUCKETS, HttpTaskSource, StaticTaskSource, TaskSource, add_minutes, format_code, parse_code
+from taskStore import SyncedTaskSource, TaskStore
+
 datas = {
     "Today": {
         "Task11": "001-025",
@@ -32,21 +37,198 @@ class MyList():
         self.column_number = column_number
 
 
+def default_task_source() -> TaskSource:
+    """The tracker at $TIME_LOG_URL synced in $TIME_LOG_STORE, or the 'datas' dict when it isn't set"""
+    url = os.environ.get("TIME_LOG_URL")
+    if url:
+        store = TaskStore(os.environ.get("TIME_LOG_STORE", "~/.timeLogApp/tasks.sqlite"))
+        return SyncedTaskSource(store, HttpTaskSource(url))
+
+    print("No task tracker set in TIME_LOG_URL, entering exercize mode \nUsing the 'datas' dict to fake tasks")
+    return StaticTaskSource(datas)
+
+
+class FetchTaskSignals(QtCore.QObject):
+    """Signals of a FetchTask, emitted from the worker thread and received in the GUI thread"""
+
+    bucket = QtCore.Signal(str, object, object)  # bucket name, {task: time code}, {task: iso day}
+    failed = QtCore.Signal(str)
+    finished = QtCore.Signal()
+
+
+class FetchTask(QtCore.QRunnable):
+    """Fetch the buckets of a TaskSource on a QThreadPool thread, one bucket signal each"""
+
+    def __init__(self, source: TaskSource, buckets=BUCKETS):
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.signals = FetchTaskSignals()
+        self.source = source
+        self.buckets = tuple(buckets)
+        self._cancelled = False
+
+    def cancel(self):
+        """Ask the task to stop, its remaining signals are not emitted"""
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        try:
+            for bucket, tasks, days in self.source.fetch(self.buckets):
+                if self._cancelled:
+                    break
+                self.signals.bucket.emit(bucket, tasks, days)
+
+        except Exception:
+            if not self._cancelled:
+                self.signals.failed.emit(traceback.format_exc())
+
+        finally:
+            self.signals.finished.emit()
+
+
+class PushEditsSignals(QtCore.QObject):
+    """Signals of a PushEditsTask"""
+
+    sent = QtCore.Signal(object)  # records changed by the batch
+    failed = QtCore.Signal(str)
+
+
+class PushEditsTask(QtCore.QRunnable):
+    """Push a batch of an EditQueue on a QThreadPool thread
+
+    The queue is told the outcome from the worker thread, so it's right even when
+    the signals are never delivered (the window closing).
+    """
+
+    def __init__(self, source: TaskSource, queue: EditQueue, batch: EditBatch):
+        super().__init__()
+        self.setAutoDelete(False)
+
+        self.signals = PushEditsSignals()
+        self.source = source
+        self.queue = queue
+        self.batch = batch
+
+    def run(self):
+        try:
+            records = self.source.push(self.batch.payload(), self.batch.key)
+        except Exception:
+            self.queue.failed(self.batch)
+            self.signals.failed.emit(traceback.format_exc())
+        else:
+            self.queue.sent(self.batch)
+            self.signals.sent.emit(records)
+
+
+class TaskListModel(QtCore.QStringListModel):
+    """Task names of one bucket, the rows of every bucket are cached
+
+    The names live in the C++ string list, so a view laying out thousands of rows
+    never calls back into python, only data() of the painted rows does. Switching
+    bucket (set_bucket) swaps the cached list of the other bucket in.
+    set_tasks() only resets the model when the task names of the shown bucket
+    change, new time codes are a dataChanged. The day each task was logged on is
+    kept too, edits go to that day.
+    """
+
+    CodeRole = QtCore.Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self._buckets = {}  # bucket -> (task names, time codes, {task: row}, {task: iso day})
+        self._bucket = None
+        self._names = []
+        self._codes = []
+        self._rows = {}
+        self._days = {}
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role == self.CodeRole or role == QtCore.Qt.ItemDataRole.ToolTipRole:
+            return self._codes[index.row()] if index.isValid() else None
+        return super().data(index, role)
+
+    @property
+    def bucket(self) -> str:
+        return self._bucket
+
+    def task(self, row: int) -> str:
+        return self._names[row]
+
+    def row(self, task: str) -> int:
+        """Return the row of a task in the shown bucket, -1 if it isn't in it"""
+        return self._rows.get(task, -1)
+
+    def day(self, task: str) -> str:
+        """Return the iso day a task of the shown bucket was logged on"""
+        return self._days[task]
+
+    def set_tasks(self, bucket: str, tasks: dict, days: dict = None) -> bool:
+        """Cache the {task: time code} and {task: iso day} of a bucket, return True if the shown rows were reset
 
+        Without days, the days already cached for the bucket are kept.
+        """
+        names = list(tasks)
+        codes = list(tasks.values())
+        rows = {name: row for row, name in enumerate(names)}
+        if days is None:
+            days = self._buckets[bucket][3] if bucket in self._buckets else {}
+        self._buckets[bucket] = (names, codes, rows, days)
+        if bucket != self._bucket:
+            return False
+
+        self._days = days
+
+        if names == self._names:
+            changed = [row for row, code in enumerate(codes) if code != self._codes[row]]
+            self._codes = codes
+            if changed:
+                self.dataChanged.emit(self.index(changed[0]), self.index(changed[-1]), [self.CodeRole])
+            return False
+
+        self._show(names, codes, rows, days)
+        return True
+
+    def set_bucket(self, bucket: str):
+        """Show the cached rows of bucket, none if it wasn't set yet"""
+        if bucket == self._bucket:
+            return
+        self._bucket = bucket
+        self._show(*self._buckets.get(bucket, ([], [], {}, {})))
 
+    def _show(self, names: list, codes: list, rows: dict, days: dict):
+        self._names, self._codes, self._rows, self._days = names, codes, rows, days
+        self.setStringList(names)  # resets the model
 
 
 class MyUi(QtWidgets.QWidget):
-    def __init__(self, *args, **kwargs):
+    edit_step = 5  # minutes added or removed by the + and - buttons
+    edit_delay = 800  # ms without a click before the edits are sent
+    retry_delays = (1000, 2000, 5000, 10000, 30000)  # ms before sending a failed batch again
+
+    def __init__(self, *args, task_source: TaskSource = None, **kwargs):
         super().__init__(*args, **kwargs)
 
-        try :
-            self.tasks = sg.request # shot SG request
-            # convert Sg tasks in a dict
-            # ...
-        except :
-            print("No tasks have been found, entering exercize mode \nUsing the 'datas' dict to fake tasks")
-            self.tasks = datas
+        # the window shows empty buckets right away, they are filled as the source answers
+        self.tasks = {bucket: {} for bucket in BUCKETS}
+        self.task_source = task_source if task_source is not None else default_task_source()
+        self.thread_pool = QtCore.QThreadPool(self)
+        self._fetch_task = None
+
+        # +/- clicks are coalesced per task and sent in batches, see taskEdits
+        self.edit_queue = EditQueue()
+        self._push_task = None
+        self._push_failures = 0
+        self.edit_timer = QtCore.QTimer(self)
+        self.edit_timer.setSingleShot(True)
+        self.edit_timer.setInterval(self.edit_delay)
+        self.edit_timer.timeout.connect(self.flush_edits)
+        self.retry_timer = QtCore.QTimer(self)
+        self.retry_timer.setSingleShot(True)
+        self.retry_timer.timeout.connect(self.flush_edits)
 
 
 
@@ -73,6 +255,8 @@ class MyUi(QtWidgets.QWidget):
 
         # self.center()
 
+        self.refresh_tasks()
+
         return
 
 
@@ -88,18 +272,149 @@ class MyUi(QtWidgets.QWidget):
         lay.addWidget(self.time_combo_box)
 
 
-        self.list = QtWidgets.QListWidget()
-        self.list.setSelectionMode(QtWidgets.QListWidget.SelectionMode.ExtendedSelection)
+        self.task_model = TaskListModel(self)
+        for bucket, tasks in self.tasks.items():
+            self.task_model.set_tasks(bucket, tasks)
+
+        self.list = QtWidgets.QListView()
+        self.list.setModel(self.task_model)
+        self.list.setUniformItemSizes(True)  # rows aren't measured one by one
+        self.list.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.list.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
         self.populate_list()
-        self.list.itemSelectionChanged.connect(lambda: self.set_edit_task)
+        self.list.selectionModel().selectionChanged.connect(lambda: self.set_edit_task)
 
         self.time_combo_box.currentIndexChanged.connect(lambda: self.populate_list())
         lay.addWidget(self.list)
 
 
+        self.status_label = QtWidgets.QLabel()
+        lay.addWidget(self.status_label)
+
         self.refresh_btn = QtWidgets.QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(lambda: self.refresh_tasks())
         lay.addWidget(self.refresh_btn)
 
+    # region -- Fetching
+    def refresh_tasks(self):
+        """Fetch every bucket again on the thread pool, a fetch still running is dropped"""
+        if self._fetch_task is not None:
+            self._fetch_task.cancel()
+
+        task = FetchTask(self.task_source, self.tasks.keys())
+        task.signals.bucket.connect(lambda bucket, tasks, days: self.set_bucket_tasks(task, bucket, tasks, days))
+        task.signals.failed.connect(lambda message: self.fetch_failed(task, message))
+        task.signals.finished.connect(lambda: self.fetch_finished(task))
+
+        self._fetch_task = task
+        self.status_label.setText("Loading tasks ...")
+        self.thread_pool.start(task)
+
+    def set_bucket_tasks(self, task: FetchTask, bucket: str, tasks: dict, days: dict):
+        # buckets of a superseded fetch may still be queued
+        if task is not self._fetch_task or task.is_cancelled():
+            return
+
+        # edits the tracker didn't confirm yet (pending, in flight or to retry) aren't in the fetched codes
+        for (name, day), minutes in self.edit_queue.unconfirmed().items():
+            if name in tasks and days.get(name) == day:
+                tasks[name] = add_minutes(tasks[name], minutes)
+
+        self.tasks[bucket] = tasks
+        selected = self.selected_tasks() if bucket == self.task_model.bucket else []
+        if self.task_model.set_tasks(bucket, tasks, days) and selected:
+            self.select_tasks(selected)
+
+    def fetch_failed(self, task: FetchTask, message: str):
+        print(message)
+        if task is self._fetch_task:
+            self.status_label.setText("Couldn't get the tasks, Refresh to try again")
+
+    def fetch_finished(self, task: FetchTask):
+        if task is self._fetch_task:
+            self._fetch_task = None
+            if self.status_label.text() == "Loading tasks ...":
+                self.status_label.setText("")
+
+    def closeEvent(self, event):
+        if self._fetch_task is not None:
+            self._fetch_task.cancel()
+        self.edit_timer.stop()
+        self.retry_timer.stop()
+        self.task_source.close()  # also unblocks a fetch waiting on the network
+        self.thread_pool.waitForDone()
+
+        # a push cut short by close() is sent again with its key, it's applied once
+        try:
+            self.edit_queue.flush(self.task_source, retries=1)
+        except Exception:
+            print(traceback.format_exc())
+            print(f"{len(self.edit_queue)} time edits couldn't be sent")
+        self.task_source.close()
+        super().closeEvent(event)
+
+    # endregion
+
+    # region -- Editing
+    def edit_selected(self, minutes: int):
+        """Move the time of the selected tasks by minutes, sent once the clicks stop"""
+        bucket = self.task_model.bucket
+        tasks = self.selected_tasks()
+        if not tasks:
+            return
+
+        codes = dict(self.tasks[bucket])
+        flush = False
+        for task in tasks:
+            # the change actually shown is queued, a - stopped at zero doesn't eat a later +
+            before = parse_code(codes[task])
+            after = max(0, before + minutes)
+            if after != before:
+                codes[task] = format_code(after)
+                flush = self.edit_queue.add(task, self.task_model.day(task), after - before) or flush
+
+        self.tasks[bucket] = codes
+        self.task_model.set_tasks(bucket, codes)  # same tasks, only a dataChanged
+
+        if flush:
+            self.flush_edits()
+        else:
+            self.edit_timer.start()  # restarted by each click
+
+    def flush_edits(self):
+        """Send the next batch of edits on the thread pool, one batch in flight at a time"""
+        self.edit_timer.stop()
+        batch = self.edit_queue.next_batch()
+        if batch is None:
+            return
+
+        task = PushEditsTask(self.task_source, self.edit_queue, batch)
+        task.signals.sent.connect(lambda records: self.edits_sent(task, records))
+        task.signals.failed.connect(lambda message: self.edits_failed(task, message))
+        self._push_task = task
+        self.thread_pool.start(task)
+
+    def edits_sent(self, task: PushEditsTask, records: list):
+        self._push_failures = 0
+        if task is self._push_task:
+            self._push_task = None
+        if self.status_label.text().startswith("Couldn't send"):
+            self.status_label.setText("")
+        if len(self.edit_queue):
+            self.edit_timer.start()
+
+    def edits_failed(self, task: PushEditsTask, message: str):
+        print(message)
+        if task is self._push_task:
+            self._push_task = None
+
+        delay = self.retry_delays[min(self._push_failures, len(self.retry_delays) - 1)]
+        self._push_failures += 1
+        self.status_label.setText(f"Couldn't send {len(self.edit_queue)} time edits, retrying in {delay // 1000}s")
+        self.retry_timer.start(delay)
+
+    # endregion
+
     @property
     def time_combo_box_changed(self):
         self._task_time = self.time_combo_box.currentText()
@@ -109,11 +424,32 @@ class MyUi(QtWidgets.QWidget):
     def populate_list(self):
         time = self.time_combo_box_changed
 
-        self.list.clear()
-        self.list.addItems(list(self.tasks[time]))
+        self.task_model.set_bucket(time)
 
         return
 
+    def selected_tasks(self) -> list:
+        """Return the names of the selected tasks, in row order"""
+        rows = sorted(index.row() for index in self.list.selectionModel().selectedRows())
+        return [self.task_model.task(row) for row in rows]
+
+    def select_tasks(self, tasks):
+        """Select the tasks of the shown bucket named in tasks, in as few ranges as possible"""
+        rows = sorted(row for row in map(self.task_model.row, tasks) if row >= 0)
+        # contiguous rows are merged in one range, a range per row would be slow on large selections
+        ranges = []
+        for row in rows:
+            if ranges and row == ranges[-1][1] + 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+
+        selection = QtCore.QItemSelection()
+        for first, last in ranges:
+            selection.select(self.task_model.index(first), self.task_model.index(last))
+
+        self.list.selectionModel().select(selection, QtCore.QItemSelectionModel.SelectionFlag.ClearAndSelect)
+
 
     def remove_list_item(self, index):
         return
@@ -131,16 +467,19 @@ class MyUi(QtWidgets.QWidget):
         lay.addWidget(self._selected_task_label, 0, 0, 1, 2)
 
         self.plus_btn = QtWidgets.QPushButton("+")
+        self.plus_btn.clicked.connect(lambda: self.edit_selected(self.edit_step))
         lay.addWidget(self.plus_btn, 1, 0)
 
         self.minus_btn = QtWidgets.QPushButton("-")
+        self.minus_btn.clicked.connect(lambda: self.edit_selected(-self.edit_step))
         lay.addWidget(self.minus_btn, 1, 1)
     # region -- List
 
     @property
     def set_edit_task(self):
-        if self.list.selectedItems():
-            self._edit_task = self.list.selectedItems()[0].text()
+        selected = self.selected_tasks()
+        if selected:
+            self._edit_task = selected[0]
             self._selected_task_label.setText(self._edit_task)
         else:
             self._selected_task_label.setText(".")
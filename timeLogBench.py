@@ -0,0 +1,145 @@
+"""Benchmarks for the time log reports of timeLogApp.
+
+A synthetic year of studio-wide logs, a few million entries, is parsed into a
+timeLogTable.TimeLogTable and rolled up per task, per day, per week, with running
+sums. No Qt is needed :
+    python timeLogBench.py --entries 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import datetime
+import time
+
+import numpy as np
+
+from taskSource import format_code, parse_code
+from timeLogTable import TimeLogTable, parse_codes
+
+
+# region -- Synthetic logs
+def studio_columns(entries: int = 2000000, tasks: int = 5000, users: int = 300, days: int = 365, seed: int = 0):
+    """Return (task names, iso days, user names, time codes) columns of a year of logs"""
+    rng = np.random.default_rng(seed)
+    first = np.datetime64("2024-01-01")
+
+    task_names = np.array([f"Task{index:05d}" for index in range(tasks)])
+    user_names = np.array([f"artist{index:03d}" for index in range(users)])
+    day_names = (first + np.arange(days)).astype(str)
+    code_names = np.array([format_code(minutes) for minutes in range(5, 8 * 60 + 5, 5)])
+
+    return (
+        task_names[rng.integers(0, tasks, entries)].tolist(),
+        day_names[rng.integers(0, days, entries)].tolist(),
+        user_names[rng.integers(0, users, entries)].tolist(),
+        code_names[rng.integers(0, len(code_names), entries)].tolist(),
+    )
+
+# endregion
+
+
+# region -- Helpers
+def timed(func, *args, **kwargs):
+    """Return (result, elapsed seconds) of func(*args, **kwargs)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(name: str, seconds: float, count: int = 0):
+    per_item = f"  {seconds / count * 1e9:8.1f} ns/entry" if count else ""
+    print(f"{name:<40} {seconds * 1000:10.2f} ms{per_item}")
+
+# endregion
+
+
+def check_rollups(columns: tuple, sample: int = 100000):
+    """Compare the rollups of the first sample entries with dict loops over the columns"""
+    tasks, days, users, codes = (column[:sample] for column in columns)
+    small = TimeLogTable.from_entries(tasks, days, users, codes)
+
+    by_task = collections.Counter()
+    by_week = collections.Counter()
+    for task, day, code in zip(tasks, days, codes):
+        minutes = parse_code(code)
+        by_task[task] += minutes
+        day = datetime.date.fromisoformat(day)
+        by_week[day - datetime.timedelta(days=day.weekday())] += minutes
+
+    assert dict(zip(small.task_names, small.totals_by_task().tolist())) == by_task, "per task totals differ"
+    mondays, totals = small.totals_by_week()
+    assert {monday: total for monday, total in zip(mondays.astype(datetime.date), totals.tolist()) if total} == by_week, \
+        "per week totals differ"
+    assert small.running_totals("day")[1][-1] == small.total() == sum(by_task.values()), "running sums differ"
+
+
+def bench_parse(columns: tuple):
+    codes = columns[3]
+    _, seconds = timed(lambda: [parse_code(code) for code in codes])
+    report(f"parse_code loop ({len(codes)} codes)", seconds, len(codes))
+
+    _, seconds = timed(parse_codes, codes)
+    report("parse_codes", seconds, len(codes))
+
+    table, seconds = timed(TimeLogTable.from_entries, *columns)
+    report("TimeLogTable.from_entries", seconds, len(codes))
+    return table
+
+
+def bench_dict_rollups(columns: tuple):
+    """What timeLogApp would do with its nested dicts"""
+    tasks, days, users, codes = columns
+
+    def rollups():
+        by_task = collections.defaultdict(int)
+        by_day = collections.defaultdict(int)
+        for task, day, code in zip(tasks, days, codes):
+            minutes = parse_code(code)
+            by_task[task] += minutes
+            by_day[day] += minutes
+        return by_task, by_day
+
+    _, seconds = timed(rollups)
+    report("dict loop per task + per day", seconds, len(tasks))
+
+
+def bench_rollups(table: TimeLogTable):
+    count = len(table)
+    start = time.perf_counter()
+
+    for name, rollup in (
+            ("totals_by_task", table.totals_by_task),
+            ("totals_by_user", table.totals_by_user),
+            ("totals_by_day", table.totals_by_day),
+            ("totals_by_week", table.totals_by_week),
+            ("running_totals day", lambda: table.running_totals("day")),
+            ("pivot task x week, running", lambda: table.pivot("task", "week", running=True)),
+            ("pivot user x day", lambda: table.pivot("user", "day")),
+            ("select one month + by task", lambda: table.select(start="2024-03-01", end="2024-03-31").totals_by_task()),
+    ):
+        _, seconds = timed(rollup)
+        report(f"TimeLogTable.{name}", seconds, count)
+
+    report("every report above", time.perf_counter() - start, count)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=2000000)
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=300)
+    args = parser.parse_args(argv)
+
+    columns, seconds = timed(studio_columns, args.entries, args.tasks, args.users)
+    report(f"synthetic logs ({args.entries} entries)", seconds)
+
+    table = bench_parse(columns)
+    check_rollups(columns)
+    bench_dict_rollups(columns)
+    bench_rollups(table)
+
+
+if __name__ == '__main__':
+    main()
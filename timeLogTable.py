@@ -0,0 +1,232 @@
+"""Columnar representation of the time logs of timeLogApp.
+
+A time code is "<hours>-<minutes>", "001-025" is 1 hour 25 minutes, "000-05" is
+5 minutes. A TimeLogTable holds one row per logged entry :
+    tasks    (N,)  row of the task in task_names
+    users    (N,)  row of the user in user_names
+    days     (N,)  day of the entry, in days since 1970-01-01
+    minutes  (N,)  logged time
+
+so the reports are bincounts over whole arrays instead of loops over nested dicts :
+    table = TimeLogTable.from_entries(tasks, days, users, codes)
+    weeks, totals = table.pivot("task", "week", running=True)  # per task running sums, week by week
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from taskSource import format_code
+
+PERIODS = ("day", "week")
+_DASH = ord("-")
+_ZERO = ord("0")
+
+
+# region -- Time codes
+def parse_codes(codes) -> np.ndarray:
+    """Return the minutes of a sequence of time codes, as an int64 array
+
+    The codes are read as a bytes matrix, one row per code, and parsed a column of
+    characters at a time, no python call per code.
+    """
+    raw = np.asarray(codes, dtype=bytes).reshape(-1)  # fixed width, shorter codes are padded with zero bytes
+    if not len(raw):
+        return np.zeros(0, dtype=np.int64)
+
+    chars = raw.view(np.uint8).reshape(len(raw), raw.dtype.itemsize)
+    digits = (chars >= _ZERO) & (chars <= _ZERO + 9)
+    dashes = chars == _DASH
+    dash = dashes.argmax(axis=1)
+    length = np.count_nonzero(chars, axis=1)
+
+    valid = (
+        (np.count_nonzero(dashes, axis=1) == 1) & (dash > 0) & (dash < length - 1)
+        & np.all(digits | dashes | (chars == 0), axis=1)
+    )
+    if not valid.all():
+        bad = raw[~valid][0].decode("utf-8", "replace")
+        raise ValueError(f"Invalid time code : {bad!r}, expected <hours>-<minutes>")
+
+    hours = np.zeros(len(raw), dtype=np.int64)
+    minutes = np.zeros(len(raw), dtype=np.int64)
+    for column in range(chars.shape[1]):
+        digit = chars[:, column].astype(np.int64) - _ZERO
+        np.copyto(hours, hours * 10 + digit, where=column < dash)
+        np.copyto(minutes, minutes * 10 + digit, where=(column > dash) & (column < length))
+    return hours * 60 + minutes
+
+# endregion
+
+
+def _categories(values) -> tuple:
+    """Return (row of each value in names, names), names in first seen order"""
+    rows = {}
+    codes = np.fromiter((rows.setdefault(value, len(rows)) for value in values), dtype=np.int32, count=len(values))
+    return codes, list(rows)
+
+
+def _days(days) -> np.ndarray:
+    """Return iso days, dates or datetime64 as days since 1970-01-01"""
+    return np.asarray(days, dtype="datetime64[D]").astype(np.int64).astype(np.int32)
+
+
+class TimeLogTable:
+    """Time log entries stored as numpy arrays, one row per entry"""
+
+    def __init__(self, tasks, days, users, minutes, task_names, user_names):
+        self.tasks = np.asarray(tasks, dtype=np.int32)
+        self.days = np.asarray(days, dtype=np.int32)
+        self.users = np.asarray(users, dtype=np.int32)
+        self.minutes = np.asarray(minutes, dtype=np.int64)
+        self.task_names = list(task_names)
+        self.user_names = list(user_names)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __repr__(self) -> str:
+        return f"<TimeLogTable {len(self)} entries, {len(self.task_names)} tasks, {len(self.user_names)} users>"
+
+    # region -- Conversions
+    @classmethod
+    def from_entries(cls, tasks, days, users, codes) -> "TimeLogTable":
+        """Build a table from columns : task names, days (iso, dates), user names and time codes"""
+        task_rows, task_names = _categories(tasks)
+        user_rows, user_names = _categories(users)
+        code_rows, code_names = _categories(codes)  # a few hundred distinct codes, each parsed once
+        minutes = parse_codes(code_names)[code_rows] if code_names else np.zeros(0, dtype=np.int64)
+        return cls(task_rows, _days(days), user_rows, minutes, task_names, user_names)
+
+    @classmethod
+    def from_records(cls, records, user: str = "") -> "TimeLogTable":
+        """Build a table from task records (see taskSource), logged by user, deleted ones are skipped"""
+        records = [record for record in records if not record.get("deleted")]
+        return cls.from_entries(
+            [record["task"] for record in records],
+            [record["day"] for record in records],
+            [record.get("user", user) for record in records],
+            [record["code"] for record in records],
+        )
+
+    @classmethod
+    def concatenate(cls, tables) -> "TimeLogTable":
+        """Return the entries of every table in one, their task and user names merged"""
+        task_rows = {}
+        user_rows = {}
+        columns = ([], [], [], [])
+        for table in tables:
+            # remap the rows of the table's names to the merged ones
+            tasks = np.array([task_rows.setdefault(name, len(task_rows)) for name in table.task_names], dtype=np.int32)
+            users = np.array([user_rows.setdefault(name, len(user_rows)) for name in table.user_names], dtype=np.int32)
+            columns[0].append(tasks[table.tasks] if len(tasks) else table.tasks)
+            columns[1].append(table.days)
+            columns[2].append(users[table.users] if len(users) else table.users)
+            columns[3].append(table.minutes)
+
+        if not columns[0]:
+            return cls([], [], [], [], [], [])
+        return cls(*(np.concatenate(column) for column in columns), list(task_rows), list(user_rows))
+
+    def entries(self):
+        """Yield (task, iso day, user, time code) for each entry"""
+        days = self.days.astype("datetime64[D]").astype(str).tolist()
+        for task, day, user, minutes in zip(self.tasks.tolist(), days, self.users.tolist(), self.minutes.tolist()):
+            yield self.task_names[task], day, self.user_names[user], format_code(minutes)
+
+    # endregion
+
+    # region -- Selection
+    def select(self, tasks=None, users=None, start=None, end=None) -> "TimeLogTable":
+        """Return the entries of some tasks and users, from start to end days included
+
+        The table returned shares the task and user names of this one.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if tasks is not None:
+            mask &= np.isin(self.tasks, self._rows(self.task_names, tasks))
+        if users is not None:
+            mask &= np.isin(self.users, self._rows(self.user_names, users))
+        if start is not None:
+            mask &= self.days >= _days(start)
+        if end is not None:
+            mask &= self.days <= _days(end)
+        return TimeLogTable(
+            self.tasks[mask], self.days[mask], self.users[mask], self.minutes[mask], self.task_names, self.user_names)
+
+    @staticmethod
+    def _rows(names: list, selected) -> np.ndarray:
+        selected = {selected} if isinstance(selected, str) else set(selected)
+        return np.array([row for row, name in enumerate(names) if name in selected], dtype=np.int32)
+
+    # endregion
+
+    # region -- Rollups
+    def total(self) -> int:
+        return int(self.minutes.sum())
+
+    def totals_by_task(self) -> np.ndarray:
+        """Return the minutes logged on each task, in the order of task_names"""
+        return self._bincount(self.tasks, len(self.task_names))
+
+    def totals_by_user(self) -> np.ndarray:
+        """Return the minutes logged by each user, in the order of user_names"""
+        return self._bincount(self.users, len(self.user_names))
+
+    def totals_by_day(self) -> tuple:
+        """Return (days, minutes logged each day), every day from the first entry to the last"""
+        return self.totals_by("day")
+
+    def totals_by_week(self) -> tuple:
+        """Return (mondays, minutes logged each week), every week from the first entry to the last"""
+        return self.totals_by("week")
+
+    def totals_by(self, period: str = "day", running=False) -> tuple:
+        """Return (first day of each period, minutes logged in it), cumulated with running=True"""
+        starts, periods = self._periods(period)
+        totals = self._bincount(periods, len(starts))
+        return starts, np.cumsum(totals) if running else totals
+
+    def running_totals(self, period: str = "day") -> tuple:
+        """Return (first day of each period, minutes logged up to its end)"""
+        return self.totals_by(period, running=True)
+
+    def pivot(self, rows: str = "task", period: str = "week", running=False) -> tuple:
+        """Return (first day of each period, (len(names), periods) matrix of minutes)
+
+        rows is "task" or "user", a row of the matrix per name of task_names or
+        user_names. With running=True each row holds its running sums.
+        """
+        if rows not in ("task", "user"):
+            raise ValueError(f"Unknown pivot rows : {rows}, expected task or user")
+        row_of, names = (self.tasks, self.task_names) if rows == "task" else (self.users, self.user_names)
+
+        starts, periods = self._periods(period)
+        cells = row_of.astype(np.int64) * len(starts) + periods
+        matrix = self._bincount(cells, len(names) * len(starts)).reshape(len(names), len(starts))
+        return starts, np.cumsum(matrix, axis=1) if running else matrix
+
+    def _periods(self, period: str) -> tuple:
+        """Return (first day of each period, period of each entry)"""
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period : {period}, expected one of {', '.join(PERIODS)}")
+        if not len(self):
+            return np.zeros(0, dtype="datetime64[D]"), np.zeros(0, dtype=np.int64)
+
+        days = self.days.astype(np.int64)
+        if period == "week":
+            days = (days + 3) // 7  # 1970-01-01 is a thursday, weeks start on mondays
+        first = days.min()
+        count = int(days.max() - first) + 1
+
+        starts = np.arange(first, first + count)
+        if period == "week":
+            starts = starts * 7 - 3
+        return starts.astype("datetime64[D]"), days - first
+
+    def _bincount(self, rows: np.ndarray, count: int) -> np.ndarray:
+        # bincount sums float64 weights, exact for totals under 2 ** 53 minutes
+        return np.bincount(rows, weights=self.minutes, minlength=count).astype(np.int64)
+
+    # endregion
+
@@ -0,0 +1,90 @@
+"""Depth-first traversal with an explicit stack, for trees of any depth.
+
+Used by TreeItem.load, JsonModel.to_json and MayaInteract, so a long joint chain
+never hits python's recursion limit :
+
+    def enter(node, context):
+        # pre-order, returns the context handed to the children of node
+        ...
+
+    def leave(node, context, results):
+        # post-order, results holds what leave returned for each child
+        ...
+
+    result = walk(root, children, enter, leave)
+
+enter and leave may return SKIP (enter only, the children are not visited and leave
+gets SKIP as context) or STOP (end the walk, walk() then returns STOP).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable
+
+SKIP = object()
+STOP = object()
+
+
+def walk(
+        root: Any,
+        children: Callable[[Any], Iterable],
+        enter: Callable[[Any, Any], Any] = None,
+        leave: Callable[[Any, Any, list], Any] = None,
+        context: Any = None) -> Any:
+    """Walk the tree below root depth first and return what leave returned for root
+
+    Arguments:
+        root: first node of the walk
+        children (callable): return the child nodes of a node, called after enter()
+        enter (callable): pre-order visitor, enter(node, parent context) -> node context
+        leave (callable): post-order visitor, leave(node, node context, children results)
+        context: context given to enter() for root
+    """
+    collect = leave is not None
+
+    node_context = enter(root, context) if enter is not None else context
+    if node_context is STOP:
+        return STOP
+
+    nodes = () if node_context is SKIP else children(root)
+    # one frame per open node : node, its context, its children iterator, children results
+    stack = [(root, node_context, iter(nodes), [] if collect else None)]
+    result = None
+
+    while stack:
+        node, node_context, pending, results = stack[-1]
+
+        child = next(pending, _DONE)
+        if child is not _DONE:
+            child_context = enter(child, node_context) if enter is not None else node_context
+            if child_context is STOP:
+                return STOP
+
+            nodes = () if child_context is SKIP else children(child)
+            stack.append((child, child_context, iter(nodes), [] if collect else None))
+            continue
+
+        stack.pop()
+        if not collect:
+            continue
+
+        result = leave(node, node_context, results)
+        if result is STOP:
+            return STOP
+
+        if stack:
+            stack[-1][3].append(result)
+
+    return result
+
+
+def preorder(root: Any, children: Callable[[Any], Iterable]):
+    """Yield (node, depth) for every node below root, parents before their children"""
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+        stack.extend((child, depth + 1) for child in reversed(list(children(node))))
+
+
+_DONE = object()